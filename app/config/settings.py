@@ -21,8 +21,120 @@ def _required(name: str) -> str:
     return value
 
 
+def _int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
 # 数据库
 DB_URL: str = _required("DB_URL")
 
 # 是否自动建表（允许有安全默认）
 DB_GENERATE_SCHEMAS: bool = os.getenv("DB_GENERATE_SCHEMAS", "false").lower() == "true"
+
+
+# 异步入库任务队列
+INGEST_WORKERS: int = _int("INGEST_WORKERS", 4)  # 后台 worker 数
+INGEST_QUEUE_SIZE: int = _int("INGEST_QUEUE_SIZE", 500)  # 排队上限，超出返回 503
+INGEST_JOB_HISTORY: int = _int("INGEST_JOB_HISTORY", 5000)  # 内存中保留的任务状态条数
+
+# 入库流水线各阶段并发上限（存储 / 解析 / LLM / 数据库）
+STAGE_LIMIT_STORAGE: int = _int("STAGE_LIMIT_STORAGE", 16)
+STAGE_LIMIT_PARSE: int = _int("STAGE_LIMIT_PARSE", os.cpu_count() or 2)
+STAGE_LIMIT_LLM: int = _int("STAGE_LIMIT_LLM", 8)
+STAGE_LIMIT_DB: int = _int("STAGE_LIMIT_DB", 8)
+
+# 批量 / ZIP 上传
+BATCH_MAX_FILES: int = _int("BATCH_MAX_FILES", 1000)  # 单次批量最多处理的 PDF 数
+BATCH_CONCURRENCY: int = _int("BATCH_CONCURRENCY", 32)  # 同时在内存中处理的文件数
+BATCH_MAX_ENTRY_BYTES: int = _int("BATCH_MAX_ENTRY_BYTES", 20 * 1024 * 1024)  # ZIP 内单个 PDF 上限
+
+# PDF 解析执行器
+PDF_PARSE_EXECUTOR: str = os.getenv("PDF_PARSE_EXECUTOR", "process")  # process / thread
+PDF_PARSE_WORKERS: int = _int("PDF_PARSE_WORKERS", os.cpu_count() or 2)
+PDF_PARSE_TIMEOUT: int = _int("PDF_PARSE_TIMEOUT", 30)  # 单个文档解析超时（秒）
+PDF_MAX_PAGES: int = _int("PDF_MAX_PAGES", 50)  # 超出的页不再解析
+
+# MinIO 存储 I/O
+MINIO_IO_WORKERS: int = _int("MINIO_IO_WORKERS", 16)  # 阻塞调用专用线程池大小
+MINIO_POOL_SIZE: int = _int("MINIO_POOL_SIZE", 16)  # urllib3 每个 host 的连接数
+MINIO_CONNECT_TIMEOUT: int = _int("MINIO_CONNECT_TIMEOUT", 5)
+MINIO_READ_TIMEOUT: int = _int("MINIO_READ_TIMEOUT", 60)
+MINIO_PART_SIZE: int = _int("MINIO_PART_SIZE", 5 * 1024 * 1024)  # 分片上传块大小（MinIO 最小 5MiB）
+
+# 上传落盘（流式处理，单个上传的内存占用不超过一个缓冲块）
+UPLOAD_CHUNK_SIZE: int = _int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+UPLOAD_SPOOL_DIR: str | None = os.getenv("UPLOAD_SPOOL_DIR") or None  # 默认系统临时目录
+
+# LLM 抽取结果缓存（本地 SQLite）
+LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_PATH: str = os.getenv("LLM_CACHE_PATH") or str(BASE_DIR / ".cache" / "llm_extraction.sqlite3")
+LLM_CACHE_MAX_BYTES: int = _int("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024)  # 超出后按最近访问时间淘汰
+LLM_CACHE_TTL: int = _int("LLM_CACHE_TTL", 0)  # 条目有效期（秒），0 表示不过期
+
+# LLM HTTP 客户端
+LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.deepseek.com")
+LLM_HTTP2: bool = os.getenv("LLM_HTTP2", "false").lower() == "true"  # 需要安装 h2
+LLM_CONNECT_TIMEOUT: int = _int("LLM_CONNECT_TIMEOUT", 5)
+LLM_READ_TIMEOUT: int = _int("LLM_READ_TIMEOUT", 120)  # 长简历生成较慢
+LLM_MAX_CONNECTIONS: int = _int("LLM_MAX_CONNECTIONS", 20)
+LLM_MAX_RETRIES: int = _int("LLM_MAX_RETRIES", 4)
+LLM_BACKOFF_BASE_MS: int = _int("LLM_BACKOFF_BASE_MS", 500)
+LLM_BACKOFF_MAX_MS: int = _int("LLM_BACKOFF_MAX_MS", 30000)
+# 自适应并发：遇到 429 减半，持续成功后逐步恢复
+LLM_CONCURRENCY_MIN: int = _int("LLM_CONCURRENCY_MIN", 1)
+LLM_CONCURRENCY_MAX: int = _int("LLM_CONCURRENCY_MAX", 8)
+
+# 规则抽取（LLM 前置快速通道）
+RULE_EXTRACTOR_ENABLED: bool = os.getenv("RULE_EXTRACTOR_ENABLED", "true").lower() == "true"
+RULE_MIN_SKILLS: int = _int("RULE_MIN_SKILLS", 3)  # 词典命中达到该数量才认为技能字段可信
+
+# 发给 LLM 的简历文本压缩
+LLM_COMPACTION_ENABLED: bool = os.getenv("LLM_COMPACTION_ENABLED", "true").lower() == "true"
+LLM_PROMPT_TOKEN_BUDGET: int = _int("LLM_PROMPT_TOKEN_BUDGET", 3000)  # 简历正文的估算 token 上限
+
+# 多份简历合并为一次 LLM 请求（批量导入）
+LLM_BATCH_MAX_DOCS: int = _int("LLM_BATCH_MAX_DOCS", 8)
+LLM_BATCH_TOKEN_BUDGET: int = _int("LLM_BATCH_TOKEN_BUDGET", 12000)  # 单次请求内简历正文的估算 token 上限
+LLM_BATCH_WINDOW_MS: int = _int("LLM_BATCH_WINDOW_MS", 200)  # 攒批等待时间
+LLM_STREAM: bool = os.getenv("LLM_STREAM", "false").lower() == "true"  # 流式接收，对象闭合即结束
+
+# 条件匹配索引
+CONDITION_INDEX_TTL: int = _int("CONDITION_INDEX_TTL", 60)  # 兜底重建间隔（秒），多进程部署时的最大可见延迟
+
+# 条件变更后的存量重新匹配
+REMATCH_BATCH_SIZE: int = _int("REMATCH_BATCH_SIZE", 1000)  # 每批读取 / 批量更新的行数
+REMATCH_BATCH_PAUSE_MS: int = _int("REMATCH_BATCH_PAUSE_MS", 20)  # 批次间让出数据库的间隔
+
+# 列表分页
+PAGINATION_TOTAL_TTL: int = _int("PAGINATION_TOTAL_TTL", 30)  # 同一过滤条件的 total 缓存秒数
+
+# 知识图谱
+GRAPH_SNAPSHOT_TTL: int = _int("GRAPH_SNAPSHOT_TTL", 300)  # 快照兜底重建间隔（秒），多进程部署时的最大可见延迟
+GRAPH_STREAM_CHUNK: int = _int("GRAPH_STREAM_CHUNK", 5000)  # NDJSON 流式输出每次读库的行数
+GRAPH_MAX_NODES: int = _int("GRAPH_MAX_NODES", 2000)  # 单次 JSON 响应的节点数上限
+
+# 技能字典
+SKILL_REGISTRY_TTL: int = _int("SKILL_REGISTRY_TTL", 300)  # 超过该秒数后重新载入技能与别名（多进程下合并技能后的最大可见延迟）
+
+# 技能位图索引
+SKILL_INDEX_TTL: int = _int("SKILL_INDEX_TTL", 600)  # 超过该秒数后在后台重建
+
+# 批量转入人才库
+BULK_PROMOTE_MAX: int = _int("BULK_PROMOTE_MAX", 500)  # 单次请求的筛查记录数上限
+
+# 人才相似度
+SIMILARITY_INDEX_TTL: int = _int("SIMILARITY_INDEX_TTL", 600)  # 超过该秒数后在后台重建
+SIMILARITY_EDU_WEIGHT_PCT: int = _int("SIMILARITY_EDU_WEIGHT_PCT", 50)  # 学校 / 专业 / 学位特征相对技能的权重（百分比）
+
+# 条件评分排序
+SCORING_COLUMNS_TTL: int = _int("SCORING_COLUMNS_TTL", 1800)  # 简历列式副本整体重建间隔（秒）
+SCORING_LOAD_CHUNK: int = _int("SCORING_LOAD_CHUNK", 20000)  # 构建 / 增量追加时每次读库的行数
+
+# 简历文件下载
+ASSET_CACHE_DIR: str | None = os.getenv("ASSET_CACHE_DIR") or None  # 默认系统临时目录下的 resume-asset-cache
+ASSET_CACHE_MAX_BYTES: int = _int("ASSET_CACHE_MAX_BYTES", 1024 * 1024 * 1024)  # 本地磁盘缓存上限（每个工作进程各自计算），超出按 LRU 淘汰
+ASSET_CACHE_MAX_OBJECT_BYTES: int = _int("ASSET_CACHE_MAX_OBJECT_BYTES", 50 * 1024 * 1024)  # 更大的对象不进缓存，直接流式转发
+ASSET_STREAM_CHUNK: int = _int("ASSET_STREAM_CHUNK", 256 * 1024)  # 流式转发每块大小
+ASSET_PRESIGN_TTL: int = _int("ASSET_PRESIGN_TTL", 300)  # 预签名地址有效期（秒）
+ASSET_CACHE_CONTROL: str = os.getenv("ASSET_CACHE_CONTROL", "private, max-age=86400")  # 对象键含 uuid，内容不会变
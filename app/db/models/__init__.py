@@ -3,4 +3,7 @@ from .screening import ScreeningResume
 from .talent import Talent
 from .skill import Skill
 from .talent_skill import TalentSkill
-from .selection import ScreeningCondition
+from .selection import ConditionRematchJob, ScreeningCondition
+from .condition_match import ScreeningConditionMatch
+from .search_document import SearchDocument
+from .skill_alias import SkillAlias
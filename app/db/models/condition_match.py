@@ -0,0 +1,27 @@
+from tortoise import models, fields
+
+
+class ScreeningConditionMatch(models.Model):
+    """
+    简历命中筛选条件的关联表（替代在 matched_condition_ids JSON 上做 contains 过滤）。
+    由入库匹配和条件变更后的重新匹配维护。
+    """
+
+    id = fields.BigIntField(pk=True)
+
+    # 筛选条件编号
+    condition_id = fields.BigIntField()
+
+    # 筛查记录编号
+    screening_id = fields.BigIntField()
+
+    # 命中时间
+    matched_at = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "screening_condition_matches"
+        # (condition_id, screening_id) 唯一索引即「命中某条件的简历」的范围扫描索引
+        unique_together = (("condition_id", "screening_id"),)
+        indexes = [
+            ("screening_id",),
+        ]
@@ -6,6 +6,10 @@ class ScreeningResume(models.Model):
 
     # 简历原文件（MinIO）
     file_object_key = fields.CharField(max_length=512)
+    # 原文件内容 SHA-256（相同内容重复上传时直接复用已有记录）；唯一约束保证多进程并发上传同一文件只入库一份
+    content_sha256 = fields.CharField(max_length=64, null=True, unique=True)
+    # 相同内容被上传的次数（含首次）
+    upload_count = fields.IntField(default=1)
 
     # 抽取出的关键信息（从简历里提取）
     extracted_name = fields.CharField(max_length=64, null=True)
@@ -32,7 +36,10 @@ class ScreeningResume(models.Model):
         table = "screening_resumes"
         indexes = [
             ("is_screened", "at_time"),
+            ("at_time", "id"),
             ("extracted_name",),
             ("extracted_school",),
             ("extracted_major",),
+            ("extracted_degree",),
+            ("extracted_grad_year",),
         ]
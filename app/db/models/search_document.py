@@ -0,0 +1,28 @@
+from tortoise import models, fields
+
+
+class SearchDocument(models.Model):
+    """
+    全文检索文档：每份筛查简历 / 每个人才一行。
+    倒排索引按数据库后端另建（见 services/search_service.py）。
+    """
+
+    id = fields.BigIntField(pk=True)
+
+    # screening / talent
+    kind = fields.CharField(max_length=16)
+    # 对应 screening_resumes.id / talents.id
+    ref_id = fields.BigIntField()
+
+    # 展示用标题（姓名、学校、专业等）
+    title = fields.CharField(max_length=512, null=True)
+    # 简历原文（parse_pdf 的输出）
+    body = fields.TextField(null=True)
+    # 分词后的文本（中文按二元组切分），供 SQLite FTS5 / Postgres tsvector 建索引
+    tokens = fields.TextField(null=True)
+
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "search_documents"
+        unique_together = (("kind", "ref_id"),)
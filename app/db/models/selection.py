@@ -17,7 +17,9 @@ class ScreeningCondition(models.Model):
     #   "majors": ["计算机"],
     #   "degrees": ["本科", "硕士"],
     #   "grad_year_min": 2018,
-    #   "grad_year_max": 2025
+    #   "grad_year_max": 2025,
+    #   "any": [{"majors": ["软件工程"]}, {"name_keywords": ["李"]}],  # 组合子 all / any / not，可嵌套
+    #   "not": {"schools": ["某学院"]}
     # }
     criteria = fields.JSONField(null=True)
 
@@ -31,5 +33,33 @@ class ScreeningCondition(models.Model):
         table = "screening_conditions"
         indexes = [
             ("status", "is_deleted"),
-            ("created_at",),
+            ("created_at", "id"),
+        ]
+
+
+class ConditionRematchJob(models.Model):
+    """
+    条件变更后对存量简历的重新匹配任务。
+    按 screening_resumes.id 升序分批处理，last_id 为断点，进程重启后从断点继续。
+    """
+
+    id = fields.BigIntField(pk=True)
+    condition_id = fields.BigIntField()
+
+    # pending / running / done / failed / superseded（同一条件又有新的变更）
+    status = fields.CharField(max_length=16, default="pending")
+    last_id = fields.BigIntField(default=0)  # 已处理到的 screening_resumes.id
+    total = fields.IntField(default=0)  # 开始时的简历总数（估算进度用）
+    processed = fields.IntField(default=0)
+    changed = fields.IntField(default=0)  # matched_condition_ids 实际发生变化的行数
+    error = fields.TextField(null=True)
+
+    created_at = fields.DatetimeField(auto_now_add=True)
+    updated_at = fields.DatetimeField(auto_now=True)
+
+    class Meta:
+        table = "condition_rematch_jobs"
+        indexes = [
+            ("condition_id", "status"),
+            ("status",),
         ]
@@ -0,0 +1,25 @@
+from tortoise import models, fields
+
+
+class SkillAlias(models.Model):
+    """
+    技能别名：规范化后的写法 -> 技能。
+    "python" / "Python3" / "PYTHON " 都映射到同一个技能；alias 唯一，是「写法 -> 技能」的权威来源。
+    """
+
+    id = fields.BigIntField(pk=True)
+
+    # 规范化后的写法（见 services/skill_registry.canonical_key）
+    alias = fields.CharField(max_length=128, unique=True)
+
+    # 技能编号
+    skill_id = fields.BigIntField()
+
+    # 入库时间
+    at_time = fields.DatetimeField(auto_now_add=True)
+
+    class Meta:
+        table = "skill_aliases"
+        indexes = [
+            ("skill_id",),
+        ]
@@ -22,3 +22,7 @@ class Talent(models.Model):
 
     class Meta:
         table = "talents"
+        indexes = [
+            ("at_time", "id"),
+            ("source_screening_id",),
+        ]
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from tortoise.contrib.fastapi import register_tortoise
@@ -6,17 +8,54 @@ from app.config.settings import DB_URL, DB_GENERATE_SCHEMAS
 from app.routers.screening import router as screening_router
 from app.routers.conditions import router as condition_router
 from app.routers.talent import router as talent_router
+from app.routers.search import router as search_router
+from app.routers.assets import router as asset_router
+from app.services import (
+    asset_service,
+    ingest_service,
+    llm_client,
+    minio_service,
+    pdf_service,
+    rematch_service,
+    rule_extractor,
+    search_service,
+    similarity_service,
+    skill_index,
+    skill_registry,
+)
 
 # 1) 加载环境变量
 load_dotenv()
 
-# 2) 创建应用
-app = FastAPI(title="简历筛选与人才管理系统")
+# 2) 创建应用（lifespan 在数据库初始化之后运行）
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await search_service.ensure_schema()
+    await rule_extractor.load_known_skills()
+    await skill_registry.load()
+    await skill_index.load()
+    await similarity_service.load()
+    await llm_client.startup()
+    await pdf_service.start_executor()
+    await asset_service.start_cache()
+    await ingest_service.start_workers()
+    await rematch_service.resume_pending()
+    yield
+    await rematch_service.stop_worker()
+    await ingest_service.stop_workers()
+    pdf_service.shutdown_executor()
+    minio_service.shutdown_io()
+    await llm_client.shutdown()
+
+
+app = FastAPI(title="简历筛选与人才管理系统", lifespan=lifespan)
 
 # 3) 路由
 app.include_router(screening_router, prefix="/api", tags=["screening"])
 app.include_router(condition_router, prefix="/api", tags=["conditions"])
 app.include_router(talent_router, prefix="/api", tags=["talent"])
+app.include_router(search_router, prefix="/api", tags=["search"])
+app.include_router(asset_router, prefix="/api", tags=["assets"])
 
 # 4) 数据库初始化
 register_tortoise(
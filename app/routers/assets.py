@@ -0,0 +1,93 @@
+import os
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from app.config.settings import ASSET_CACHE_CONTROL
+from app.services import asset_service
+
+router = APIRouter()
+
+
+class AssetUrlOut(BaseModel):
+    url: str
+    expires_in: int
+
+
+@router.get("/assets/url", response_model=AssetUrlOut)
+async def get_asset_url(
+    key: str = Query(..., description="file_object_key / image_object_keys 中的值"),
+    download: bool = Query(False, description="true 时以附件形式下载"),
+):
+    """
+    短时有效的 MinIO 直链，客户端直接下载，不经过 API 进程。
+    """
+    try:
+        url, expires_in = await asset_service.presign(key, download)
+    except asset_service.InvalidAssetKey as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except asset_service.AssetNotFound:
+        raise HTTPException(status_code=404, detail="文件不存在")
+    return {"url": url, "expires_in": expires_in}
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+@router.get("/assets/{object_key:path}")
+async def get_asset(
+    object_key: str,
+    request: Request,
+    download: bool = Query(False, description="true 时以附件形式下载"),
+):
+    """
+    下载简历原文件 / 拆分图片（object_key 如 resumes/xxx.pdf）。
+    支持 ETag / If-None-Match（304）和 Range（206）；常用文件走本地磁盘缓存，大文件从 MinIO 分块转发。
+    """
+    try:
+        meta, fp = await asset_service.open_asset(object_key)
+    except asset_service.InvalidAssetKey as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except asset_service.AssetNotFound:
+        raise HTTPException(status_code=404, detail="文件不存在")
+
+    etag = f'"{meta.etag}"'
+    headers = {"ETag": etag, "Cache-Control": ASSET_CACHE_CONTROL, "Accept-Ranges": "bytes"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        if fp is not None:
+            fp.close()
+        return Response(status_code=304, headers=headers)
+
+    filename = os.path.basename(meta.key)
+    disposition = "attachment" if download else "inline"
+    headers["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range == etag:
+        try:
+            byte_range = asset_service.parse_range(request.headers.get("range"), meta.size)
+        except asset_service.RangeNotSatisfiable:
+            if fp is not None:
+                fp.close()
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{meta.size}"})
+
+    start, end = byte_range or (0, meta.size)
+    headers["Content-Length"] = str(end - start)
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{meta.size}"
+    # 缓存命中时从已打开的文件读取，发送过程中文件被淘汰删除也不受影响
+    body = (
+        asset_service.read_file(fp, start, end)
+        if fp is not None
+        else asset_service.stream(meta, start, end)
+    )
+    return StreamingResponse(
+        body,
+        status_code=206 if byte_range else 200,
+        media_type=meta.content_type,
+        headers=headers,
+    )
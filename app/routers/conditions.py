@@ -4,6 +4,8 @@ from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel, Field
 
 from app.db.models.selection import ScreeningCondition
+from app.services import condition_index, condition_scoring, criteria_compiler, rematch_service
+from app.services.pagination import InvalidCursor, paginate
 
 router = APIRouter()
 
@@ -34,9 +36,20 @@ class ConditionOut(ConditionBase):
         from_attributes = True
 
 
+def _check_criteria(criteria: Optional[dict[str, Any]]):
+    try:
+        criteria_compiler.validate_criteria(criteria)
+        condition_scoring.parse_scoring(criteria)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
 @router.post("/screening/conditions", response_model=ConditionOut)
 async def create_condition(payload: ConditionCreate):
+    _check_criteria(payload.criteria)
     condition = await ScreeningCondition.create(**payload.model_dump())
+    condition_index.invalidate()
+    await rematch_service.schedule(condition.id)
     return condition
 
 
@@ -46,9 +59,16 @@ async def update_condition(condition_id: int, payload: ConditionUpdate):
     if not condition:
         raise HTTPException(status_code=404, detail="筛选条件不存在")
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    changes = payload.model_dump(exclude_unset=True)
+    if "criteria" in changes:
+        _check_criteria(changes["criteria"])
+    for field, value in changes.items():
         setattr(condition, field, value)
     await condition.save()
+    condition_index.invalidate()
+    # 只改名称 / 描述不影响匹配结果
+    if "criteria" in changes or "status" in changes:
+        await rematch_service.schedule(condition.id)
     return condition
 
 
@@ -60,20 +80,26 @@ async def delete_condition(condition_id: int):
     condition.is_deleted = True
     condition.status = "inactive"
     await condition.save()
+    condition_index.invalidate()
+    await rematch_service.schedule(condition.id)
     return {"status": "deleted"}
 
 
 class ConditionListOut(BaseModel):
-    total: int
+    total: Optional[int]
     items: list[ConditionOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 @router.get("/screening/conditions", response_model=ConditionListOut)
 async def list_conditions(
     status: Optional[str] = Query(None, description="过滤状态：active/inactive"),
     include_deleted: bool = Query(False, description="是否包含已删除"),
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, description="兼容旧的页码翻页，深分页请用 cursor"),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="上一次返回的 next_cursor / prev_cursor"),
+    with_total: bool = Query(True, description="false 时不计算 total（返回 null）"),
 ):
     qs = ScreeningCondition.all()
     if status:
@@ -81,9 +107,84 @@ async def list_conditions(
     if not include_deleted:
         qs = qs.filter(is_deleted=False)
 
-    total = await qs.count()
-    records = await qs.order_by("-created_at").offset((page - 1) * page_size).limit(page_size)
-    return {
-        "total": total,
-        "items": records,
-    }
+    try:
+        return await paginate(
+            qs,
+            time_field="created_at",
+            page_size=page_size,
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            total_key=("screening_conditions", status, include_deleted),
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+class RematchJobOut(BaseModel):
+    id: int
+    condition_id: int
+    status: str
+    last_id: int
+    total: int
+    processed: int
+    changed: int
+    error: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+@router.get("/screening/conditions/{condition_id}/rematch", response_model=RematchJobOut)
+async def get_condition_rematch(condition_id: int):
+    """该条件最近一次重新匹配任务的进度。"""
+    job = await rematch_service.latest_job(condition_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="没有重新匹配任务")
+    return job
+
+
+@router.get("/screening/rematch/jobs/{job_id}", response_model=RematchJobOut)
+async def get_rematch_job(job_id: int):
+    job = await rematch_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="任务不存在")
+    return job
+
+
+class ConditionPreviewIn(BaseModel):
+    criteria: Optional[dict[str, Any]] = None
+    limit: int = Field(20, ge=1, le=100)
+    explain: bool = Field(False, description="true 时返回数据库执行计划和用到的索引")
+
+
+class ConditionPreviewItem(BaseModel):
+    id: int
+    extracted_name: Optional[str]
+    extracted_school: Optional[str]
+    extracted_major: Optional[str]
+    extracted_degree: Optional[str]
+    extracted_grad_year: Optional[int]
+
+    class Config:
+        from_attributes = True
+
+
+class ConditionPreviewOut(BaseModel):
+    total: int
+    items: list[ConditionPreviewItem]
+    sql: str
+    plan: Optional[Any] = None
+    indexes_used: Optional[list[str]] = None
+
+
+@router.post("/screening/conditions/preview", response_model=ConditionPreviewOut)
+async def preview_condition(payload: ConditionPreviewIn):
+    """
+    条件编辑器的「预览命中」：criteria 编译成一条 SQL 在数据库里求值（不依赖入库时的匹配快照），
+    支持 all / any / not 组合子。返回命中总数和最新入库的 limit 条简历。
+    """
+    try:
+        return await criteria_compiler.preview(payload.criteria, payload.limit, payload.explain)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
@@ -1,7 +1,17 @@
-from typing import Optional
-from fastapi import APIRouter, UploadFile, File, Query
+import time
+from typing import Optional, Dict, List
+from fastapi import APIRouter, UploadFile, File, Query, HTTPException, Response
 from pydantic import BaseModel
-from app.services.screening_service import upload_and_parse_pdf, list_screening_resumes
+from app.services.screening_service import (
+    upload_and_parse_pdf,
+    upload_and_parse_batch,
+    list_screening_resumes,
+    duplicate_report,
+)
+from app.db.models.screening import ScreeningResume
+from app.db.models.selection import ScreeningCondition
+from app.services import condition_scoring, ingest_service, llm_service
+from app.services.pagination import InvalidCursor
 
 router = APIRouter()
 
@@ -26,28 +36,216 @@ class ScreeningOut(BaseModel):
 
 
 class ScreeningListOut(BaseModel):
-    total: int
+    total: Optional[int]
     items: list[ScreeningOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class IngestJobOut(BaseModel):
+    job_id: str
+    filename: Optional[str]
+    status: str
+    timings: Dict[str, float]
+    screening_id: Optional[int]
+    duplicate: bool
+    error: Optional[str]
+    created_at: float
+    started_at: Optional[float]
+    finished_at: Optional[float]
 
 
 @router.post("/screening/upload")
-async def upload_screening_pdf(file: UploadFile = File(...)):
+async def upload_screening_pdf(
+    response: Response,
+    file: UploadFile = File(...),
+    async_mode: bool = Query(False, description="true 时存储后立即返回 202 和 job_id"),
+):
     """
     上传简历PDF文件并解析
     
     Args:
         file: 上传的PDF文件
+        async_mode: 是否走异步入库队列
         
     Returns:
-        screening_id: 创建的简历记录ID
+        screening_id: 创建的简历记录ID（同步模式）
+        job_id: 入库任务ID（异步模式）
         status: 上传状态
     """
     # 验证文件类型
-    if not file.filename.endswith('.pdf'):
+    if not file.filename or not file.filename.lower().endswith('.pdf'):
         raise HTTPException(status_code=400, detail="只支持PDF格式文件")
-    
-    screening = await upload_and_parse_pdf(file)
+
+    if async_mode:
+        try:
+            job = await ingest_service.submit(file)
+        except ingest_service.IngestQueueFull as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
+        response.status_code = 202
+        return {
+            "job_id": job.id,
+            "status": job.status,
+        }
+
+    screening, duplicate = await upload_and_parse_pdf(file)
     return {
         "screening_id": screening.id,
-        "status": "uploaded",
-    }
\ No newline at end of file
+        "status": "duplicate" if duplicate else "uploaded",
+    }
+
+
+class BatchItemOut(BaseModel):
+    filename: str
+    status: str  # uploaded / duplicate / failed / skipped
+    screening_id: Optional[int]
+    error: Optional[str]
+    timings: Dict[str, float]
+
+
+class BatchUploadOut(BaseModel):
+    total: int
+    uploaded: int
+    duplicate: int
+    failed: int
+    skipped: int
+    items: list[BatchItemOut]
+
+
+@router.post("/screening/upload/batch", response_model=BatchUploadOut)
+async def upload_screening_batch(
+    files: List[UploadFile] = File(...),
+    llm_batching: bool = Query(True, description="多份简历合并为一次LLM请求"),
+):
+    """
+    批量上传简历：支持多个PDF，或包含PDF的ZIP压缩包。
+    返回逐个文件的处理结果清单。
+    """
+    items = await upload_and_parse_batch(files, llm_batching=llm_batching)
+    counts = {"uploaded": 0, "duplicate": 0, "failed": 0, "skipped": 0}
+    for item in items:
+        counts[item["status"]] = counts.get(item["status"], 0) + 1
+    return {"total": len(items), **counts, "items": items}
+
+
+@router.get("/screening/resumes", response_model=ScreeningListOut)
+async def list_screenings(
+    name: Optional[str] = Query(None),
+    school: Optional[str] = Query(None),
+    major: Optional[str] = Query(None),
+    degree: Optional[str] = Query(None),
+    is_screened: Optional[bool] = Query(None),
+    matched_condition_id: Optional[int] = Query(None, description="只看命中该筛选条件的简历"),
+    page: int = Query(1, ge=1, description="兼容旧的页码翻页，深分页请用 cursor"),
+    page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="上一次返回的 next_cursor / prev_cursor"),
+    with_total: bool = Query(True, description="false 时不计算 total（返回 null）"),
+):
+    try:
+        return await list_screening_resumes(
+            name=name,
+            school=school,
+            major=major,
+            degree=degree,
+            is_screened=is_screened,
+            matched_condition_id=matched_condition_id,
+            page=page,
+            page_size=page_size,
+            cursor=cursor,
+            with_total=with_total,
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@router.get("/screening/jobs/{job_id}", response_model=IngestJobOut)
+async def get_ingest_job(job_id: str):
+    job = ingest_service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="入库任务不存在")
+    return IngestJobOut(
+        job_id=job.id,
+        filename=job.filename,
+        status=job.status,
+        timings=job.timings,
+        screening_id=job.screening_id,
+        duplicate=job.duplicate,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+class DuplicateTopOut(BaseModel):
+    screening_id: int
+    upload_count: int
+
+
+class DuplicateReportOut(BaseModel):
+    uploads: int
+    unique_resumes: int
+    duplicate_hits: int
+    hit_rate: float
+    top: list[DuplicateTopOut]
+
+
+@router.get("/screening/duplicates/report", response_model=DuplicateReportOut)
+async def get_duplicate_report(top: int = Query(10, ge=1, le=100)):
+    """
+    重复上传命中率：uploads 为总上传次数，duplicate_hits 为直接复用已有记录的次数。
+    """
+    return await duplicate_report(top=top)
+
+
+@router.get("/screening/llm/stats")
+async def get_llm_stats():
+    """
+    LLM 抽取运行指标（缓存命中 / 未命中等）。
+    """
+    return llm_service.get_stats()
+
+
+class RankedScreeningOut(BaseModel):
+    screening: ScreeningOut
+    score: float
+    breakdown: Dict[str, float]
+
+
+class ConditionRankingOut(BaseModel):
+    condition_id: int
+    total: int  # 通过必选条件的简历数
+    took_ms: float
+    items: list[RankedScreeningOut]
+
+
+@router.get("/screening/conditions/{condition_id}/ranking", response_model=ConditionRankingOut)
+async def rank_screenings_for_condition(
+    condition_id: int,
+    top_n: int = Query(50, ge=1, le=500),
+):
+    """
+    条件下最合适的前 top_n 份简历：必选条件过滤后按 criteria.scoring 加权打分，
+    breakdown 为各分项得分（0~1）。未配置 scoring 时按入库时间倒序。
+    """
+    condition = await ScreeningCondition.get_or_none(id=condition_id, is_deleted=False)
+    if not condition:
+        raise HTTPException(status_code=404, detail="筛选条件不存在")
+
+    columns = await condition_scoring.get_columns()
+    start = time.perf_counter()
+    try:
+        total, ranked = condition_scoring.rank(columns, condition, top_n)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    took_ms = (time.perf_counter() - start) * 1000
+
+    screenings = {
+        s.id: s for s in await ScreeningResume.filter(id__in=[r["screening_id"] for r in ranked])
+    }
+    items = [
+        {"screening": screenings[r["screening_id"]], "score": r["score"], "breakdown": r["breakdown"]}
+        for r in ranked
+        if r["screening_id"] in screenings
+    ]
+    return {"condition_id": condition_id, "total": total, "took_ms": round(took_ms, 3), "items": items}
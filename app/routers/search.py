@@ -0,0 +1,41 @@
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+
+from app.services import search_service
+
+router = APIRouter()
+
+
+class SearchHitOut(BaseModel):
+    kind: str
+    ref_id: int
+    title: Optional[str]
+    score: float
+    snippet: str
+
+
+class SearchOut(BaseModel):
+    query: str
+    took_ms: float
+    items: list[SearchHitOut]
+
+
+@router.get("/search", response_model=SearchOut)
+async def search_resumes(
+    q: str = Query(..., min_length=1, max_length=200, description="空格分隔的多个词，需全部命中"),
+    kind: Optional[Literal["screening", "talent"]] = Query(None, description="为空时同时搜索简历和人才"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    全文检索简历原文与人才，按相关度排序，snippet 中命中词用 <mark> 标出。
+    """
+    start = time.perf_counter()
+    items = await search_service.search(q, kind=kind, limit=limit)
+    return {
+        "query": q,
+        "took_ms": round((time.perf_counter() - start) * 1000, 2),
+        "items": items,
+    }
@@ -184,15 +184,19 @@ async def get_knowledge_graph():
 
     return {"nodes": nodes, "edges": edges}
 
-from typing import Optional, Dict, Any
+import hashlib
+import time
+from typing import Optional, Dict, Any, Literal
 
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 
-from app.services.talent_service import screening_to_talent_with_skills
+from app.services.talent_service import screening_to_talent_with_skills, screenings_to_talents
 from app.db.models.talent import Talent
-from app.db.models.skill import Skill
-from app.db.models.talent_skill import TalentSkill
+from app.config.settings import BULK_PROMOTE_MAX, GRAPH_MAX_NODES
+from app.services import graph_service, similarity_service, skill_index
+from app.services.pagination import InvalidCursor, paginate
 
 router = APIRouter()
 
@@ -220,8 +224,10 @@ class TalentOut(BaseModel):
 
 
 class TalentListOut(BaseModel):
-    total: int
+    total: Optional[int]
     items: list[TalentOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
 
 
 @router.post("/talents/from-screening", response_model=TalentOut)
@@ -232,6 +238,40 @@ async def create_from_screening(payload: TalentCreateFromScreening):
     return talent
 
 
+class TalentBulkCreateFromScreening(BaseModel):
+    items: list[TalentCreateFromScreening] = Field(..., min_length=1, max_length=BULK_PROMOTE_MAX)
+
+
+class TalentBulkItemOut(BaseModel):
+    screening_id: int
+    status: str  # promoted / failed
+    talent_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class TalentBulkOut(BaseModel):
+    total: int
+    promoted: int
+    failed: int
+    items: list[TalentBulkItemOut]
+
+
+@router.post("/talents/from-screening/bulk", response_model=TalentBulkOut)
+async def bulk_create_from_screening(payload: TalentBulkCreateFromScreening):
+    """
+    批量把筛查记录转为人才。单条记录出错（不存在 / 已入库 / 缺少姓名）只在对应 item 里报告。
+    """
+    results = await screenings_to_talents(
+        [(item.screening_id, item.skill_names) for item in payload.items]
+    )
+    items = [
+        {**r, "status": "failed" if r["error"] else "promoted"}
+        for r in results
+    ]
+    failed = sum(1 for i in items if i["status"] == "failed")
+    return {"total": len(items), "promoted": len(items) - failed, "failed": failed, "items": items}
+
+
 @router.get("/talents", response_model=TalentListOut)
 async def list_talents(
     name: Optional[str] = Query(None),
@@ -240,8 +280,10 @@ async def list_talents(
     degree: Optional[str] = Query(None),
     grad_year_min: Optional[int] = Query(None),
     grad_year_max: Optional[int] = Query(None),
-    page: int = Query(1, ge=1),
+    page: int = Query(1, ge=1, description="兼容旧的页码翻页，深分页请用 cursor"),
     page_size: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="上一次返回的 next_cursor / prev_cursor"),
+    with_total: bool = Query(True, description="false 时不计算 total（返回 null）"),
 ):
     qs = Talent.all()
     if name:
@@ -257,37 +299,158 @@ async def list_talents(
     if grad_year_max is not None:
         qs = qs.filter(grad_year__lte=grad_year_max)
 
-    total = await qs.count()
-    items = await qs.order_by("-at_time").offset((page - 1) * page_size).limit(page_size)
-    return {"total": total, "items": items}
+    try:
+        return await paginate(
+            qs,
+            time_field="at_time",
+            page_size=page_size,
+            cursor=cursor,
+            page=page,
+            with_total=with_total,
+            total_key=("talents", name, school, major, degree, grad_year_min, grad_year_max),
+        )
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
 
 
 class GraphResponse(BaseModel):
     nodes: list[Dict[str, Any]]
     edges: list[Dict[str, Any]]
+    truncated: bool = False
 
 
 @router.get("/talents/graph", response_model=GraphResponse)
-async def get_knowledge_graph():
-    nodes: list[Dict[str, Any]] = []
-    edges: list[Dict[str, Any]] = []
+async def get_knowledge_graph(
+    request: Request,
+    center: Optional[str] = Query(None, description="中心节点，如 talent-1 / skill-2；为空时返回整张图"),
+    hops: int = Query(1, ge=1, le=4, description="以 center 为中心的跳数"),
+    min_skill_degree: Optional[int] = Query(None, ge=0, description="只保留关联人才数不少于该值的技能"),
+    max_skill_degree: Optional[int] = Query(None, ge=0, description="只保留关联人才数不多于该值的技能"),
+    limit: int = Query(GRAPH_MAX_NODES, ge=1, le=GRAPH_MAX_NODES, description="节点数上限"),
+    format: Literal["json", "ndjson"] = Query("json", description="ndjson 时流式输出整张图"),
+):
+    """
+    知识图谱。不带任何参数时返回缓存的整张图（带 ETag，可用 If-None-Match 得到 304）；
+    超过 limit 时 truncated 为 true。整张图很大时用 format=ndjson 流式获取。
+    """
+    if format == "ndjson":
+        return StreamingResponse(graph_service.stream_ndjson(), media_type="application/x-ndjson")
+
+    snapshot = await graph_service.get_snapshot()
+    params = (center, hops, min_skill_degree, max_skill_degree, limit)
+    full = center is None and min_skill_degree is None and max_skill_degree is None
+    full = full and len(snapshot.talents) + len(snapshot.skills) <= limit
+    etag = f'"{snapshot.etag}"' if full else (
+        f'"{snapshot.etag}-{hashlib.sha1(repr(params).encode()).hexdigest()[:8]}"'
+    )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
 
-    talents = await Talent.all()
-    skills = await Skill.all()
-    talent_skills = await TalentSkill.all()
+    if full:
+        return Response(
+            content=snapshot.full_json(), media_type="application/json", headers={"ETag": etag}
+        )
+    if center is not None:
+        try:
+            graph = snapshot.neighborhood(center, hops, limit, min_skill_degree, max_skill_degree)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        except KeyError:
+            raise HTTPException(status_code=404, detail="节点不存在")
+    else:
+        graph = snapshot.filtered(limit, min_skill_degree, max_skill_degree)
+    return JSONResponse(content=graph, headers={"ETag": etag})
 
-    for t in talents:
-        nodes.append({"id": f"talent-{t.id}", "label": t.name or "未命名", "type": "talent"})
-    for s in skills:
-        nodes.append({"id": f"skill-{s.id}", "label": s.name, "type": "skill"})
 
-    for ts in talent_skills:
-        edges.append(
-            {
-                "source": f"talent-{ts.talent_id}",
-                "target": f"skill-{ts.skill_id}",
-                "label": "has_skill",
-            }
-        )
+class SkillSearchHit(BaseModel):
+    talent: TalentOut
+    score: int  # 命中的 all / any 技能数
+    matched_skills: list[str]
 
-    return {"nodes": nodes, "edges": edges}
+
+class SkillSearchOut(BaseModel):
+    total: int
+    took_ms: float
+    unknown_skills: list[str]
+    items: list[SkillSearchHit]
+
+
+@router.get("/talents/search/skills", response_model=SkillSearchOut)
+async def search_talents_by_skills(
+    all_skills: list[str] = Query([], alias="all", description="必须全部具备的技能（AND）"),
+    any_skills: list[str] = Query([], alias="any", description="至少具备其一的技能（OR）"),
+    none_skills: list[str] = Query([], alias="none", description="不能具备的技能（NOT）"),
+    top_k: int = Query(20, ge=1, le=200),
+):
+    """
+    多技能组合检索，按命中的 all / any 技能数降序，同分时新入库的人才优先。
+    all 里有不认识的技能时结果为空；any / none 里不认识的技能忽略，均在 unknown_skills 中列出。
+    """
+    if not (all_skills or any_skills or none_skills):
+        raise HTTPException(status_code=400, detail="至少指定一个技能条件")
+    index = await skill_index.get_index()
+
+    start = time.perf_counter()
+    all_keys, unknown_all = index.resolve(all_skills)
+    any_keys, unknown_any = index.resolve(any_skills)
+    none_keys, unknown_none = index.resolve(none_skills)
+    unknown = unknown_all + unknown_any + unknown_none
+    if unknown_all or (any_skills and not any_keys):
+        total, ranked = 0, []
+    else:
+        total, ranked = index.search(all_keys, any_keys, none_keys, top_k)
+    took_ms = (time.perf_counter() - start) * 1000
+
+    talents = {t.id: t for t in await Talent.filter(id__in=[tid for tid, _ in ranked])}
+    positive = all_keys + any_keys
+    items = [
+        {
+            "talent": talents[tid],
+            "score": score,
+            "matched_skills": index.talent_skills(tid, positive),
+        }
+        for tid, score in ranked
+        if tid in talents
+    ]
+    return {"total": total, "took_ms": round(took_ms, 3), "unknown_skills": unknown, "items": items}
+
+
+class SimilarTalentHit(BaseModel):
+    talent: TalentOut
+    score: float  # 余弦相似度（0~1）
+    shared_skills: list[str]
+
+
+class SimilarTalentsOut(BaseModel):
+    talent_id: int
+    took_ms: float
+    items: list[SimilarTalentHit]
+
+
+@router.get("/talents/{talent_id}/similar", response_model=SimilarTalentsOut)
+async def get_similar_talents(
+    talent_id: int,
+    top_k: int = Query(10, ge=1, le=100),
+):
+    """
+    与指定人才最相似的人才（技能 TF-IDF + 学校 / 专业 / 学位，余弦相似度降序），
+    shared_skills 为两人共同具备的技能，稀有技能在前。
+    """
+    start = time.perf_counter()
+    ranked = await similarity_service.similar(talent_id, top_k)
+    took_ms = (time.perf_counter() - start) * 1000
+    if ranked is None:
+        raise HTTPException(status_code=404, detail="人才不存在")
+
+    index = await similarity_service.get_index()
+    talents = {t.id: t for t in await Talent.filter(id__in=[tid for tid, _ in ranked])}
+    items = [
+        {
+            "talent": talents[tid],
+            "score": score,
+            "shared_skills": index.shared_skills(talent_id, tid),
+        }
+        for tid, score in ranked
+        if tid in talents
+    ]
+    return {"talent_id": talent_id, "took_ms": round(took_ms, 3), "items": items}
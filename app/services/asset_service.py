@@ -0,0 +1,314 @@
+# app/services/asset_service.py
+"""
+简历原文件 / 拆分图片的读取：本地磁盘 LRU 缓存 + MinIO 流式回源 + 预签名地址。
+
+对象键即 file_object_key / image_object_keys 里的值（"resumes/<uuid>.pdf"、"resume-images/<uuid>_0.png"），
+只允许这两个 bucket。对象键含 uuid、写入后不再覆盖，所以缓存命中时不回 MinIO 校验。
+
+缓存目录（ASSET_CACHE_DIR）：
+- 每个对象一个数据文件 + 一个 .json 元数据（etag / content_type / size），文件名为对象键的 sha1；
+- 进程内 OrderedDict 维护访问顺序，总大小超过 ASSET_CACHE_MAX_BYTES 时淘汰最久未访问的；
+- 命中时 touch 数据文件，启动时按 mtime 恢复顺序，重启后缓存仍然有效；
+- 同一对象并发未命中只回源一次。
+命中时返回已打开的文件对象，之后被淘汰删除也不影响正在发送的响应（Windows 上删除失败的留到下次启动清理）。
+多个工作进程共用同一目录时各自维护 LRU，上限按进程计算，磁盘占用最多为 进程数 × ASSET_CACHE_MAX_BYTES；
+启动扫描只清理超过 _STALE_SECONDS 的临时文件，不会删掉其他进程正在下载的文件。
+超过 ASSET_CACHE_MAX_OBJECT_BYTES 的对象不进缓存，由调用方直接从 MinIO 流式转发。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, BinaryIO, Optional
+
+from app.config.settings import (
+    ASSET_CACHE_DIR,
+    ASSET_CACHE_MAX_BYTES,
+    ASSET_CACHE_MAX_OBJECT_BYTES,
+    ASSET_PRESIGN_TTL,
+    ASSET_STREAM_CHUNK,
+)
+from app.services import minio_service
+from app.services.screening_service import RESUME_BUCKET, RESUME_IMAGE_BUCKET
+
+ALLOWED_BUCKETS = (RESUME_BUCKET, RESUME_IMAGE_BUCKET)
+# 超过该秒数的临时文件 / 缺元数据的数据文件才视为残留（更新的可能是其他进程正在下载的）
+_STALE_SECONDS = 3600
+
+
+class InvalidAssetKey(ValueError):
+    """对象键格式不对或不在允许的 bucket 里。"""
+
+
+class AssetNotFound(LookupError):
+    """对象不存在。"""
+
+
+class RangeNotSatisfiable(ValueError):
+    """Range 超出文件大小。"""
+
+
+@dataclass
+class AssetMeta:
+    object_key: str
+    size: int
+    etag: str
+    content_type: str
+
+    @property
+    def bucket(self) -> str:
+        return self.object_key.split("/", 1)[0]
+
+    @property
+    def key(self) -> str:
+        return self.object_key.split("/", 1)[1]
+
+
+def split_key(object_key: str) -> tuple[str, str]:
+    bucket, _, key = object_key.partition("/")
+    if bucket not in ALLOWED_BUCKETS or not key or ".." in key.split("/"):
+        raise InvalidAssetKey("无效的文件键")
+    return bucket, key
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    单段 "bytes=start-end" / "bytes=start-" / "bytes=-suffix" -> [start, end)；
+    多段或格式不对时返回 None（按整份返回），超出文件大小时抛 RangeNotSatisfiable。
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    raw_start, sep, raw_end = header[len("bytes="):].strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if raw_start == "":
+            suffix = int(raw_end)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(size)
+            return max(size - suffix, 0), size
+        start = int(raw_start)
+        end = int(raw_end) + 1 if raw_end else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        raise RangeNotSatisfiable(size)
+    return start, min(end, size)
+
+
+class AssetCache:
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, AssetMeta]" = OrderedDict()
+        self._size = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def _name(object_key: str) -> str:
+        return hashlib.sha1(object_key.encode()).hexdigest()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _remove(self, name: str):
+        # 先删元数据：数据文件删不掉时（Windows 上仍被打开），下次启动扫描会把它当残留清理
+        for path in (self._path(name) + ".json", self._path(name)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _scan(self):
+        """启动时恢复缓存索引，清理残留文件。"""
+        found = []
+        names = set()
+        stale_before = time.time() - _STALE_SECONDS
+        for entry in os.scandir(self.root):
+            if entry.name.endswith(".json"):
+                names.add(entry.name[: -len(".json")])
+            elif entry.name.endswith((".tmp", ".part.minio")):  # 下载中途退出留下的临时文件
+                self._remove_stale(entry, stale_before)
+        for name in names:
+            try:
+                with open(self._path(name) + ".json", encoding="utf-8") as f:
+                    meta = AssetMeta(**json.load(f))
+                st = os.stat(self._path(name))
+            except (OSError, ValueError, TypeError):
+                self._remove(name)
+                continue
+            if st.st_size != meta.size:
+                self._remove(name)
+                continue
+            found.append((st.st_mtime, name, meta))
+        for entry in os.scandir(self.root):
+            if "." not in entry.name and entry.name not in names:
+                self._remove_stale(entry, stale_before)
+        for _, name, meta in sorted(found, key=lambda x: x[0]):
+            self._entries[name] = meta
+            self._size += meta.size
+        self._evict()
+
+    @staticmethod
+    def _remove_stale(entry: os.DirEntry, stale_before: float):
+        try:
+            if entry.stat().st_mtime < stale_before:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def get(self, object_key: str) -> Optional[tuple[BinaryIO, AssetMeta]]:
+        """命中时返回 (已打开的数据文件, 元数据)，由调用方关闭。"""
+        name = self._name(object_key)
+        meta = self._entries.get(name)
+        if meta is None:
+            return None
+        path = self._path(name)
+        try:
+            fp = open(path, "rb")
+        except OSError:  # 被外部清理了
+            self._drop(name)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._entries.move_to_end(name)
+        return fp, meta
+
+    def _drop(self, name: str):
+        meta = self._entries.pop(name, None)
+        if meta is not None:
+            self._size -= meta.size
+        self._remove(name)
+
+    def _evict(self, keep: Optional[str] = None):
+        while self._size > self.max_bytes and self._entries:
+            name = next(iter(self._entries))
+            if name == keep:
+                break
+            self._drop(name)
+
+    async def fill(self, meta: AssetMeta) -> str:
+        """回源下载到缓存，返回本地路径；同一对象并发调用只下载一次。"""
+        name = self._name(meta.object_key)
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._download(name, meta))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _: self._inflight.pop(name, None))
+        return await asyncio.shield(task)
+
+    async def _download(self, name: str, meta: AssetMeta) -> str:
+        path = self._path(name)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            await minio_service.download_path(meta.bucket, meta.key, tmp)
+            os.replace(tmp, path)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(meta), f)
+            os.replace(tmp, path + ".json")
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        if name in self._entries:
+            self._size -= self._entries.pop(name).size
+        self._entries[name] = meta
+        self._size += meta.size
+        self._evict(keep=name)
+        return path
+
+
+_cache: Optional[AssetCache] = None
+
+
+def get_cache() -> AssetCache:
+    global _cache
+    if _cache is None:
+        root = ASSET_CACHE_DIR or os.path.join(tempfile.gettempdir(), "resume-asset-cache")
+        _cache = AssetCache(root, ASSET_CACHE_MAX_BYTES)
+    return _cache
+
+
+async def start_cache():
+    """应用启动时在线程里扫描缓存目录，避免第一个请求阻塞事件循环。"""
+    await asyncio.to_thread(get_cache)
+
+
+async def open_asset(object_key: str) -> tuple[AssetMeta, Optional[BinaryIO]]:
+    """
+    返回 (元数据, 已打开的缓存文件)。文件为 None 表示对象不进缓存，调用方用 stream() 转发；
+    文件对象交给 read_file() 读完后关闭，不读时由调用方关闭。
+    对象键不合法抛 InvalidAssetKey，不存在抛 AssetNotFound。
+    """
+    bucket, key = split_key(object_key)
+    cache = get_cache()
+    hit = cache.get(object_key)
+    if hit is not None:
+        return hit[1], hit[0]
+
+    stat = await minio_service.stat_object(bucket, key)
+    if stat is None:
+        raise AssetNotFound(object_key)
+    meta = AssetMeta(
+        object_key=object_key,
+        size=stat.size,
+        etag=(stat.etag or "").strip('"'),
+        content_type=stat.content_type or "application/octet-stream",
+    )
+    if meta.size > ASSET_CACHE_MAX_OBJECT_BYTES:
+        return meta, None
+    try:
+        await cache.fill(meta)
+    except OSError:  # 写缓存失败（磁盘满、Windows 上旧文件仍被打开），直接从 MinIO 转发
+        return meta, None
+    # 下载完成到这里之间可能已被其他请求的下载淘汰，此时同样直接转发
+    hit = cache.get(object_key)
+    return meta, hit[0] if hit is not None else None
+
+
+async def read_file(fp: BinaryIO, start: int, end: int) -> AsyncIterator[bytes]:
+    """从已打开的缓存文件分块读取 [start, end)，结束后关闭文件。"""
+    try:
+        fp.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = await asyncio.to_thread(fp.read, min(ASSET_STREAM_CHUNK, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fp.close()
+
+
+def stream(meta: AssetMeta, start: int, end: int) -> AsyncIterator[bytes]:
+    """从 MinIO 分块读取 [start, end)。"""
+    return minio_service.stream_object(
+        meta.bucket, meta.key, offset=start, length=end - start, chunk_size=ASSET_STREAM_CHUNK
+    )
+
+
+async def presign(object_key: str, download: bool = False) -> tuple[str, int]:
+    """短时有效的 MinIO 直链，返回 (url, 有效秒数)。"""
+    bucket, key = split_key(object_key)
+    if await minio_service.stat_object(bucket, key) is None:
+        raise AssetNotFound(object_key)
+    disposition = "attachment" if download else "inline"
+    url = await minio_service.presigned_get_url(
+        bucket,
+        key,
+        ASSET_PRESIGN_TTL,
+        response_headers={
+            "response-content-disposition": f'{disposition}; filename="{os.path.basename(key)}"'
+        },
+    )
+    return url, ASSET_PRESIGN_TTL
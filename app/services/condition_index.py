@@ -0,0 +1,269 @@
+# app/services/condition_index.py
+"""
+入库时的条件匹配引擎。
+
+把所有 active 条件一次性编译成索引，匹配一份简历只做 O(字段数) 次查表：
+- schools / majors / degrees：值 -> 条件位图（Python int 当 bitset，第 i 位对应第 i 个条件）；
+- grad_year_min / max：按阈值排序的前缀 / 后缀位图，bisect 定位；
+- name_keywords：Aho-Corasick 自动机，一次扫描姓名拿到所有命中的关键词。
+每个字段得到「通过该字段的条件位图」，全部按位与即为结果。
+
+索引缓存在进程内，条件增删改时由 routers/conditions.py 调用 invalidate()；
+另有 CONDITION_INDEX_TTL 兜底，多进程部署时其他进程最多延迟这么久看到变更。
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Dict, List
+
+from app.config.settings import CONDITION_INDEX_TTL
+from app.db.models.selection import ScreeningCondition
+
+_SET_FIELDS = (("schools", "school"), ("majors", "major"), ("degrees", "degree"))
+COMBINATORS = ("all", "any", "not")
+
+
+def _match_text(value: str | None, keywords: List[str] | None) -> bool:
+    if not keywords:
+        return True
+    if not value:
+        return False
+    return any(k.lower() in value.lower() for k in keywords if k)
+
+
+def match_condition(result: Dict[str, Any], condition: ScreeningCondition) -> bool:
+    """逐条判断（未能编译进索引的条件走这里）。"""
+    return match_criteria(result, condition.criteria or {})
+
+
+def match_criteria(result: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
+    """
+    同一层的字段之间是 AND；组合子可嵌套：
+    "all": [子条件...]（全部满足）、"any": [子条件...]（至少一个满足）、"not": 子条件（不满足）。
+    """
+    if not criteria:
+        return True
+
+    if not _match_text(result.get("name"), criteria.get("name_keywords")):
+        return False
+    if criteria.get("schools") and (result.get("school") not in criteria["schools"]):
+        return False
+    if criteria.get("majors") and (result.get("major") not in criteria["majors"]):
+        return False
+    if criteria.get("degrees") and (result.get("degree") not in criteria["degrees"]):
+        return False
+
+    gy = result.get("grad_year")
+    min_year = criteria.get("grad_year_min")
+    max_year = criteria.get("grad_year_max")
+    if min_year is not None and gy is not None and gy < min_year:
+        return False
+    if max_year is not None and gy is not None and gy > max_year:
+        return False
+
+    if criteria.get("all") and not all(match_criteria(result, c) for c in criteria["all"]):
+        return False
+    if criteria.get("any") and not any(match_criteria(result, c) for c in criteria["any"]):
+        return False
+    if criteria.get("not") and match_criteria(result, criteria["not"]):
+        return False
+    return True
+
+
+class _AhoCorasick:
+    """多关键词子串匹配：关键词 -> 条件位图。"""
+
+    def __init__(self, keywords: Dict[str, int]):
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[int] = [0]
+        for word, mask in keywords.items():
+            node = 0
+            for ch in word:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(0)
+                node = nxt
+            self._out[node] |= mask
+
+        # BFS 构造失败指针，根的子节点失败指针为根
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def search(self, text: str) -> int:
+        mask = 0
+        node = 0
+        for ch in text:
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            mask |= self._out[node]
+        return mask
+
+
+def is_plain_list(value: Any) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(v, (str, int, float, type(None))) for v in value
+    )
+
+
+def _is_year(value: Any) -> bool:
+    return value is None or (isinstance(value, (int, float)) and not isinstance(value, bool))
+
+
+class ConditionIndex:
+    def __init__(self, conditions: List[ScreeningCondition]):
+        self.ids: list[int] = []
+        self.fallback: list[ScreeningCondition] = []
+        self.full = 0  # 全部已编译条件
+
+        compiled = []
+        for c in conditions:
+            if self._compilable(c.criteria or {}):
+                compiled.append(c)
+            else:
+                self.fallback.append(c)
+
+        # 每个字段：不限制该字段的条件位图 + 值 -> 位图
+        self._free = {field: 0 for _, field in _SET_FIELDS}
+        self._values: dict[str, dict[Any, int]] = {field: {} for _, field in _SET_FIELDS}
+        self._name_free = 0
+        keywords: dict[str, int] = {}
+        mins: list[tuple[float, int]] = []
+        maxs: list[tuple[float, int]] = []
+
+        for pos, c in enumerate(compiled):
+            bit = 1 << pos
+            self.ids.append(c.id)
+            self.full |= bit
+            criteria = c.criteria or {}
+
+            for key, field in _SET_FIELDS:
+                values = criteria.get(key)
+                if not values:
+                    self._free[field] |= bit
+                    continue
+                for v in values:
+                    self._values[field][v] = self._values[field].get(v, 0) | bit
+
+            name_keywords = criteria.get("name_keywords")
+            if not name_keywords:
+                self._name_free |= bit
+            else:
+                for k in name_keywords:
+                    if k:
+                        keywords[k.lower()] = keywords.get(k.lower(), 0) | bit
+
+            if criteria.get("grad_year_min") is not None:
+                mins.append((criteria["grad_year_min"], bit))
+            if criteria.get("grad_year_max") is not None:
+                maxs.append((criteria["grad_year_max"], bit))
+
+        self._automaton = _AhoCorasick(keywords)
+
+        # grad_year_min 升序，_min_prefix[i] = 前 i 个阈值的条件位图（min <= gy 的条件）
+        mins.sort(key=lambda x: x[0])
+        self._min_keys = [m for m, _ in mins]
+        self._min_prefix = [0]
+        for _, bit in mins:
+            self._min_prefix.append(self._min_prefix[-1] | bit)
+        self._min_free = self.full & ~self._min_prefix[-1]
+
+        # grad_year_max 升序，_max_suffix[i] = 第 i 个及之后的条件位图（max >= gy 的条件）
+        maxs.sort(key=lambda x: x[0])
+        self._max_keys = [m for m, _ in maxs]
+        self._max_suffix = [0] * (len(maxs) + 1)
+        for i in range(len(maxs) - 1, -1, -1):
+            self._max_suffix[i] = self._max_suffix[i + 1] | maxs[i][1]
+        self._max_free = self.full & ~self._max_suffix[0]
+
+    @staticmethod
+    def _compilable(criteria: dict) -> bool:
+        if not isinstance(criteria, dict):
+            return False
+        # 带组合子的条件不进位图索引
+        if any(criteria.get(key) for key in COMBINATORS):
+            return False
+        for key, _ in _SET_FIELDS:
+            if criteria.get(key) and not is_plain_list(criteria[key]):
+                return False
+        keywords = criteria.get("name_keywords")
+        if keywords and not (isinstance(keywords, list) and all(isinstance(k, str) for k in keywords)):
+            return False
+        return _is_year(criteria.get("grad_year_min")) and _is_year(criteria.get("grad_year_max"))
+
+    def match(self, result: Dict[str, Any]) -> list[int]:
+        mask = self.full
+
+        for _, field in _SET_FIELDS:
+            value = result.get(field)
+            try:
+                hit = self._values[field].get(value, 0)
+            except TypeError:  # 不可哈希的抽取值
+                hit = 0
+            mask &= self._free[field] | hit
+            if not mask:
+                break
+
+        if mask:
+            name = result.get("name")
+            name_hit = self._automaton.search(name.lower()) if isinstance(name, str) and name else 0
+            mask &= self._name_free | name_hit
+
+        gy = result.get("grad_year")
+        if mask and _is_year(gy) and gy is not None:
+            lo = self._min_prefix[bisect.bisect_right(self._min_keys, gy)]
+            hi = self._max_suffix[bisect.bisect_left(self._max_keys, gy)]
+            mask &= (self._min_free | lo) & (self._max_free | hi)
+
+        matched = []
+        while mask:
+            low = mask & -mask
+            matched.append(self.ids[low.bit_length() - 1])
+            mask ^= low
+        matched.extend(c.id for c in self.fallback if match_condition(result, c))
+        return sorted(matched)
+
+
+_index: ConditionIndex | None = None
+_built_at = 0.0
+_version = 0  # 每次 invalidate 加一，避免把变更前查出的条件缓存下来
+_lock = asyncio.Lock()
+
+
+def invalidate():
+    """条件增删改后调用，下次匹配时重建索引。"""
+    global _index, _version
+    _index = None
+    _version += 1
+
+
+async def get_index() -> ConditionIndex:
+    global _index, _built_at
+    index = _index
+    if index is not None and time.monotonic() - _built_at < CONDITION_INDEX_TTL:
+        return index
+    async with _lock:
+        if _index is not None and time.monotonic() - _built_at < CONDITION_INDEX_TTL:
+            return _index
+        version = _version
+        conditions = await ScreeningCondition.filter(status="active", is_deleted=False).all()
+        index = ConditionIndex(conditions)
+        if version == _version:
+            _index = index
+            _built_at = time.monotonic()
+        return index
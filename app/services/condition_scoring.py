@@ -0,0 +1,307 @@
+# app/services/condition_scoring.py
+"""
+筛选条件的加权评分排序（"条件 X 下最合适的前 N 份简历"）。
+
+criteria 原有字段（schools / majors / degrees / grad_year_min / grad_year_max / name_keywords 及 all / any / not 组合）是必选条件，
+与 condition_index.match_condition 语义一致，决定哪些简历参与排序；可选的 "scoring" 块给出加分项：
+    "scoring": {
+        "weights": {"school": 3, "major": 2, "degree": 1, "grad_year": 1, "skills": 4},
+        "schools": ["清华大学"], "majors": ["计算机"], "degrees": ["硕士", "博士"],  # 偏好值，命中得该项满分
+        "skills": ["Python", "Go"],       # 技能重合度 = 命中数 / 技能数
+        "grad_year": 2024,                # 目标毕业年份，
+        "grad_year_half_life": 2          # 每偏离这么多年得分减半
+    }
+总分 = Σ 权重 × 分项得分 / Σ 权重，只计配置了偏好的项（未给权重的按 1），范围 0~1；同分时新入库的在前。
+
+评分在 screening_resumes 的列式副本上用 NumPy 向量化计算：学校 / 专业 / 学位编码成整数数组，
+毕业年份为 float 数组（缺失为 NaN），技能按 skill_registry.lookup_key（含别名表）编码后平铺成 (行号, 技能码) 两个数组，
+偏好技能按同样规则归并后比较。
+副本常驻内存，每次取用时按 id 增量追加新入库的简历（简历的抽取字段入库后不再变化），
+超过 SCORING_COLUMNS_TTL 后在后台整体重建。
+"""
+
+import asyncio
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config.settings import SCORING_COLUMNS_TTL, SCORING_LOAD_CHUNK
+from app.db.models.screening import ScreeningResume
+from app.db.models.selection import ScreeningCondition
+from app.services import criteria_compiler, skill_registry
+from app.services.condition_index import COMBINATORS, ConditionIndex, match_criteria
+
+_SET_FIELDS = (("schools", "school"), ("majors", "major"), ("degrees", "degree"))
+SCORE_FIELDS = ("school", "major", "degree", "grad_year", "skills")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_scoring(criteria: Optional[dict]) -> dict:
+    """校验 criteria["scoring"]，返回规整后的配置；格式不对时抛 ValueError。"""
+    scoring = (criteria or {}).get("scoring") or {}
+    if not isinstance(scoring, dict):
+        raise ValueError("scoring 必须是对象")
+    weights = scoring.get("weights") or {}
+    if not isinstance(weights, dict):
+        raise ValueError("scoring.weights 必须是对象")
+    for field, w in weights.items():
+        if field not in SCORE_FIELDS:
+            raise ValueError(f"scoring.weights 不支持的字段：{field}")
+        if not _is_number(w) or w < 0:
+            raise ValueError(f"scoring.weights.{field} 必须是非负数")
+
+    parsed: dict[str, Any] = {}
+    for key, field in _SET_FIELDS + (("skills", "skills"),):
+        values = scoring.get(key)
+        if values is None:
+            continue
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            raise ValueError(f"scoring.{key} 必须是字符串列表")
+        if values:
+            parsed[field] = values
+    if scoring.get("grad_year") is not None:
+        half_life = scoring.get("grad_year_half_life", 1)
+        if not _is_number(scoring["grad_year"]):
+            raise ValueError("scoring.grad_year 必须是年份")
+        if not _is_number(half_life) or half_life <= 0:
+            raise ValueError("scoring.grad_year_half_life 必须是正数")
+        parsed["grad_year"] = (float(scoring["grad_year"]), float(half_life))
+
+    return {"weights": {f: float(weights.get(f, 1)) for f in parsed}, **parsed}
+
+
+class ScreeningColumns:
+    """screening_resumes 的列式副本。"""
+
+    def __init__(self):
+        self.ids = np.empty(0, dtype=np.int64)
+        self.names = np.empty(0, dtype=str)  # 小写姓名，缺失为空串
+        # 学校 / 专业 / 学位：值 -> 编码（None 为 -1）、编码 -> 值、每行的编码
+        self.vocab: dict[str, dict[str, int]] = {f: {} for _, f in _SET_FIELDS}
+        self.values: dict[str, list[str]] = {f: [] for _, f in _SET_FIELDS}
+        self.codes = {f: np.empty(0, dtype=np.int32) for _, f in _SET_FIELDS}
+        self.grad_year = np.empty(0, dtype=np.float64)
+        self.skill_vocab: dict[str, int] = {}
+        self._skill_keys: dict[str, str] = {}  # 原写法 -> lookup_key（别名表变化后随整体重建生效）
+        self.skill_rows = np.empty(0, dtype=np.int32)
+        self.skill_codes = np.empty(0, dtype=np.int32)
+        self.last_id = 0
+        self.built_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _code(self, field: str, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self.vocab[field].get(value)
+        if code is None:
+            code = self.vocab[field][value] = len(self.values[field])
+            self.values[field].append(value)
+        return code
+
+    def _skill_code(self, name: str) -> int:
+        key = self._skill_keys.get(name)
+        if key is None:
+            key = self._skill_keys[name] = skill_registry.lookup_key(name)
+        code = self.skill_vocab.get(key)
+        if code is None:
+            code = self.skill_vocab[key] = len(self.skill_vocab)
+        return code
+
+    def append(self, rows: list[tuple]):
+        """rows: [(id, 姓名, 学校, 专业, 学位, 毕业年份, 技能列表)]，按 id 升序。"""
+        if not rows:
+            return
+        base, n = len(self.ids), len(rows)
+        self.ids = np.concatenate([self.ids, np.fromiter((r[0] for r in rows), np.int64, n)])
+        names = np.array([r[1].lower() if isinstance(r[1], str) else "" for r in rows], dtype=str)
+        self.names = np.concatenate([self.names, names])
+        for pos, (_, field) in enumerate(_SET_FIELDS, start=2):
+            new = np.fromiter((self._code(field, r[pos]) for r in rows), np.int32, n)
+            self.codes[field] = np.concatenate([self.codes[field], new])
+        years = np.fromiter((r[5] if _is_number(r[5]) else np.nan for r in rows), np.float64, n)
+        self.grad_year = np.concatenate([self.grad_year, years])
+
+        skill_rows: list[int] = []
+        skill_codes: list[int] = []
+        for i, r in enumerate(rows):
+            if not isinstance(r[6], list):
+                continue
+            for code in {self._skill_code(s) for s in r[6] if isinstance(s, str) and s.strip()}:
+                skill_rows.append(base + i)
+                skill_codes.append(code)
+        self.skill_rows = np.concatenate([self.skill_rows, np.asarray(skill_rows, np.int32)])
+        self.skill_codes = np.concatenate([self.skill_codes, np.asarray(skill_codes, np.int32)])
+        self.last_id = rows[-1][0]
+
+    def _wanted(self, field: str, values: list) -> list[int]:
+        wanted = []
+        for v in values:
+            if v is None:
+                wanted.append(-1)
+            elif isinstance(v, str) and v in self.vocab[field]:
+                wanted.append(self.vocab[field][v])
+        return wanted
+
+    def _row(self, i: int) -> dict:
+        out = {"name": str(self.names[i]) or None, "skills": None}
+        for _, field in _SET_FIELDS:
+            code = self.codes[field][i]
+            out[field] = self.values[field][code] if code >= 0 else None
+        gy = self.grad_year[i]
+        out["grad_year"] = None if np.isnan(gy) else int(gy)
+        return out
+
+    def required_mask(self, condition: ScreeningCondition) -> np.ndarray:
+        """通过必选条件的行，语义与 match_condition 一致。"""
+        return self._mask(condition.criteria or {})
+
+    def _mask(self, criteria: dict) -> np.ndarray:
+        leaf = {k: v for k, v in criteria.items() if k not in COMBINATORS}
+        if not ConditionIndex._compilable(leaf):
+            # 手工写入的非常规条件：逐行判断
+            return np.fromiter(
+                (match_criteria(self._row(i), criteria) for i in range(len(self))), bool, len(self)
+            )
+
+        mask = np.ones(len(self), dtype=bool)
+        for key, field in _SET_FIELDS:
+            if criteria.get(key):
+                mask &= np.isin(self.codes[field], self._wanted(field, criteria[key]))
+        # 缺失的毕业年份（NaN）与任何阈值比较都为 False，即不受限制
+        if criteria.get("grad_year_min") is not None:
+            mask &= ~(self.grad_year < criteria["grad_year_min"])
+        if criteria.get("grad_year_max") is not None:
+            mask &= ~(self.grad_year > criteria["grad_year_max"])
+        if criteria.get("name_keywords"):
+            rows = np.flatnonzero(mask)
+            names = self.names[rows]
+            hit = np.zeros(len(rows), dtype=bool)
+            for k in criteria["name_keywords"]:
+                if k:
+                    hit |= np.char.find(names, k.lower()) >= 0
+            mask[rows[~hit]] = False
+
+        for sub in criteria.get("all") or []:
+            mask &= self._mask(sub)
+        if criteria.get("any"):
+            union = np.zeros(len(self), dtype=bool)
+            for sub in criteria["any"]:
+                union |= self._mask(sub)
+            mask &= union
+        if criteria.get("not"):
+            mask &= ~self._mask(criteria["not"])
+        return mask
+
+    def score(self, rows: np.ndarray, scoring: dict) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """rows 各行的总分与分项得分。"""
+        parts: dict[str, np.ndarray] = {}
+        for key, field in _SET_FIELDS:
+            if field in scoring:
+                wanted = self._wanted(field, scoring[field])
+                parts[field] = np.isin(self.codes[field][rows], wanted).astype(np.float64)
+        if "grad_year" in scoring:
+            target, half_life = scoring["grad_year"]
+            decay = np.exp2(-np.abs(self.grad_year[rows] - target) / half_life)
+            parts["grad_year"] = np.nan_to_num(decay, nan=0.0)
+        if "skills" in scoring:
+            desired = {skill_registry.lookup_key(s) for s in scoring["skills"] if s.strip()}
+            codes = [self.skill_vocab[k] for k in desired if k in self.skill_vocab]
+            hits = np.isin(self.skill_codes, codes)
+            counts = np.bincount(self.skill_rows[hits], minlength=len(self))
+            parts["skills"] = counts[rows] / max(len(desired), 1)
+
+        weights = scoring["weights"]
+        total_weight = sum(weights.values())
+        total = np.zeros(len(rows), dtype=np.float64)
+        if total_weight > 0:
+            for field, part in parts.items():
+                total += weights[field] * part
+            total /= total_weight
+        return total, parts
+
+
+def rank(columns: ScreeningColumns, condition: ScreeningCondition, top_n: int) -> tuple[int, list[dict]]:
+    """返回 (通过必选条件的简历数, [{screening_id, score, breakdown}])，按总分降序、id 降序。"""
+    criteria_compiler.validate_criteria(condition.criteria)
+    scoring = parse_scoring(condition.criteria)
+    rows = np.flatnonzero(columns.required_mask(condition))
+    if not len(rows):
+        return 0, []
+    total, parts = columns.score(rows, scoring)
+
+    # 只对可能进入前 top_n 的行（分数不低于第 top_n 名）做精确排序
+    if len(rows) > top_n:
+        threshold = np.partition(total, len(total) - top_n)[len(total) - top_n]
+        candidates = np.flatnonzero(total >= threshold)
+    else:
+        candidates = np.arange(len(rows))
+    ids = columns.ids[rows]
+    order = candidates[np.lexsort((-ids[candidates], -total[candidates]))][:top_n]
+    return len(rows), [
+        {
+            "screening_id": int(ids[i]),
+            "score": round(float(total[i]), 4),
+            "breakdown": {field: round(float(part[i]), 4) for field, part in parts.items()},
+        }
+        for i in order
+    ]
+
+
+_columns: Optional[ScreeningColumns] = None
+_lock = asyncio.Lock()
+_rebuild_task: Optional[asyncio.Task] = None
+
+_FIELDS = (
+    "id",
+    "extracted_name",
+    "extracted_school",
+    "extracted_major",
+    "extracted_degree",
+    "extracted_grad_year",
+    "extracted_skills",
+)
+
+
+async def _append_new(columns: ScreeningColumns):
+    while True:
+        rows = (
+            await ScreeningResume.filter(id__gt=columns.last_id)
+            .order_by("id")
+            .limit(SCORING_LOAD_CHUNK)
+            .values_list(*_FIELDS)
+        )
+        columns.append(rows)
+        if len(rows) < SCORING_LOAD_CHUNK:
+            return
+
+
+async def _rebuild():
+    global _columns
+    columns = ScreeningColumns()
+    await _append_new(columns)
+    async with _lock:
+        await _append_new(columns)
+        _columns = columns
+
+
+async def get_columns() -> ScreeningColumns:
+    """取列式副本，并追加上次之后入库的简历。"""
+    global _columns, _rebuild_task
+    if (
+        _columns is not None
+        and time.monotonic() - _columns.built_at >= SCORING_COLUMNS_TTL
+        and (_rebuild_task is None or _rebuild_task.done())
+    ):
+        _rebuild_task = asyncio.create_task(_rebuild())
+    await skill_registry.refresh_if_stale()
+    async with _lock:
+        if _columns is None:
+            _columns = ScreeningColumns()
+        await _append_new(_columns)
+        return _columns
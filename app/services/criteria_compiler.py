@@ -0,0 +1,181 @@
+# app/services/criteria_compiler.py
+"""
+把筛选条件 criteria 编译成一个 Tortoise Q 表达式，在数据库里直接求值（条件编辑器的「预览命中」）。
+
+语义与 condition_index.match_criteria 一致：
+- schools / majors / degrees：字段值在列表中（列表含 null 时也接受缺失值）；
+- grad_year_min / grad_year_max：缺失的毕业年份不受限制；
+- name_keywords：姓名包含任一关键词（不区分大小写）；
+- all / any / not：组合子，可嵌套。
+SQL 的 NULL 是三值逻辑，NOT 会把 NULL 行丢掉；每个叶子条件都显式处理了 IS NULL，保证只产生真 / 假。
+
+explain=True 时附带数据库的执行计划和用到的索引名（sqlite / MySQL / PostgreSQL 的计划格式不同，尽力解析）。
+"""
+
+import json
+import operator
+import re
+from functools import reduce
+from typing import Any, Optional
+
+from tortoise.expressions import Q
+
+from app.db.models.screening import ScreeningResume
+from app.services.condition_index import is_plain_list
+
+_SET_FIELDS = (
+    ("schools", "extracted_school"),
+    ("majors", "extracted_major"),
+    ("degrees", "extracted_degree"),
+)
+_LIST_KEYS = tuple(key for key, _ in _SET_FIELDS) + ("name_keywords",)
+_MAX_DEPTH = 8
+
+_NEVER = Q(id__in=[])
+
+
+def validate_criteria(criteria: Any, path: str = "criteria", depth: int = 0):
+    """校验 criteria 结构（未知字段忽略），格式不对时抛 ValueError。"""
+    if criteria is None:
+        return
+    if not isinstance(criteria, dict):
+        raise ValueError(f"{path} 必须是对象")
+    if depth > _MAX_DEPTH:
+        raise ValueError(f"{path} 嵌套层数超过 {_MAX_DEPTH}")
+    for key in _LIST_KEYS:
+        values = criteria.get(key)
+        if values is not None and not is_plain_list(values):
+            raise ValueError(f"{path}.{key} 必须是字符串列表")
+    if criteria.get("name_keywords") and not all(isinstance(k, str) for k in criteria["name_keywords"]):
+        raise ValueError(f"{path}.name_keywords 必须是字符串列表")
+    for key in ("grad_year_min", "grad_year_max"):
+        value = criteria.get(key)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+            raise ValueError(f"{path}.{key} 必须是年份")
+    for key in ("all", "any"):
+        subs = criteria.get(key)
+        if subs is None:
+            continue
+        if not isinstance(subs, list):
+            raise ValueError(f"{path}.{key} 必须是条件列表")
+        for i, sub in enumerate(subs):
+            validate_criteria(sub, f"{path}.{key}[{i}]", depth + 1)
+    if criteria.get("not") is not None:
+        validate_criteria(criteria["not"], f"{path}.not", depth + 1)
+
+
+def _in(field: str, values: list) -> Q:
+    present = [v for v in values if v is not None]
+    q = Q(**{f"{field}__in": present}, **{f"{field}__isnull": False}) if present else _NEVER
+    if None in values:
+        q = q | Q(**{f"{field}__isnull": True})
+    return q
+
+
+def _any_of(parts: list[Q]) -> Q:
+    return reduce(operator.or_, parts) if parts else _NEVER
+
+
+def compile_criteria(criteria: Optional[dict]) -> Q:
+    """criteria -> Q；空条件匹配全部。调用前应先 validate_criteria。"""
+    q = _compile(criteria)
+    return Q() if q is None else q
+
+
+def _compile(criteria: Optional[dict]) -> Optional[Q]:
+    """None 表示不限制（空的 Q() 在 OR / NOT 里会被丢掉，不能用来表示「恒真」）。"""
+    if not criteria:
+        return None
+    parts: list[Q] = []
+
+    for key, field in _SET_FIELDS:
+        if criteria.get(key):
+            parts.append(_in(field, criteria[key]))
+
+    for key, op in (("grad_year_min", "gte"), ("grad_year_max", "lte")):
+        if criteria.get(key) is not None:
+            parts.append(
+                Q(**{f"extracted_grad_year__{op}": criteria[key]}) | Q(extracted_grad_year__isnull=True)
+            )
+
+    if criteria.get("name_keywords"):
+        keywords = [Q(extracted_name__icontains=k) for k in criteria["name_keywords"] if k]
+        parts.append(_any_of(keywords) & Q(extracted_name__isnull=False))
+
+    for sub in criteria.get("all") or []:
+        sub_q = _compile(sub)
+        if sub_q is not None:
+            parts.append(sub_q)
+    if criteria.get("any"):
+        subs = [_compile(sub) for sub in criteria["any"]]
+        if None not in subs:
+            parts.append(_any_of(subs))
+    if criteria.get("not"):
+        sub_q = _compile(criteria["not"])
+        # Q.__invert__ 复制时会丢掉子表达式自身的取反，先包一层再取反
+        parts.append(_NEVER if sub_q is None else ~Q(sub_q))
+
+    return reduce(operator.and_, parts) if parts else None
+
+
+def _indexes_used(plan: Any) -> list[str]:
+    """从执行计划里找出索引名。"""
+    found: list[str] = []
+
+    def walk(node: Any):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key in ("key", "Index Name") and isinstance(value, str) and value:
+                    found.append(value)  # MySQL / PostgreSQL
+                else:
+                    walk(value)
+        elif isinstance(node, (list, tuple)):
+            for item in node:
+                walk(item)
+        elif isinstance(node, str):
+            # sqlite: "SEARCH screening_resumes USING INDEX idx_xxx (...)"；PostgreSQL 文本计划: "Index Scan using idx_xxx on ..."
+            found.extend(re.findall(r"(?:USING (?:COVERING )?INDEX|[Uu]sing) (\w+)", node))
+
+    walk(plan)
+    return list(dict.fromkeys(found))
+
+
+def _decode(value: Any) -> Any:
+    """MySQL 的 EXPLAIN FORMAT=JSON 返回 {'EXPLAIN': '<json 文本>'}，PostgreSQL 可能返回 json 字符串，解码后再解析。"""
+    if isinstance(value, str) and value.lstrip().startswith(("{", "[")):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _plain(rows: Any) -> Any:
+    if isinstance(rows, (list, tuple)):
+        return [_plain(r) for r in rows]
+    if not isinstance(rows, dict):
+        try:
+            rows = dict(rows)  # sqlite3.Row / asyncpg.Record
+        except (TypeError, ValueError):
+            return _decode(str(rows))
+    return {key: _decode(value) for key, value in rows.items()}
+
+
+async def preview(criteria: Optional[dict], limit: int, explain: bool = False) -> dict:
+    """
+    在数据库里求值 criteria：返回命中总数、最新入库的 limit 条简历和生成的 SQL；
+    explain=True 时附带执行计划与用到的索引。
+    """
+    validate_criteria(criteria)
+    qs = ScreeningResume.filter(compile_criteria(criteria))
+    page = qs.order_by("-at_time", "-id").limit(limit)
+    out = {
+        "total": await qs.count(),
+        "items": await page,
+        "sql": page.sql(),
+    }
+    if explain:
+        plan = _plain(await page.explain())
+        out["plan"] = plan
+        out["indexes_used"] = _indexes_used(plan)
+    return out
@@ -0,0 +1,238 @@
+# app/services/graph_service.py
+"""
+人才-技能知识图谱。
+
+- 快照：talents / skills / talent_skills 用 values_list 读成元组，建邻接表常驻内存；
+  完整图的 JSON 序列化结果一并缓存，ETag 由数据指纹（各表行数与最大 id）计算，多进程下一致。
+- 增量：screening_to_talent_with_skills 提交后调用 add_talent，直接把新节点和边并入快照；
+  GRAPH_SNAPSHOT_TTL 兜底，其他进程最多延迟这么久看到变更。
+- 子图：以某个人才 / 技能为中心做 k 跳 BFS，可按技能度数过滤，节点数有上限。
+- 流式：NDJSON 逐行输出，按 id 分块 values_list 读库，不经过快照、不在内存里拼整张图。
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+from app.config.settings import GRAPH_SNAPSHOT_TTL, GRAPH_STREAM_CHUNK
+from app.db.models.skill import Skill
+from app.db.models.talent import Talent
+from app.db.models.talent_skill import TalentSkill
+
+EDGE_LABEL = "has_skill"
+
+
+def talent_node(tid: int, name: Optional[str]) -> dict:
+    return {"id": f"talent-{tid}", "label": name or "未命名", "type": "talent"}
+
+
+def skill_node(sid: int, name: str) -> dict:
+    return {"id": f"skill-{sid}", "label": name, "type": "skill"}
+
+
+def edge(tid: int, sid: int) -> dict:
+    return {"source": f"talent-{tid}", "target": f"skill-{sid}", "label": EDGE_LABEL}
+
+
+def parse_node_id(node_id: str) -> tuple[str, int]:
+    """"talent-1" / "skill-2" -> (类型, id)。"""
+    kind, _, raw = node_id.partition("-")
+    if kind not in ("talent", "skill") or not raw.isdigit():
+        raise ValueError(f"无效的节点 id：{node_id}")
+    return kind, int(raw)
+
+
+class GraphSnapshot:
+    def __init__(self, talents, skills, edges):
+        self.talents: dict[int, Optional[str]] = dict(talents)
+        self.skills: dict[int, str] = dict(skills)
+        self.talent_skills: dict[int, set[int]] = {}
+        self.skill_talents: dict[int, set[int]] = {}
+        self.edge_count = 0
+        self.max_edge_id = 0
+        for eid, tid, sid in edges:
+            self._link(tid, sid)
+            self.max_edge_id = max(self.max_edge_id, eid)
+        self.built_at = time.monotonic()
+        self._full_json: Optional[bytes] = None
+
+    def _link(self, tid: int, sid: int) -> bool:
+        linked = self.talent_skills.setdefault(tid, set())
+        if sid in linked:
+            return False
+        linked.add(sid)
+        self.skill_talents.setdefault(sid, set()).add(tid)
+        self.edge_count += 1
+        return True
+
+    @property
+    def etag(self) -> str:
+        fingerprint = (
+            len(self.talents), max(self.talents, default=0),
+            len(self.skills), max(self.skills, default=0),
+            self.edge_count, self.max_edge_id,
+        )
+        return hashlib.sha1(repr(fingerprint).encode()).hexdigest()[:16]
+
+    def add_talent(self, tid: int, name: Optional[str], skills: Iterable[tuple[int, int, str]]):
+        self.talents[tid] = name
+        for eid, sid, skill_name in skills:
+            self.skills.setdefault(sid, skill_name)
+            self._link(tid, sid)
+            self.max_edge_id = max(self.max_edge_id, eid)
+        self._full_json = None
+
+    def degree(self, sid: int) -> int:
+        return len(self.skill_talents.get(sid, ()))
+
+    def full_json(self) -> bytes:
+        """完整图的序列化结果（缓存）。"""
+        if self._full_json is None:
+            self._full_json = json.dumps(
+                self.to_graph(self.talents, self.skills), ensure_ascii=False
+            ).encode()
+        return self._full_json
+
+    def to_graph(self, talent_ids: Iterable[int], skill_ids: Iterable[int], truncated: bool = False) -> dict:
+        skill_ids = set(skill_ids)
+        nodes = [talent_node(tid, self.talents.get(tid)) for tid in talent_ids]
+        nodes += [skill_node(sid, self.skills[sid]) for sid in skill_ids if sid in self.skills]
+        edges = [
+            edge(tid, sid)
+            for tid in talent_ids
+            for sid in self.talent_skills.get(tid, ())
+            if sid in skill_ids
+        ]
+        return {"nodes": nodes, "edges": edges, "truncated": truncated}
+
+    def _skill_allowed(self, sid: int, min_degree: Optional[int], max_degree: Optional[int]) -> bool:
+        deg = self.degree(sid)
+        return (min_degree is None or deg >= min_degree) and (max_degree is None or deg <= max_degree)
+
+    def neighborhood(
+        self,
+        center: str,
+        hops: int,
+        limit: int,
+        min_degree: Optional[int] = None,
+        max_degree: Optional[int] = None,
+    ) -> dict:
+        """以 center 为中心的 k 跳子图；度数不在范围内的技能不展开也不返回（中心节点除外）。"""
+        kind, node = parse_node_id(center)
+        if (kind == "talent" and node not in self.talents) or (kind == "skill" and node not in self.skills):
+            raise KeyError(center)
+
+        talents: list[int] = [node] if kind == "talent" else []
+        skills: list[int] = [node] if kind == "skill" else []
+        seen = {(kind, node)}
+        frontier = [(kind, node)]
+        truncated = False
+        for _ in range(hops):
+            nxt = []
+            for k, n in frontier:
+                if k == "talent":
+                    neighbors = [
+                        ("skill", s)
+                        for s in sorted(self.talent_skills.get(n, ()))
+                        if self._skill_allowed(s, min_degree, max_degree)
+                    ]
+                else:
+                    neighbors = [("talent", t) for t in sorted(self.skill_talents.get(n, ()))]
+                for item in neighbors:
+                    if item in seen:
+                        continue
+                    if len(seen) >= limit:
+                        truncated = True
+                        break
+                    seen.add(item)
+                    nxt.append(item)
+                    (talents if item[0] == "talent" else skills).append(item[1])
+                if truncated:
+                    break
+            if truncated or not nxt:
+                break
+            frontier = nxt
+        return self.to_graph(talents, skills, truncated)
+
+    def filtered(self, limit: int, min_degree: Optional[int] = None, max_degree: Optional[int] = None) -> dict:
+        """不指定中心时：按度数过滤技能，人才按 id 倒序（新入库优先）截断到 limit 个节点。"""
+        skills = {
+            sid for sid in self.skills if self._skill_allowed(sid, min_degree, max_degree)
+        }
+        filtering = min_degree is not None or max_degree is not None
+        talents = [
+            tid
+            for tid in sorted(self.talents, reverse=True)
+            if not filtering or self.talent_skills.get(tid, set()) & skills
+        ]
+        truncated = False
+        if len(talents) + len(skills) > limit:
+            truncated = True
+            talents = talents[: max(limit // 2, 1)]
+            adjacent = {s for tid in talents for s in self.talent_skills.get(tid, ()) if s in skills}
+            skills = set(sorted(adjacent, key=self.degree, reverse=True)[: limit - len(talents)])
+        return self.to_graph(talents, skills, truncated)
+
+
+_snapshot: Optional[GraphSnapshot] = None
+_lock = asyncio.Lock()
+
+
+async def get_snapshot() -> GraphSnapshot:
+    global _snapshot
+    snap = _snapshot
+    if snap is not None and time.monotonic() - snap.built_at < GRAPH_SNAPSHOT_TTL:
+        return snap
+    async with _lock:
+        if _snapshot is not None and time.monotonic() - _snapshot.built_at < GRAPH_SNAPSHOT_TTL:
+            return _snapshot
+        talents = await Talent.all().values_list("id", "name")
+        skills = await Skill.all().values_list("id", "name")
+        edges = await TalentSkill.all().values_list("id", "talent_id", "skill_id")
+        _snapshot = GraphSnapshot(talents, skills, edges)
+        return _snapshot
+
+
+def add_talent(tid: int, name: Optional[str], skills: Iterable[tuple[int, int, str]]):
+    """新人才入库（事务提交后）调用：skills 为 [(talent_skill id, skill id, 技能名)]。"""
+    if _snapshot is not None:
+        _snapshot.add_talent(tid, name, skills)
+
+
+def invalidate():
+    global _snapshot
+    _snapshot = None
+
+
+async def _chunks(model, fields: tuple[str, ...]) -> AsyncIterator[list[tuple]]:
+    last_id = 0
+    while True:
+        rows = (
+            await model.filter(id__gt=last_id)
+            .order_by("id")
+            .limit(GRAPH_STREAM_CHUNK)
+            .values_list("id", *fields)
+        )
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+async def stream_ndjson() -> AsyncIterator[bytes]:
+    """整张图逐行输出：先人才、再技能、最后边，每行一个 JSON 对象。"""
+    async for rows in _chunks(Talent, ("name",)):
+        yield "".join(
+            json.dumps(talent_node(tid, name), ensure_ascii=False) + "\n" for tid, name in rows
+        ).encode()
+    async for rows in _chunks(Skill, ("name",)):
+        yield "".join(
+            json.dumps(skill_node(sid, name), ensure_ascii=False) + "\n" for sid, name in rows
+        ).encode()
+    async for rows in _chunks(TalentSkill, ("talent_id", "skill_id")):
+        yield "".join(
+            json.dumps({**edge(tid, sid), "type": "edge"}, ensure_ascii=False) + "\n"
+            for _, tid, sid in rows
+        ).encode()
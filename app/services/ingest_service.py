@@ -0,0 +1,165 @@
+# app/services/ingest_service.py
+"""
+异步入库任务队列：
+
+上传接口只负责去重并把 PDF 写入 MinIO，然后生成任务放入队列，立即返回 job_id；
+进程内固定数量的 worker 依次执行 解析 -> 抽取 -> 匹配 -> 入库，
+任务状态（queued / running / done / failed、分阶段耗时、ScreeningResume id）
+保存在内存里供状态接口查询。
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import UploadFile
+
+from app.config.settings import INGEST_JOB_HISTORY, INGEST_QUEUE_SIZE, INGEST_WORKERS
+from app.services.screening_service import (
+    claim_or_find_duplicate,
+    process_stored_pdf,
+    release_claim,
+    stage_upload,
+    store_pdf,
+)
+
+
+class IngestQueueFull(RuntimeError):
+    """排队任务已达上限。"""
+
+
+@dataclass
+class IngestJob:
+    id: str
+    filename: Optional[str]
+    object_key: Optional[str] = None
+    status: str = "queued"  # queued / running / done / failed
+    timings: Dict[str, float] = field(default_factory=dict)
+    screening_id: Optional[int] = None
+    duplicate: bool = False  # 内容与已有记录相同，直接复用
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+_jobs: "OrderedDict[str, IngestJob]" = OrderedDict()
+_queue: Optional[asyncio.Queue] = None
+_workers: list[asyncio.Task] = []
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue(maxsize=INGEST_QUEUE_SIZE)
+    return _queue
+
+
+def _remember(job: IngestJob):
+    _jobs[job.id] = job
+    # 只淘汰已结束的旧任务，排队/运行中的任务必须可查
+    while len(_jobs) > INGEST_JOB_HISTORY:
+        oldest_id = next(
+            (jid for jid, j in _jobs.items() if j.status in ("done", "failed")), None
+        )
+        if oldest_id is None:
+            break
+        _jobs.pop(oldest_id)
+
+
+async def start_workers():
+    queue = _get_queue()
+    while len(_workers) < INGEST_WORKERS:
+        _workers.append(asyncio.create_task(_worker(queue)))
+
+
+async def stop_workers():
+    """停止 worker，并清理仍在排队的任务（标记失败、删除临时文件）。"""
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+    queue = _get_queue()
+    while not queue.empty():
+        job, staged = queue.get_nowait()
+        release_claim(staged.sha256, None)
+        staged.discard()
+        job.status = "failed"
+        job.error = "服务停止，任务未执行"
+        job.finished_at = time.time()
+        queue.task_done()
+
+
+async def submit(file: UploadFile) -> IngestJob:
+    """
+    流式落盘并存储 PDF，随后入队，返回任务对象。
+    队列里只保存临时文件路径，排队任务不占用内存。
+    """
+    queue = _get_queue()
+    if queue.full():
+        raise IngestQueueFull("入库队列已满，请稍后重试")
+    await start_workers()
+
+    job = IngestJob(id=uuid.uuid4().hex, filename=file.filename)
+    start = time.perf_counter()
+    staged = await stage_upload(file)
+    try:
+        existing = await claim_or_find_duplicate(staged.sha256)
+    except BaseException:
+        staged.discard()
+        raise
+    if existing:
+        staged.discard()
+        job.status = "done"
+        job.duplicate = True
+        job.screening_id = existing.id
+        job.finished_at = time.time()
+        _remember(job)
+        return job
+
+    try:
+        job.object_key = await store_pdf(staged)
+    except BaseException:
+        release_claim(staged.sha256, None)
+        staged.discard()
+        raise
+    job.timings["storage"] = round(time.perf_counter() - start, 4)
+
+    _remember(job)
+    try:
+        queue.put_nowait((job, staged))
+    except asyncio.QueueFull:
+        release_claim(staged.sha256, None)
+        staged.discard()
+        job.status = "failed"
+        job.error = "入库队列已满"
+        raise IngestQueueFull("入库队列已满，请稍后重试")
+    return job
+
+
+def get_job(job_id: str) -> Optional[IngestJob]:
+    return _jobs.get(job_id)
+
+
+async def _worker(queue: asyncio.Queue):
+    while True:
+        job, staged = await queue.get()
+        job.status = "running"
+        job.started_at = time.time()
+        screening = None
+        try:
+            screening, job.duplicate = await process_stored_pdf(job.object_key, staged, job.timings)
+            job.screening_id = screening.id
+            job.status = "done"
+        except Exception as exc:  # 单个任务失败不影响 worker
+            job.status = "failed"
+            job.error = f"{type(exc).__name__}: {exc}"
+        finally:
+            release_claim(staged.sha256, screening)
+            staged.discard()
+            job.finished_at = time.time()
+            queue.task_done()
@@ -0,0 +1,62 @@
+# app/services/json_stream.py
+"""
+增量 JSON 对象扫描：逐块喂入模型输出，遇到第一个完整的顶层 {...} 就返回它的原文。
+按字符状态机处理字符串和转义，模型在字符串里或对象之后多输出的括号都不会干扰。
+"""
+
+
+class JsonObjectScanner:
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self.depth = 0
+        self.fields_closed = 0  # 顶层已完整输出的键值对数量
+        self._in_string = False
+        self._escape = False
+        self._has_value = False
+        self._buf: list[str] = []
+
+    def feed(self, chunk: str) -> str | None:
+        """喂入一段文本；对象已闭合时返回对象原文，否则返回 None。"""
+        for ch in chunk:
+            if self.done:
+                break
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+                    self._buf.append(ch)
+                continue
+
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    if self._has_value:
+                        self.fields_closed += 1
+                    self.done = True
+            elif self.depth == 1 and ch == ":":
+                self._has_value = True
+            elif self.depth == 1 and ch == "," and self._has_value:
+                self.fields_closed += 1
+                self._has_value = False
+
+        return "".join(self._buf) if self.done else None
+
+
+def first_json_object(text: str) -> str | None:
+    """返回文本中第一个完整 JSON 对象的原文，没有则返回 None。"""
+    return JsonObjectScanner().feed(text)
@@ -0,0 +1,142 @@
+# app/services/llm_cache.py
+"""
+LLM 抽取结果的持久化缓存（SQLite）。
+
+键 = sha256(规范化文本 + 模型名 + prompt 版本)，空白差异不影响命中；
+prompt 模板变化会产生新版本号，旧版本条目在打开缓存时清理。
+超过容量上限按最近访问时间（LRU）淘汰，可选 TTL。
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", text or "").strip()
+
+
+def make_key(text: str, model: str, prompt_version: str) -> str:
+    raw = "\0".join([normalize_text(text), model, prompt_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ExtractionCache:
+    def __init__(self, path: str, prompt_version: str, max_bytes: int, ttl: int = 0):
+        self.path = path
+        self.prompt_version = prompt_version
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                key TEXT PRIMARY KEY,
+                prompt_version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extraction_cache_accessed"
+            " ON extraction_cache (accessed_at)"
+        )
+        # prompt 变了，旧结果全部作废
+        self._conn.execute(
+            "DELETE FROM extraction_cache WHERE prompt_version != ?", (prompt_version,)
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extraction_cache"
+        ).fetchone()[0]
+
+    def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, created_at FROM extraction_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row and self.ttl and row[2] < now - self.ttl:
+                self._conn.execute("DELETE FROM extraction_cache WHERE key = ?", (key,))
+                self._total_bytes -= row[1]
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE extraction_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, value: dict[str, Any]):
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO extraction_cache"
+                " (key, prompt_version, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.prompt_version, data, size, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        # 一次淘汰到上限的 90%，避免每次写入都触发
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT key, size FROM extraction_cache ORDER BY accessed_at"
+        )
+        victims = []
+        total = self._total_bytes
+        for key, size in rows:
+            if total <= target:
+                break
+            victims.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM extraction_cache WHERE key = ?", victims)
+        self.evictions += len(victims)
+        self._total_bytes = total
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM extraction_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "prompt_version": self.prompt_version,
+        }
+
+    async def aget(self, key: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: dict[str, Any]):
+        await asyncio.to_thread(self.set, key, value)
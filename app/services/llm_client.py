@@ -0,0 +1,264 @@
+# app/services/llm_client.py
+"""
+LLM HTTP 传输层：
+
+- 进程内共享一个 httpx.AsyncClient（keep-alive 连接池，可选 HTTP/2），随应用 lifespan 创建 / 关闭；
+- 429 / 5xx / 网络错误按指数退避 + 抖动重试，优先遵守 Retry-After；
+- AdaptiveLimiter 控制同时在途的请求数：限流时减半，成功后逐步加回。
+"""
+
+import asyncio
+import email.utils
+import json
+import os
+import random
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.config.settings import (
+    LLM_BACKOFF_BASE_MS,
+    LLM_BACKOFF_MAX_MS,
+    LLM_BASE_URL,
+    LLM_CONCURRENCY_MAX,
+    LLM_CONCURRENCY_MIN,
+    LLM_CONNECT_TIMEOUT,
+    LLM_HTTP2,
+    LLM_MAX_CONNECTIONS,
+    LLM_MAX_RETRIES,
+    LLM_READ_TIMEOUT,
+)
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+class AdaptiveLimiter:
+    """
+    AIMD 并发限制：每次成功 limit += 1/limit（约每轮 +1），
+    限流时 limit 减半；冷却期内的连续限流只算一次。
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, cooldown: float = 1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def on_throttle(self):
+        self.throttled += 1
+        now = time.monotonic()
+        if now - self._last_decrease >= self.cooldown:
+            self.limit = max(self.minimum, self.limit / 2)
+            self._last_decrease = now
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "throttled": self.throttled,
+        }
+
+
+_limiter = AdaptiveLimiter(
+    initial=LLM_CONCURRENCY_MAX,
+    minimum=LLM_CONCURRENCY_MIN,
+    maximum=LLM_CONCURRENCY_MAX,
+)
+_counters = {"requests": 0, "retries": 0, "failures": 0}
+
+
+def _http2_enabled() -> bool:
+    if not LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=LLM_BASE_URL,
+            http2=_http2_enabled(),
+            timeout=httpx.Timeout(
+                connect=LLM_CONNECT_TIMEOUT,
+                read=LLM_READ_TIMEOUT,
+                write=LLM_CONNECT_TIMEOUT,
+                pool=LLM_READ_TIMEOUT,
+            ),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+                keepalive_expiry=60,
+            ),
+        )
+    return _client
+
+
+async def startup():
+    _get_client()
+
+
+async def shutdown():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _retry_after(resp: httpx.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff(attempt: int) -> float:
+    # full jitter：在 [0, min(上限, base * 2^attempt)] 内随机
+    cap = min(LLM_BACKOFF_MAX_MS, LLM_BACKOFF_BASE_MS * (2 ** attempt))
+    return random.uniform(0, cap) / 1000
+
+
+def _auth_headers() -> dict:
+    api_key = os.getenv("LLM_API_KEY")
+    if not api_key:
+        raise RuntimeError("未设置 LLM_API_KEY")
+    return {"Authorization": f"Bearer {api_key}"}
+
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> Optional[float]:
+    """
+    可重试的响应返回等待秒数；已用完重试次数时抛出 HTTPStatusError。
+    不可重试的响应返回 None（4xx 直接抛出）。
+    """
+    if resp.status_code not in RETRY_STATUS:
+        resp.raise_for_status()
+        return None
+    if resp.status_code == 429:
+        _limiter.on_throttle()
+    if attempt >= LLM_MAX_RETRIES:
+        _counters["failures"] += 1
+        resp.raise_for_status()
+    delay = _retry_after(resp)
+    return delay if delay is not None else _backoff(attempt)
+
+
+async def _sleep_before_retry(delay: float):
+    _counters["retries"] += 1
+    await asyncio.sleep(min(delay, LLM_BACKOFF_MAX_MS / 1000))
+
+
+async def post_chat(payload: dict) -> dict:
+    """
+    调用 /v1/chat/completions，返回响应 JSON。
+    可重试的错误重试 LLM_MAX_RETRIES 次后仍失败则抛出最后一次的异常。
+    """
+    headers = _auth_headers()
+    client = _get_client()
+    attempt = 0
+    while True:
+        _counters["requests"] += 1
+        await _limiter.acquire()
+        try:
+            resp = await client.post("/v1/chat/completions", headers=headers, json=payload)
+        except httpx.TransportError:
+            if attempt >= LLM_MAX_RETRIES:
+                _counters["failures"] += 1
+                raise
+            delay = _backoff(attempt)
+        else:
+            delay = _retry_delay(resp, attempt)
+            if delay is None:
+                _limiter.on_success()
+                return resp.json()
+        finally:
+            await _limiter.release()
+
+        attempt += 1
+        await _sleep_before_retry(delay)
+
+
+async def stream_chat(payload: dict) -> AsyncIterator[str]:
+    """
+    以 stream=True 调用 /v1/chat/completions，逐个产出 content 增量。
+    只在收到第一个字节之前重试；调用方提前停止迭代时连接随之关闭，请求被取消。
+    """
+    headers = _auth_headers()
+    client = _get_client()
+    payload = {**payload, "stream": True}
+    attempt = 0
+    while True:
+        _counters["requests"] += 1
+        await _limiter.acquire()
+        started = False
+        try:
+            async with client.stream(
+                "POST", "/v1/chat/completions", headers=headers, json=payload
+            ) as resp:
+                if resp.status_code >= 400:
+                    await resp.aread()
+                delay = _retry_delay(resp, attempt)
+                if delay is None:
+                    _limiter.on_success()
+                    started = True
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            return
+                        chunk = json.loads(data)
+                        choices = chunk.get("choices") or [{}]
+                        content = (choices[0].get("delta") or {}).get("content")
+                        if content:
+                            yield content
+                    return
+        except httpx.TransportError:
+            if started or attempt >= LLM_MAX_RETRIES:
+                _counters["failures"] += 1
+                raise
+            delay = _backoff(attempt)
+        finally:
+            await _limiter.release()
+
+        attempt += 1
+        await _sleep_before_retry(delay)
+
+
+def stats() -> dict:
+    return {
+        **_counters,
+        "http2": _http2_enabled(),
+        "concurrency": _limiter.stats(),
+    }
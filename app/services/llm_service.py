@@ -1,11 +1,91 @@
 import os
+import asyncio
 import json
 import re
-import httpx
+import time
+import hashlib
+from typing import Iterable
 from dotenv import load_dotenv
 
+from app.config.settings import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MAX_BYTES,
+    LLM_CACHE_PATH,
+    LLM_BATCH_MAX_DOCS,
+    LLM_BATCH_TOKEN_BUDGET,
+    LLM_BATCH_WINDOW_MS,
+    LLM_CACHE_TTL,
+    LLM_COMPACTION_ENABLED,
+    LLM_PROMPT_TOKEN_BUDGET,
+    LLM_STREAM,
+)
+from app.services import llm_client
+from app.services import rule_extractor, text_compactor
+from app.services.json_stream import JsonObjectScanner, first_json_object
+from app.services.llm_cache import ExtractionCache, make_key
+
 load_dotenv()
 
+LLM_MODEL = os.getenv("LLM_MODEL", "deepseek-chat")
+
+# 各字段在 prompt 里的说明，按需组合（规则抽取已拿到的字段不再让模型抽）
+FIELD_SPECS = {
+    "name": "- name",
+    "school": "- school",
+    "major": "- major",
+    "degree": "- degree",
+    "grad_year": "- grad_year（毕业年份，整数）",
+    "phone": "- phone",
+    "email": "- email",
+    "skills": "- skills（数组，列出简历中的关键技能）",
+}
+
+PROMPT_TEMPLATE = """
+请从下面简历文本中提取信息，并只输出 JSON：
+
+字段：
+{fields}
+
+缺失填 null。
+
+简历文本：
+{text}
+"""
+
+# prompt 模板的版本号：模板或字段说明一改，缓存键随之变化
+PROMPT_VERSION = hashlib.sha256(
+    (PROMPT_TEMPLATE + json.dumps(FIELD_SPECS, ensure_ascii=False)).encode("utf-8")
+).hexdigest()[:12]
+
+_cache: ExtractionCache | None = None
+
+
+def _get_cache() -> ExtractionCache | None:
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ExtractionCache(
+            LLM_CACHE_PATH,
+            prompt_version=PROMPT_VERSION,
+            max_bytes=LLM_CACHE_MAX_BYTES,
+            ttl=LLM_CACHE_TTL,
+        )
+    return _cache
+
+
+def get_stats() -> dict:
+    """LLM 相关运行指标。"""
+    cache = _get_cache()
+    return {
+        "cache": cache.stats() if cache else None,
+        "client": llm_client.stats(),
+        "rules": rule_extractor.stats(),
+        "compaction": text_compactor.stats(),
+        "batching": dict(_batch_stats),
+        "streaming": _stream_stats(),
+    }
+
 def _extract_json(text: str) -> dict:
     """
     尽量从模型输出里抠出 JSON 对象。
@@ -16,10 +96,10 @@ def _extract_json(text: str) -> dict:
     if m:
         return json.loads(m.group(1))
 
-    # 再抓第一个 { ... } 块
-    m = re.search(r"(\{.*\})", text, flags=re.S)
-    if m:
-        return json.loads(m.group(1))
+    # 再抓第一个完整的 { ... } 块（按括号配对，不会吞掉后面多余的括号）
+    obj = first_json_object(text)
+    if obj:
+        return json.loads(obj)
 
     # 最后尝试直接 parse
     return json.loads(text)
@@ -62,77 +142,281 @@ def _normalize_result(d: dict) -> dict:
     return out
 
 
-async def extract_resume_info(text: str) -> dict:
+async def extract_resume_info(text: str, fields: Iterable[str] | None = None) -> dict:
     """
-    输入：简历文本
-    输出：结构化 dict
+    输入：简历文本；fields 为需要模型抽取的字段，默认全部
+    输出：结构化 dict（未请求的字段为 None）
+    文本先按 token 预算压缩；压缩后文本（空白差异不计）+ 模型 + prompt 版本 + 字段
+    命中缓存时不调用模型。
     """
-    api_key = os.getenv("LLM_API_KEY")
-    if not api_key:
-        raise RuntimeError("未设置 LLM_API_KEY")
+    text, fields, key = _prepare(text, fields)
+    return await _extract_prepared(text, fields, key)
 
-    prompt = f"""
-请从下面简历文本中提取信息，并只输出 JSON：
 
-字段：
-- name
-- school
-- major
-- degree
-- grad_year（毕业年份，整数）
-- phone
-- email
-- skills（数组，列出简历中的关键技能）
+def _prepare(text: str, fields: Iterable[str] | None) -> tuple[str, list[str], str]:
+    """压缩文本、规范字段列表并计算缓存键。"""
+    fields = [f for f in FIELD_SPECS if fields is None or f in set(fields)]
+    if LLM_COMPACTION_ENABLED:
+        text = text_compactor.compact(text, LLM_PROMPT_TOKEN_BUDGET, fields)
+    version = PROMPT_VERSION
+    if len(fields) < len(FIELD_SPECS):
+        version = f"{PROMPT_VERSION}:{','.join(fields)}"
+    return text, fields, make_key(text, LLM_MODEL, version)
 
-缺失填 null。
 
-简历文本：
-{text}
-""".strip()
+async def _extract_prepared(text: str, fields: list[str], key: str) -> dict:
+    cache = _get_cache()
+    if cache:
+        cached = await cache.aget(key)
+        if cached is not None:
+            return cached
+
+    result = await _call_llm(text, fields)
+    if cache:
+        await cache.aset(key, result)
+    return result
+
+
+async def _call_llm(text: str, fields: list[str]) -> dict:
+    prompt = PROMPT_TEMPLATE.format(
+        fields="\n".join(FIELD_SPECS[f] for f in fields),
+        text=text,
+    ).strip()
 
-    headers = {"Authorization": f"Bearer {api_key}"}
     payload = {
-        "model": "deepseek-chat",
+        "model": LLM_MODEL,
         "messages": [
             {"role": "user", "content": prompt}
         ],
         "temperature": 0
     }
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            "https://api.deepseek.com/v1/chat/completions",
-            headers=headers,
-            json=payload,
-        )
-        resp.raise_for_status()
-
-        content = resp.json()["choices"][0]["message"]["content"]
-
-    # 直接找第一个 { ... }
-    match = re.search(r"\{.*\}", content, re.S)
-    if not match:
+    if LLM_STREAM:
+        obj = await _stream_object(payload)
+    else:
+        data = await llm_client.post_chat(payload)
+        content = data["choices"][0]["message"]["content"]
+        # 第一个括号配对完整的 { ... }
+        obj = first_json_object(content)
+    if not obj:
         raise ValueError("模型未返回 JSON")
 
-    data = json.loads(match.group())
+    # 与批量抽取共用同一套清洗，同一份简历是否攒批不影响字段形态
+    return _normalize_result(json.loads(obj))
 
-    # 简单清洗
-    skills = data.get("skills", [])
-    if isinstance(skills, str):
-        skills = [s.strip() for s in re.split(r"[,\n]", skills) if s.strip()]
 
-    grad_year = data.get("grad_year")
-    if isinstance(grad_year, str):
-        m = re.search(r"(19|20)\d{2}", grad_year)
-        grad_year = int(m.group()) if m else None
+_streaming = {"requests": 0, "stopped_at_object": 0, "ttff_ms": 0.0, "ttff_samples": 0, "total_ms": 0.0}
 
+
+def _stream_stats() -> dict:
+    n = _streaming["requests"]
+    samples = _streaming["ttff_samples"]
     return {
-        "name": data.get("name"),
-        "school": data.get("school"),
-        "major": data.get("major"),
-        "degree": data.get("degree"),
-        "grad_year": grad_year,
-        "phone": data.get("phone"),
-        "email": data.get("email"),
-        "skills": skills,
+        "requests": n,
+        "stopped_at_object": _streaming["stopped_at_object"],
+        "avg_time_to_first_field_ms": round(_streaming["ttff_ms"] / samples, 1) if samples else None,
+        "avg_total_ms": round(_streaming["total_ms"] / n, 1) if n else None,
+    }
+
+
+async def _stream_object(payload: dict) -> str | None:
+    """
+    流式接收模型输出并增量扫描，JSON 对象一闭合就停止读取（关闭连接，取消剩余生成）。
+    """
+    scanner = JsonObjectScanner()
+    start = time.perf_counter()
+    obj = None
+    stream = llm_client.stream_chat(payload)
+    try:
+        async for delta in stream:
+            fields_before = scanner.fields_closed
+            obj = scanner.feed(delta)
+            if fields_before == 0 and scanner.fields_closed:
+                _streaming["ttff_ms"] += (time.perf_counter() - start) * 1000
+                _streaming["ttff_samples"] += 1
+            if obj is not None:
+                _streaming["stopped_at_object"] += 1
+                break
+    finally:
+        await stream.aclose()
+        _streaming["requests"] += 1
+        _streaming["total_ms"] += (time.perf_counter() - start) * 1000
+    return obj
+
+
+BATCH_PROMPT_TEMPLATE = """
+下面有多份简历，每份以「### doc_id: <编号>」开头。请逐份提取信息，只输出一个 JSON 数组，
+数组里每个元素对应一份简历，必须包含 doc_id 字段（原样返回编号），以及：
+
+字段：
+{fields}
+
+缺失填 null。
+
+{documents}
+"""
+
+_batch_stats = {"batches": 0, "batched_docs": 0, "fallbacks": 0}
+
+
+def _extract_json_array(text: str) -> list:
+    text = text.strip()
+    m = re.search(r"```(?:json)?\s*(\[.*?\])\s*```", text, flags=re.S)
+    if m:
+        return json.loads(m.group(1))
+    start, end = text.find("["), text.rfind("]")
+    if start == -1 or end < start:
+        raise ValueError("模型未返回 JSON 数组")
+    return json.loads(text[start:end + 1])
+
+
+async def _call_llm_batch(docs: list[tuple[str, str]], fields: list[str]) -> dict[str, dict]:
+    """
+    docs：[(doc_id, 已压缩文本), ...]。返回 doc_id -> 规范化结果，
+    缺失或格式不对的元素不在返回值里。
+    """
+    prompt = BATCH_PROMPT_TEMPLATE.format(
+        fields="\n".join(FIELD_SPECS[f] for f in fields),
+        documents="\n\n".join(f"### doc_id: {doc_id}\n{text}" for doc_id, text in docs),
+    ).strip()
+    payload = {
+        "model": LLM_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0,
     }
+    data = await llm_client.post_chat(payload)
+    items = _extract_json_array(data["choices"][0]["message"]["content"])
+
+    expected = {doc_id for doc_id, _ in docs}
+    results: dict[str, dict] = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        doc_id = str(item.get("doc_id"))
+        if doc_id not in expected or doc_id in results:
+            continue
+        results[doc_id] = _normalize_result(item)
+    return results
+
+
+async def extract_resume_info_batch(
+    docs: list[tuple[str, str, Iterable[str] | None]],
+) -> dict[str, dict | Exception]:
+    """
+    批量抽取：docs 为 [(doc_id, 简历文本, 需要的字段或 None), ...]。
+    命中缓存的直接返回；其余按 LLM_BATCH_MAX_DOCS / LLM_BATCH_TOKEN_BUDGET 打包成一次请求，
+    某一份解析失败时只对这一份退回单份调用；单份调用仍失败时该 doc_id 对应异常对象。
+    """
+    cache = _get_cache()
+    results: dict[str, dict | Exception] = {}
+    pending: list[tuple[str, str, list[str], str]] = []
+    for doc_id, text, fields in docs:
+        text, fields, key = _prepare(text, fields)
+        cached = await cache.aget(key) if cache else None
+        if cached is not None:
+            results[doc_id] = cached
+        else:
+            pending.append((doc_id, text, fields, key))
+
+    # 按 token 预算打包
+    groups: list[list[tuple[str, str, list[str], str]]] = []
+    budget = 0
+    for doc in pending:
+        tokens = text_compactor.estimate_tokens(doc[1])
+        if not groups or len(groups[-1]) >= LLM_BATCH_MAX_DOCS or budget + tokens > LLM_BATCH_TOKEN_BUDGET:
+            groups.append([])
+            budget = 0
+        groups[-1].append(doc)
+        budget += tokens
+
+    async def run_group(group):
+        fields = [f for f in FIELD_SPECS if any(f in doc[2] for doc in group)]
+        batch_results: dict[str, dict] = {}
+        if len(group) > 1:
+            try:
+                batch_results = await _call_llm_batch(
+                    [(doc_id, text) for doc_id, text, _, _ in group], fields
+                )
+                _batch_stats["batches"] += 1
+                _batch_stats["batched_docs"] += len(batch_results)
+            except Exception:
+                # 整批请求失败或输出不可用，全部退回单份
+                batch_results = {}
+
+        for doc_id, text, doc_fields, key in group:
+            result = batch_results.get(doc_id)
+            if result is None:
+                if len(group) > 1:
+                    _batch_stats["fallbacks"] += 1
+                try:
+                    result = await _call_llm(text, doc_fields)
+                except Exception as exc:
+                    results[doc_id] = exc
+                    continue
+            if cache:
+                await cache.aset(key, result)
+            results[doc_id] = result
+
+    await asyncio.gather(*(run_group(g) for g in groups))
+    return results
+
+
+class ExtractionBatcher:
+    """
+    把同一时间窗口内的多次抽取请求攒成一批，交给 extract_resume_info_batch。
+    用于批量导入：各文件的流水线照常并发运行，只在 LLM 这一步合并请求。
+    """
+
+    def __init__(self):
+        self._pending: list[tuple[str, str, list[str] | None, asyncio.Future]] = []
+        self._tokens = 0
+        self._seq = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def extract(self, text: str, fields: Iterable[str] | None = None) -> dict:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        tokens = min(text_compactor.estimate_tokens(text), LLM_PROMPT_TOKEN_BUDGET)
+        if self._pending and self._tokens + tokens > LLM_BATCH_TOKEN_BUDGET:
+            self._flush()
+
+        self._seq += 1
+        self._pending.append(
+            (str(self._seq), text, list(fields) if fields is not None else None, future)
+        )
+        self._tokens += tokens
+        if len(self._pending) >= LLM_BATCH_MAX_DOCS:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(LLM_BATCH_WINDOW_MS / 1000, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._tokens = self._pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            results = await extract_resume_info_batch(
+                [(doc_id, text, fields) for doc_id, text, fields, _ in batch]
+            )
+        except Exception as exc:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for doc_id, _, _, future in batch:
+            if future.done():
+                continue
+            result = results[doc_id]
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -1,11 +1,33 @@
 # app/services/minio_service.py
 # pip install minio
 
+import asyncio
 import os
 import io
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import AsyncIterator, Iterable, Optional
+
+import certifi
+import urllib3
 from minio import Minio
+from minio.datatypes import Object
+from minio.error import S3Error
+from urllib3.util import Retry, Timeout
+
+from app.config.settings import (
+    MINIO_CONNECT_TIMEOUT,
+    MINIO_IO_WORKERS,
+    MINIO_PART_SIZE,
+    MINIO_POOL_SIZE,
+    MINIO_READ_TIMEOUT,
+)
 
 _client = None
+# minio SDK 全是阻塞调用，统一放到这个线程池里执行
+_io_executor: ThreadPoolExecutor | None = None
+# 已确认存在的 bucket，进程内只检查一次
+_checked_buckets: set[str] = set()
 
 
 def _get_client() -> Minio:
@@ -13,26 +35,61 @@ def _get_client() -> Minio:
     if _client:
         return _client
 
+    secure = os.getenv("MINIO_SECURE", "false").lower() == "true"
+    # 所有 I/O 线程共享一个连接池，maxsize 与线程数匹配，避免连接反复丢弃重建
+    http_client = urllib3.PoolManager(
+        timeout=Timeout(connect=MINIO_CONNECT_TIMEOUT, read=MINIO_READ_TIMEOUT),
+        maxsize=MINIO_POOL_SIZE,
+        block=True,
+        cert_reqs="CERT_REQUIRED" if secure else "CERT_NONE",
+        ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+        retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[500, 502, 503, 504],
+        ),
+    )
     _client = Minio(
         endpoint=os.getenv("MINIO_ENDPOINT", "127.0.0.1:9101"),
         access_key=os.getenv("MINIO_ACCESS_KEY", "minioadmin"),
         secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
-        secure=os.getenv("MINIO_SECURE", "false").lower() == "true",
+        secure=secure,
+        http_client=http_client,
     )
     return _client
 
 
+def _get_io_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=MINIO_IO_WORKERS, thread_name_prefix="minio-io"
+        )
+    return _io_executor
+
+
+def shutdown_io():
+    global _io_executor
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=True)
+        _io_executor = None
+
+
+async def run_io(func, *args):
+    """在 MinIO I/O 线程池里执行阻塞调用。"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_io_executor(), func, *args)
+
+
 def _ensure_bucket(client: Minio, bucket: str):
+    if bucket in _checked_buckets:
+        return
     if not client.bucket_exists(bucket):
         client.make_bucket(bucket)
+    _checked_buckets.add(bucket)
 
 
-async def upload_file(
-    bucket: str,
-    object_key: str,
-    content: bytes,
-    content_type: str = "application/octet-stream",
-):
+def _put_object(bucket: str, object_key: str, content: bytes, content_type: str):
     client = _get_client()
     _ensure_bucket(client, bucket)
 
@@ -44,3 +101,118 @@ async def upload_file(
         length=len(content),
         content_type=content_type,
     )
+
+
+async def upload_file(
+    bucket: str,
+    object_key: str,
+    content: bytes,
+    content_type: str = "application/octet-stream",
+):
+    await run_io(_put_object, bucket, object_key, content, content_type)
+
+
+def _put_file(bucket: str, object_key: str, path: str, content_type: str):
+    client = _get_client()
+    _ensure_bucket(client, bucket)
+
+    # length=-1：按 part_size 分片流式上传，内存里最多只有一个分片
+    with open(path, "rb") as data:
+        client.put_object(
+            bucket_name=bucket,
+            object_name=object_key,
+            data=data,
+            length=-1,
+            part_size=MINIO_PART_SIZE,
+            content_type=content_type,
+        )
+
+
+async def upload_path(
+    bucket: str,
+    object_key: str,
+    path: str,
+    content_type: str = "application/octet-stream",
+):
+    """把本地文件流式上传到 MinIO，不整体读入内存。"""
+    await run_io(_put_file, bucket, object_key, path, content_type)
+
+
+async def upload_many(
+    bucket: str,
+    objects: Iterable[tuple[str, bytes]],
+    content_type: str = "application/octet-stream",
+):
+    """
+    并发上传多个对象：objects 为 (object_key, content) 序列。
+    并发度由 I/O 线程池大小决定。
+    """
+    objects = list(objects)
+    if not objects:
+        return
+    # 先确认 bucket，避免并发的首批上传重复检查
+    await run_io(_ensure_bucket, _get_client(), bucket)
+    await asyncio.gather(
+        *(
+            upload_file(bucket, object_key, content, content_type)
+            for object_key, content in objects
+        )
+    )
+
+
+def _stat(bucket: str, object_key: str) -> Optional[Object]:
+    try:
+        return _get_client().stat_object(bucket, object_key)
+    except S3Error as exc:
+        if exc.code in ("NoSuchKey", "NoSuchBucket", "NoSuchObject"):
+            return None
+        raise
+
+
+async def stat_object(bucket: str, object_key: str) -> Optional[Object]:
+    """对象元数据（size / etag / content_type）；不存在时返回 None。"""
+    return await run_io(_stat, bucket, object_key)
+
+
+async def download_path(bucket: str, object_key: str, path: str):
+    """把对象下载到本地文件（SDK 先写临时文件再改名）。"""
+    await run_io(_get_client().fget_object, bucket, object_key, path)
+
+
+async def stream_object(
+    bucket: str,
+    object_key: str,
+    offset: int = 0,
+    length: int = 0,
+    chunk_size: int = 256 * 1024,
+) -> AsyncIterator[bytes]:
+    """
+    分块读取对象（length=0 表示读到末尾），每块在 I/O 线程池里读，内存里最多一个块。
+    """
+    response = await run_io(_get_client().get_object, bucket, object_key, offset, length)
+    try:
+        while True:
+            chunk = await run_io(response.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        response.close()
+        response.release_conn()
+
+
+async def presigned_get_url(
+    bucket: str,
+    object_key: str,
+    expires_seconds: int,
+    response_headers: Optional[dict[str, str]] = None,
+) -> str:
+    """短时有效的下载地址，客户端直接从 MinIO 取，不经过 API 进程。"""
+    return await run_io(
+        lambda: _get_client().presigned_get_object(
+            bucket,
+            object_key,
+            expires=timedelta(seconds=expires_seconds),
+            response_headers=response_headers,
+        )
+    )
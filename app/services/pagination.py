@@ -0,0 +1,113 @@
+# app/services/pagination.py
+"""
+列表接口的 keyset（游标）分页。
+
+按 (时间字段, id) 倒序翻页：下一页取「严格早于上一页最后一条」的记录，
+WHERE + ORDER BY 都落在 (时间字段) 索引上（InnoDB 二级索引自带主键），
+第 5000 页和第 1 页一样只读 page_size + 1 行。
+
+游标是 base64url 编码的 JSON（{"t": 时间, "id": id, "d": "next" / "prev"}），对调用方不透明。
+total 可以关闭；开启时按过滤条件缓存 PAGINATION_TOTAL_TTL 秒，列表翻页不重复 count()。
+"""
+
+import base64
+import json
+import time
+from datetime import datetime
+from typing import Any, Hashable, Optional
+
+from tortoise.expressions import Q
+from tortoise.queryset import QuerySet
+
+from app.config.settings import PAGINATION_TOTAL_TTL
+
+
+class InvalidCursor(ValueError):
+    """游标无法解析。"""
+
+
+# 过滤条件 -> (计算时间, total)
+_totals: dict[Hashable, tuple[float, int]] = {}
+_TOTALS_MAX = 1024
+
+
+def encode_cursor(at: datetime, pk: int, direction: str) -> str:
+    raw = json.dumps({"t": at.isoformat(), "id": pk, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        direction = data["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data["t"]), int(data["id"]), direction
+    except (ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursor("无效的分页游标") from exc
+
+
+async def cached_count(qs: QuerySet, key: Hashable) -> int:
+    """同一组过滤条件的 total 在 PAGINATION_TOTAL_TTL 秒内复用。"""
+    now = time.monotonic()
+    hit = _totals.get(key)
+    if hit is not None and now - hit[0] < PAGINATION_TOTAL_TTL:
+        return hit[1]
+    total = await qs.count()
+    if len(_totals) >= _TOTALS_MAX:
+        _totals.clear()
+    _totals[key] = (now, total)
+    return total
+
+
+async def paginate(
+    qs: QuerySet,
+    *,
+    time_field: str,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+    with_total: bool = True,
+    total_key: Optional[Hashable] = None,
+) -> dict[str, Any]:
+    """
+    返回 {"total", "items", "next_cursor", "prev_cursor"}，按 (time_field, id) 倒序。
+
+    没有 cursor 时从第一页开始；page > 1 时兼容旧的 offset 翻页（深分页仍然慢，仅供过渡）。
+    with_total=False 时 total 为 None，不做 count()。
+    """
+    total = None
+    if with_total:
+        total = await cached_count(qs, total_key) if total_key is not None else await qs.count()
+
+    newest_first = (f"-{time_field}", "-id")
+    if cursor:
+        at, pk, direction = decode_cursor(cursor)
+        if direction == "next":
+            older = Q(**{f"{time_field}__lt": at}) | Q(**{time_field: at, "id__lt": pk})
+            rows = await qs.filter(older).order_by(*newest_first).limit(page_size + 1)
+        else:
+            newer = Q(**{f"{time_field}__gt": at}) | Q(**{time_field: at, "id__gt": pk})
+            rows = await qs.filter(newer).order_by(time_field, "id").limit(page_size + 1)
+        more = len(rows) > page_size
+        rows = rows[:page_size]
+        if direction == "prev":
+            rows.reverse()
+        has_next = more if direction == "next" else True
+        has_prev = more if direction == "prev" else True
+    else:
+        rows = await qs.order_by(*newest_first).offset((page - 1) * page_size).limit(page_size + 1)
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        has_prev = page > 1
+
+    def _cursor(row, direction: str) -> str:
+        return encode_cursor(getattr(row, time_field), row.id, direction)
+
+    return {
+        "total": total,
+        "items": rows,
+        "next_cursor": _cursor(rows[-1], "next") if rows and has_next else None,
+        "prev_cursor": _cursor(rows[0], "prev") if rows and has_prev else None,
+    }
@@ -1,28 +1,147 @@
 # services/pdf_service.py
 
+import asyncio
+import multiprocessing
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
 import fitz  # PyMuPDF
-import io
+
+from app.services.text_compactor import strip_page_furniture
+
+from app.config.settings import (
+    PDF_MAX_PAGES,
+    PDF_PARSE_EXECUTOR,
+    PDF_PARSE_TIMEOUT,
+    PDF_PARSE_WORKERS,
+)
+
+_executor: Executor | None = None
+# 因任务超时被终止的进程池
+_killed: "weakref.WeakSet[Executor]" = weakref.WeakSet()
+
+
+class PdfParseError(ValueError):
+    """PDF 无法解析（损坏、超时或解析进程崩溃）。"""
 
 
-def parse_pdf(pdf_bytes: bytes):
+def parse_pdf(source: bytes | str, max_pages: int | None = None):
     """
+    source：PDF 字节或本地文件路径（路径方式由 MuPDF 按需读取，不复制整份文件）。
     返回：
-    - text: 全文文本
+    - text: 全文文本（已去掉各页重复的页眉页脚）
     - images: [bytes, ...]
+    max_pages 不为空时只解析前 max_pages 页。
     """
-    doc = fitz.open(stream=pdf_bytes,filetype='pdf')
+    if isinstance(source, str):
+        doc = fitz.open(source, filetype='pdf')
+    else:
+        doc = fitz.open(stream=source,filetype='pdf')
 
-    texts = []
+    pages = []
     images = []
 
-    for page in doc:
-        # 文本
-        texts.append(page.get_text())
+    try:
+        for page_no, page in enumerate(doc):
+            if max_pages is not None and page_no >= max_pages:
+                break
+            # 文本：按块取，带坐标用于识别页眉页脚（block_type 1 为图片块）
+            blocks = [
+                (b[1], b[3], b[4].strip())
+                for b in page.get_text("blocks")
+                if b[6] == 0 and b[4].strip()
+            ]
+            pages.append((page.rect.height, blocks))
 
-        # 图片
-        for img in page.get_images(full=True):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
-            images.append(base_image["image"])
+            # 图片
+            for img in page.get_images(full=True):
+                xref = img[0]
+                base_image = doc.extract_image(xref)
+                images.append(base_image["image"])
+    finally:
+        doc.close()
 
+    texts = strip_page_furniture(pages)
     return "\n".join(texts), images
+
+
+def _warmup() -> bool:
+    # 子进程启动时已 import fitz，这里只用来让进程池提前拉起全部进程
+    return True
+
+
+def _new_executor() -> Executor:
+    if PDF_PARSE_EXECUTOR == "thread":
+        return ThreadPoolExecutor(
+            max_workers=PDF_PARSE_WORKERS, thread_name_prefix="pdf-parse"
+        )
+    # spawn：不继承事件循环和线程状态，Windows / Linux 行为一致
+    return ProcessPoolExecutor(
+        max_workers=PDF_PARSE_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        _executor = _new_executor()
+    return _executor
+
+
+async def start_executor():
+    """应用启动时预热解析进程池。"""
+    executor = _get_executor()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(executor, _warmup) for _ in range(PDF_PARSE_WORKERS))
+    )
+
+
+def shutdown_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _recycle_executor(executor: Executor, timed_out: bool = False):
+    """
+    丢弃出问题的进程池（超时 / 崩溃），下次调用时重建。
+    超时时子进程会被直接终止，避免一直占着 CPU；进程池里无法只杀执行超时任务的那个进程，
+    同池其他任务会收到 BrokenProcessPool，由 parse_pdf_async 换新池重跑一次。
+    """
+    global _executor
+    if _executor is executor:
+        _executor = None
+    if isinstance(executor, ProcessPoolExecutor) and timed_out:
+        _killed.add(executor)
+        for proc in list((getattr(executor, "_processes", None) or {}).values()):
+            proc.terminate()
+    # 不取消排队中的任务：进程被终止后它们会以 BrokenProcessPool 结束，而不是 CancelledError
+    executor.shutdown(wait=False, cancel_futures=not timed_out)
+
+
+async def parse_pdf_async(source: bytes | str):
+    """
+    在解析执行器里运行 parse_pdf，不阻塞事件循环。
+    损坏的 PDF、超时和子进程崩溃统一抛 PdfParseError。
+    """
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        executor = _get_executor()
+        future = loop.run_in_executor(executor, parse_pdf, source, PDF_MAX_PAGES)
+        try:
+            return await asyncio.wait_for(future, timeout=PDF_PARSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            _recycle_executor(executor, timed_out=True)
+            raise PdfParseError(f"PDF解析超时（>{PDF_PARSE_TIMEOUT}s）")
+        except BrokenProcessPool:
+            if executor in _killed and attempt == 0:
+                # 进程池是因为别的任务超时被回收的，本任务没问题，换新池重跑
+                continue
+            _recycle_executor(executor)
+            raise PdfParseError("PDF解析进程异常退出")
+        except Exception as exc:  # fitz.FileDataError / RuntimeError / ValueError 等
+            raise PdfParseError(f"PDF无法解析：{exc}") from exc
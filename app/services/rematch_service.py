@@ -0,0 +1,214 @@
+# app/services/rematch_service.py
+"""
+条件变更后的存量重新匹配：
+
+条件新增 / 修改 / 删除时为该条件创建一个 ConditionRematchJob，由进程内单个 worker 依次执行：
+按 id 升序（keyset，不用 offset）每次读 REMATCH_BATCH_SIZE 行，只重新判断这一个条件，
+把 matched_condition_ids 有变化的行用 bulk_update 写回并同步关联表，然后记录断点 last_id。
+每批是独立的短语句，不会长时间锁表；进程重启后从断点继续。
+
+任务串行执行，避免两个条件的任务同时改写同一行的 JSON 列表。
+
+扫描到末尾后任务仍保持 running：变更前按旧条件匹配、扫描结束后才提交的新简历
+（本进程在途的入库，或其他进程在 CONDITION_INDEX_TTL 内仍用旧索引匹配的入库）会漏掉，
+所以等 CONDITION_INDEX_TTL 后从断点再扫一次尾部，之后才标记为 done。
+"""
+
+import asyncio
+from typing import Optional
+
+from tortoise.transactions import in_transaction
+
+from app.config.settings import CONDITION_INDEX_TTL, REMATCH_BATCH_PAUSE_MS, REMATCH_BATCH_SIZE
+from app.db.models.condition_match import ScreeningConditionMatch
+from app.db.models.screening import ScreeningResume
+from app.db.models.selection import ConditionRematchJob, ScreeningCondition
+from app.services.condition_index import match_condition
+
+_ROW_FIELDS = (
+    "id",
+    "extracted_name",
+    "extracted_school",
+    "extracted_major",
+    "extracted_degree",
+    "extracted_grad_year",
+    "matched_condition_ids",
+)
+
+_queue: Optional[asyncio.Queue] = None
+_worker_task: Optional[asyncio.Task] = None
+# 条件 id -> 最新任务 id；旧任务在批次之间发现自己被取代后停止
+_latest: dict[int, int] = {}
+
+
+def _get_queue() -> asyncio.Queue:
+    global _queue
+    if _queue is None:
+        _queue = asyncio.Queue()
+    return _queue
+
+
+def _row_result(row: ScreeningResume) -> dict:
+    return {
+        "name": row.extracted_name,
+        "school": row.extracted_school,
+        "major": row.extracted_major,
+        "degree": row.extracted_degree,
+        "grad_year": row.extracted_grad_year,
+    }
+
+
+async def schedule(condition_id: int) -> ConditionRematchJob:
+    """为条件创建重新匹配任务；该条件尚未开始 / 进行中的旧任务标记为 superseded。"""
+    await ConditionRematchJob.filter(
+        condition_id=condition_id, status__in=("pending", "running")
+    ).update(status="superseded")
+    job = await ConditionRematchJob.create(condition_id=condition_id)
+    _latest[condition_id] = job.id
+    start_worker()
+    _get_queue().put_nowait((job.id, False))
+    return job
+
+
+async def resume_pending():
+    """启动时继续上次未完成的任务（每个条件只保留最新的一个）。"""
+    jobs = await ConditionRematchJob.filter(status__in=("pending", "running")).order_by("id")
+    latest: dict[int, ConditionRematchJob] = {}
+    for job in jobs:
+        previous = latest.get(job.condition_id)
+        if previous is not None:
+            previous.status = "superseded"
+            await previous.save(update_fields=["status", "updated_at"])
+        latest[job.condition_id] = job
+
+    start_worker()
+    for job in latest.values():
+        _latest[job.condition_id] = job.id
+        _get_queue().put_nowait((job.id, False))
+
+
+def start_worker():
+    global _worker_task
+    if _worker_task is None or _worker_task.done():
+        _worker_task = asyncio.create_task(_worker(_get_queue()))
+
+
+async def stop_worker():
+    """停止 worker；进行中的任务保持 running 状态，下次启动时从断点继续。"""
+    global _worker_task
+    if _worker_task is not None:
+        _worker_task.cancel()
+        await asyncio.gather(_worker_task, return_exceptions=True)
+        _worker_task = None
+
+
+async def get_job(job_id: int) -> Optional[ConditionRematchJob]:
+    return await ConditionRematchJob.get_or_none(id=job_id)
+
+
+async def latest_job(condition_id: int) -> Optional[ConditionRematchJob]:
+    return await ConditionRematchJob.filter(condition_id=condition_id).order_by("-id").first()
+
+
+async def _worker(queue: asyncio.Queue):
+    while True:
+        job_id, tail = await queue.get()
+        try:
+            job = await ConditionRematchJob.get_or_none(id=job_id)
+            if job is not None and job.status in ("pending", "running"):
+                await _run(job, tail)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:  # 单个任务失败不影响 worker
+            await ConditionRematchJob.filter(id=job_id).update(
+                status="failed", error=f"{type(exc).__name__}: {exc}"
+            )
+        finally:
+            queue.task_done()
+
+
+def _schedule_tail(job_id: int):
+    """CONDITION_INDEX_TTL 后把任务以尾部扫描的方式重新入队（不占着 worker 等待）。"""
+    asyncio.get_running_loop().call_later(
+        CONDITION_INDEX_TTL + 1, _get_queue().put_nowait, (job_id, True)
+    )
+
+
+async def _run(job: ConditionRematchJob, tail: bool = False):
+    """tail 为 False 时扫到末尾后安排尾部扫描；为 True 时从断点扫完后结束任务。"""
+    condition = await ScreeningCondition.get_or_none(id=job.condition_id)
+    # 已删除 / 停用的条件：从所有简历里移除
+    active = (
+        condition is not None and condition.status == "active" and not condition.is_deleted
+    )
+
+    if job.status == "pending":
+        job.status = "running"
+        job.total = await ScreeningResume.all().count()
+        await job.save(update_fields=["status", "total", "updated_at"])
+
+    while True:
+        if _latest.get(job.condition_id, job.id) != job.id:
+            job.status = "superseded"
+            await job.save(update_fields=["status", "updated_at"])
+            return
+
+        rows = (
+            await ScreeningResume.filter(id__gt=job.last_id)
+            .order_by("id")
+            .limit(REMATCH_BATCH_SIZE)
+            .only(*_ROW_FIELDS)
+        )
+        if not rows:
+            break
+
+        changed, added, removed = [], [], []
+        for row in rows:
+            # 历史数据里可能混有字符串形式的 id
+            ids = [int(i) for i in row.matched_condition_ids or [] if str(i).isdigit()]
+            had = job.condition_id in ids
+            wants = active and match_condition(_row_result(row), condition)
+            if had == wants:
+                continue
+            if wants:
+                ids = sorted(ids + [job.condition_id])
+                added.append(row.id)
+            else:
+                ids = [i for i in ids if i != job.condition_id]
+                removed.append(row.id)
+            row.matched_condition_ids = ids
+            changed.append(row)
+
+        if changed:
+            async with in_transaction():
+                await ScreeningResume.bulk_update(changed, fields=["matched_condition_ids"])
+                if added:
+                    await ScreeningConditionMatch.bulk_create(
+                        [
+                            ScreeningConditionMatch(condition_id=job.condition_id, screening_id=sid)
+                            for sid in added
+                        ],
+                        ignore_conflicts=True,
+                    )
+                if removed:
+                    await ScreeningConditionMatch.filter(
+                        condition_id=job.condition_id, screening_id__in=removed
+                    ).delete()
+
+        job.last_id = rows[-1].id
+        job.processed += len(rows)
+        job.changed += len(changed)
+        await job.save(update_fields=["last_id", "processed", "changed", "updated_at"])
+
+        if len(rows) < REMATCH_BATCH_SIZE:
+            break
+        if REMATCH_BATCH_PAUSE_MS:
+            await asyncio.sleep(REMATCH_BATCH_PAUSE_MS / 1000)
+
+    if not tail:
+        _schedule_tail(job.id)
+        return
+    job.status = "done"
+    await job.save(update_fields=["status", "updated_at"])
+    if _latest.get(job.condition_id) == job.id:
+        _latest.pop(job.condition_id, None)
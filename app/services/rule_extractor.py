@@ -0,0 +1,217 @@
+# app/services/rule_extractor.py
+"""
+规则抽取：在调用 LLM 之前，从 page.get_text() 的文本里用正则 / 词典
+直接取出能确定的字段（手机、邮箱、学历、毕业年份、带标签的姓名/学校/专业、已知技能）。
+
+extract_rules 返回 (结果, 有把握的字段集合)；全部字段都有把握时可跳过 LLM，
+否则只让 LLM 补缺失的字段。
+"""
+
+import re
+from typing import Iterable
+
+from app.db.models.skill import Skill
+
+FIELDS = ("name", "school", "major", "degree", "grad_year", "phone", "email", "skills")
+
+_PHONE_RE = re.compile(r"(?<!\d)(?:\+?86[-\s]?)?(1[3-9]\d[-\s]?\d{4}[-\s]?\d{4})(?!\d)")
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# 姓名后面常紧跟下一个标签（"姓名：李四性别：男"），取最短的 2~4 个汉字，后面必须是分隔符或已知标签
+_NEXT_LABELS = "性别|年龄|出生|民族|籍贯|电话|手机|联系|邮箱|学历|学位|学校|院校|专业|毕业|政治|婚姻|求职|现居|住址|地址|身高|工作"
+_NAME_RE = re.compile(
+    rf"姓\s*名\s*[:：]\s*([一-龥]{{2,4}}?)(?=(?:{_NEXT_LABELS})|[^一-龥]|$)"
+    r"|Name\s*[:：]\s*([A-Za-z][A-Za-z .'-]{1,40})"
+)
+_SCHOOL_LABEL_RE = re.compile(r"(?:毕业院校|毕业学校|院校|学校)\s*[:：]\s*([^\s,，;；|]{2,40})")
+_SCHOOL_RE = re.compile(r"[一-龥]{2,20}(?:大学|学院)")
+# 无标签匹配会把前面的动词一起吞进来（"本科毕业于浙江大学"），截掉最后一个引导词之前的部分
+_SCHOOL_PREFIX_RE = re.compile(r"^.*(?:就读于|毕业于|求学于|就读|毕业|来自|考入|进入|曾在|于)")
+_MAJOR_RE = re.compile(r"专\s*业\s*[:：]\s*([^\s,，;；|]{2,40})")
+_GRAD_LABEL_RE = re.compile(r"毕业(?:时间|年份|日期)?\s*[:：]?\s*((?:19|20)\d{2})")
+_YEAR_RANGE_RE = re.compile(
+    r"((?:19|20)\d{2})\s*[./年-]?\s*\d{0,2}\s*月?\s*[-–—~至到]+\s*((?:19|20)\d{2})"
+)
+
+# 从高到低，命中多个时取最高学历
+_DEGREE_KEYWORDS = (
+    ("博士", ("博士",)),
+    ("硕士", ("硕士", "研究生")),
+    ("本科", ("本科", "学士")),
+    ("大专", ("大专", "专科")),
+)
+# 含学位字样但不是学历的词（"博士后"、"博士生导师"、"研究生支教团"），匹配前先去掉
+_DEGREE_NOISE_RE = re.compile(r"博士后|[博硕]士生?导师|[博硕]导|研究生(?:支教团|会|院)")
+# 学位词所在行或相邻行出现这些内容（或学校名）时，才认为是本人学历
+_DEGREE_CONTEXT_RE = re.compile(r"学\s*历|学\s*位|专\s*业|教育|university", re.IGNORECASE)
+# 英文学位词容易出现在职位 / 正文里（Scrum Master、Associate Engineer），按整词短语匹配，且只作候选值
+_DEGREE_EN_RES = (
+    ("博士", re.compile(r"\bph\.?\s?d\b|\bdoctor\s+of\b|\bdoctorate\b", re.IGNORECASE)),
+    ("硕士", re.compile(r"\bmaster(?:'s|s)?\s+(?:of|degree)\b|\bm\.?sc\b|\bmba\b", re.IGNORECASE)),
+    ("本科", re.compile(r"\bbachelor(?:'s|s)?\b|\bb\.?sc\b", re.IGNORECASE)),
+    ("大专", re.compile(r"\bassociate(?:'s)?\s+(?:of|degree)\b", re.IGNORECASE)),
+)
+
+# 内置技能词典，启动时再并入 skills 表里已有的技能名
+_known_skills: dict[str, str] = {}
+_skill_res: tuple[re.Pattern | None, re.Pattern | None] = (None, None)
+
+BUILTIN_SKILLS = (
+    "Python", "Java", "Go", "Golang", "C++", "C#", "JavaScript", "TypeScript", "PHP",
+    "Rust", "Kotlin", "Swift", "Scala", "SQL", "MySQL", "PostgreSQL", "Redis",
+    "MongoDB", "Elasticsearch", "Kafka", "RabbitMQ", "Docker", "Kubernetes", "Linux",
+    "Git", "Spring", "Spring Boot", "Django", "Flask", "FastAPI", "Vue", "React",
+    "Node.js", "HTML", "CSS", "Hadoop", "Spark", "Flink", "Hive", "TensorFlow",
+    "PyTorch", "Pandas", "NumPy", "机器学习", "深度学习", "自然语言处理", "计算机视觉",
+    "数据分析", "Excel", "AWS", "Nginx",
+)
+
+_stats = {"documents": 0, "llm_skipped": 0, "fields_saved": 0}
+
+
+def register_skills(names: Iterable[str]):
+    """把技能名并入词典并重建匹配正则。"""
+    global _skill_res
+    for name in names:
+        name = (name or "").strip()
+        if len(name) >= 2 or name in ("C", "R"):
+            _known_skills.setdefault(name.lower(), name)
+    # 两个字符以内的（Go、C#、R）区分大小写，避免误命中普通英文单词
+    short = [v for v in _known_skills.values() if len(v) <= 2]
+    long = [v for v in _known_skills.values() if len(v) > 2]
+
+    def build(words, flags):
+        if not words:
+            return None
+        alt = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+        return re.compile(rf"(?<![A-Za-z0-9+#.])(?:{alt})(?![A-Za-z0-9+#])", flags)
+
+    _skill_res = (build(long, re.IGNORECASE), build(short, 0))
+
+
+register_skills(BUILTIN_SKILLS)
+
+
+def _first_group(m: re.Match | None) -> str | None:
+    if not m:
+        return None
+    return next((g.strip() for g in m.groups() if g), None)
+
+
+def _extract_degree(text: str) -> tuple[str | None, bool]:
+    """
+    返回 (学历, 是否有把握)。学位词出现在学历 / 专业 / 学校所在行或其相邻行才算有把握；
+    更高学历的词只出现在别处时（可能是导师、经历描述），结果只作候选值。
+    """
+    lines = _DEGREE_NOISE_RE.sub(" ", text).splitlines()
+    context = [bool(_DEGREE_CONTEXT_RE.search(line) or _SCHOOL_RE.search(line)) for line in lines]
+    candidate = None
+    for degree, keywords in _DEGREE_KEYWORDS:
+        hits = [i for i, line in enumerate(lines) if any(k in line for k in keywords)]
+        if not hits:
+            continue
+        if any(context[j] for i in hits for j in (i - 1, i, i + 1) if 0 <= j < len(lines)):
+            return degree, candidate is None
+        candidate = candidate or degree
+    if candidate:
+        return candidate, False
+    return next((degree for degree, pattern in _DEGREE_EN_RES if pattern.search(text)), None), False
+
+
+def extract_rules(text: str, min_skills: int = 3) -> tuple[dict, set[str]]:
+    """
+    返回 (结果 dict, 有把握的字段集合)。结果里也可能带有没把握的候选值，
+    LLM 没给出时可以拿来兜底。
+    """
+    text = text or ""
+    out: dict = {f: None for f in FIELDS}
+    sure: set[str] = set()
+
+    m = _PHONE_RE.search(text)
+    if m:
+        out["phone"] = re.sub(r"[-\s]", "", m.group(1))
+        sure.add("phone")
+
+    m = _EMAIL_RE.search(text)
+    if m:
+        out["email"] = m.group(0)
+        sure.add("email")
+
+    name = _first_group(_NAME_RE.search(text))
+    if name:
+        out["name"] = name
+        sure.add("name")
+
+    school = _first_group(_SCHOOL_LABEL_RE.search(text))
+    if school:
+        out["school"] = school
+        sure.add("school")
+    else:
+        schools = list(dict.fromkeys(
+            school for school in (_SCHOOL_PREFIX_RE.sub("", m) for m in _SCHOOL_RE.findall(text))
+            if _SCHOOL_RE.fullmatch(school)
+        ))
+        if schools:
+            out["school"] = schools[0]
+            # 多所学校（本硕不同校）时不确定 LLM 会取哪个
+            if len(schools) == 1:
+                sure.add("school")
+
+    major = _first_group(_MAJOR_RE.search(text))
+    if major:
+        out["major"] = major
+        sure.add("major")
+
+    out["degree"], degree_sure = _extract_degree(text)
+    if degree_sure:
+        sure.add("degree")
+
+    m = _GRAD_LABEL_RE.search(text)
+    if m:
+        out["grad_year"] = int(m.group(1))
+        sure.add("grad_year")
+    else:
+        # 教育经历行里的时间段，取最晚的结束年份
+        years = [
+            int(r.group(2))
+            for line in text.splitlines()
+            if _SCHOOL_RE.search(line) or "university" in line.lower()
+            for r in _YEAR_RANGE_RE.finditer(line)
+        ]
+        if years:
+            out["grad_year"] = max(years)
+            sure.add("grad_year")
+
+    skills: list[str] = []
+    for pattern in _skill_res:
+        if pattern is None:
+            continue
+        for hit in pattern.findall(text):
+            canonical = _known_skills.get(hit.lower(), hit)
+            if canonical not in skills:
+                skills.append(canonical)
+    out["skills"] = skills
+    if len(skills) >= min_skills:
+        sure.add("skills")
+
+    return out, sure
+
+
+def record(sure: set[str], llm_skipped: bool):
+    _stats["documents"] += 1
+    _stats["fields_saved"] += len(sure)
+    if llm_skipped:
+        _stats["llm_skipped"] += 1
+
+
+def stats() -> dict:
+    docs = _stats["documents"]
+    return {
+        **_stats,
+        "avg_fields_saved": round(_stats["fields_saved"] / docs, 3) if docs else 0.0,
+        "llm_skip_rate": round(_stats["llm_skipped"] / docs, 4) if docs else 0.0,
+    }
+
+
+async def load_known_skills():
+    """启动时把 skills 表里的技能名并入词典。"""
+    register_skills(await Skill.all().values_list("name", flat=True))
@@ -1,64 +1,450 @@
 # app/services/screening_service.py
 
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
 import uuid
+import zipfile
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
 from fastapi import UploadFile
 from typing import List, Dict, Any
 
-from app.services.minio_service import upload_file
-from app.services.pdf_service import parse_pdf
-from app.services.llm_service import extract_resume_info
+from app.services.minio_service import upload_many, upload_path
+from app.services.pagination import paginate
+from app.services.pdf_service import parse_pdf_async
+from app.services.llm_service import ExtractionBatcher, extract_resume_info
+from app.services import condition_index, rule_extractor, search_service
+from app.db.models.condition_match import ScreeningConditionMatch
 from app.db.models.screening import ScreeningResume
-from app.db.models.selection import ScreeningCondition
-from tortoise.expressions import Q
+from app.config.settings import (
+    BATCH_CONCURRENCY,
+    BATCH_MAX_ENTRY_BYTES,
+    BATCH_MAX_FILES,
+    RULE_EXTRACTOR_ENABLED,
+    RULE_MIN_SKILLS,
+    STAGE_LIMIT_DB,
+    STAGE_LIMIT_LLM,
+    STAGE_LIMIT_PARSE,
+    STAGE_LIMIT_STORAGE,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SPOOL_DIR,
+)
+from tortoise.exceptions import IntegrityError
+from tortoise.expressions import F, Subquery
+from tortoise.functions import Sum
+from tortoise.transactions import in_transaction
 
 RESUME_BUCKET = "resumes"
 RESUME_IMAGE_BUCKET = "resume-images"
 
+# 各阶段并发上限，对单文件上传、异步队列、批量上传统一生效
+_STAGE_LIMITS = {
+    "storage": asyncio.Semaphore(STAGE_LIMIT_STORAGE),
+    "parse": asyncio.Semaphore(STAGE_LIMIT_PARSE),
+    "llm": asyncio.Semaphore(STAGE_LIMIT_LLM),
+    "db": asyncio.Semaphore(STAGE_LIMIT_DB),
+}
 
-async def upload_and_parse_pdf(file: UploadFile) -> ScreeningResume:
-    content = await file.read()
+# 正在处理中的内容哈希 -> Future（结果为 ScreeningResume，失败为 None），
+# 让同时到达的相同文件只处理一次
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+@dataclass
+class StagedPdf:
+    """已落到本地临时文件的上传 PDF。"""
+    path: str
+    sha256: str
+    size: int
+
+    def discard(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _spool_to_disk(src) -> StagedPdf:
+    """
+    按 UPLOAD_CHUNK_SIZE 分块把文件对象拷贝到临时文件，同时计算 SHA-256。
+    内存中始终只有一个缓冲块。
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=".pdf", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = src.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return StagedPdf(path=path, sha256=digest.hexdigest(), size=size)
+
+
+async def stage_upload(file: UploadFile) -> StagedPdf:
+    """把 UploadFile 的 spool 流式落盘（阻塞 I/O 放到线程里）。"""
+    await file.seek(0)
+    return await asyncio.to_thread(_spool_to_disk, file.file)
 
-    object_key = f"{uuid.uuid4()}.pdf"
-    await upload_file(
-        bucket=RESUME_BUCKET,
-        object_key=object_key,
-        content=content,
-        content_type="application/pdf",
-    )
 
-    text, images = parse_pdf(pdf_bytes=content)
-    image_object_keys: list[str] = []
-    for idx, img_bytes in enumerate(images):
-        image_key = f"{uuid.uuid4()}_{idx}.png"
-        await upload_file(
-            bucket=RESUME_IMAGE_BUCKET,
-            object_key=image_key,
-            content=img_bytes,
-            content_type="image/png",
+async def upload_and_parse_pdf(file: UploadFile) -> tuple[ScreeningResume, bool]:
+    """
+    返回 (筛查记录, 是否为重复上传)。
+    """
+    staged = await stage_upload(file)
+    try:
+        return await ingest_staged(staged)
+    finally:
+        staged.discard()
+
+
+async def claim_or_find_duplicate(sha256: str) -> ScreeningResume | None:
+    """
+    按内容哈希查找已有记录，找到则累加上传次数并返回。
+    返回 None 表示调用方已认领该内容，处理结束后必须调用 release_claim。
+    认领只在本进程内有效；多个进程同时处理同一内容时，由 content_sha256 的唯一约束
+    在入库时兜底（见 process_stored_pdf）。
+    """
+    while True:
+        pending = _inflight.get(sha256)
+        if pending is not None:
+            result = await asyncio.shield(pending)
+            if result is not None:
+                await _count_duplicate(result)
+                return result
+            # 先前的处理失败了，重新查库 / 认领
+            continue
+
+        existing = (
+            await ScreeningResume.filter(content_sha256=sha256).order_by("id").first()
         )
-        image_object_keys.append(f"{RESUME_IMAGE_BUCKET}/{image_key}")
-
-    llm_result = await extract_resume_info(text)
-
-    matched_condition_ids = await _match_conditions(llm_result)
-
-    screening = await ScreeningResume.create(
-        file_object_key=f"{RESUME_BUCKET}/{object_key}",
-        extracted_name=llm_result.get("name"),
-        extracted_school=llm_result.get("school"),
-        extracted_major=llm_result.get("major"),
-        extracted_degree=llm_result.get("degree"),
-        extracted_grad_year=llm_result.get("grad_year"),
-        extracted_phone=llm_result.get("phone"),
-        extracted_email=llm_result.get("email"),
-        extracted_skills=llm_result.get("skills") or [],
-        image_object_keys=image_object_keys,
-        matched_condition_ids=matched_condition_ids or [],
-        is_screened=False,
+        if sha256 in _inflight:
+            # 查库期间被其他请求认领
+            continue
+        if existing:
+            await _count_duplicate(existing)
+            return existing
+
+        _inflight[sha256] = asyncio.get_running_loop().create_future()
+        return None
+
+
+def release_claim(sha256: str, screening: ScreeningResume | None):
+    future = _inflight.pop(sha256, None)
+    if future is not None and not future.done():
+        future.set_result(screening)
+
+
+async def _count_duplicate(screening: ScreeningResume):
+    await ScreeningResume.filter(id=screening.id).update(
+        upload_count=F("upload_count") + 1
     )
+
+
+async def ingest_staged(
+    staged: StagedPdf,
+    timings: Dict[str, float] | None = None,
+    batcher: ExtractionBatcher | None = None,
+) -> tuple[ScreeningResume, bool]:
+    """
+    去重 -> 存储 -> 解析入库。相同内容命中时不访问 MinIO / PyMuPDF / LLM。
+    """
+    existing = await claim_or_find_duplicate(staged.sha256)
+    if existing:
+        return existing, True
+
+    screening = None
+    try:
+        object_key = await store_pdf(staged)
+        screening, duplicate = await process_stored_pdf(object_key, staged, timings, batcher)
+        return screening, duplicate
+    finally:
+        release_claim(staged.sha256, screening)
+
+
+async def store_pdf(staged: StagedPdf) -> str:
+    """
+    把简历原文件分片流式写入 MinIO，返回对象键（不含 bucket 前缀）。
+    """
+    object_key = f"{uuid.uuid4()}.pdf"
+    async with _STAGE_LIMITS["storage"]:
+        await upload_path(
+            bucket=RESUME_BUCKET,
+            object_key=object_key,
+            path=staged.path,
+            content_type="application/pdf",
+        )
+    return object_key
+
+
+@contextmanager
+def _timed(timings: Dict[str, float] | None, stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[stage] = round(time.perf_counter() - start, 4)
+
+
+async def process_stored_pdf(
+    object_key: str,
+    staged: StagedPdf,
+    timings: Dict[str, float] | None = None,
+    batcher: ExtractionBatcher | None = None,
+) -> tuple[ScreeningResume, bool]:
+    """
+    已落盘 MinIO 的简历：解析 -> 图片上传 -> LLM 抽取 -> 条件匹配 -> 入库。
+    返回 (筛查记录, 是否为重复内容)：其他进程先入库了相同内容时（唯一约束冲突），
+    返回那条记录并累加上传次数，本次已上传的文件不再引用。
+    timings 不为空时按阶段记录耗时（秒）。
+    """
+    with _timed(timings, "parse"):
+        async with _STAGE_LIMITS["parse"]:
+            text, images = await parse_pdf_async(staged.path)
+
+    with _timed(timings, "images"):
+        image_objects = [
+            (f"{uuid.uuid4()}_{idx}.png", img_bytes)
+            for idx, img_bytes in enumerate(images)
+        ]
+        async with _STAGE_LIMITS["storage"]:
+            await upload_many(RESUME_IMAGE_BUCKET, image_objects, content_type="image/png")
+        image_object_keys = [f"{RESUME_IMAGE_BUCKET}/{key}" for key, _ in image_objects]
+
+    with _timed(timings, "extract"):
+        llm_result = await extract_resume(text, batcher)
+
+    with _timed(timings, "match"):
+        async with _STAGE_LIMITS["db"]:
+            matched_condition_ids = await _match_conditions(llm_result)
+
+    with _timed(timings, "insert"):
+        try:
+            screening = await _insert_screening(
+                object_key, staged, text, llm_result, image_object_keys, matched_condition_ids
+            )
+        except IntegrityError:
+            existing = await ScreeningResume.filter(content_sha256=staged.sha256).first()
+            if existing is None:
+                raise
+            await _count_duplicate(existing)
+            return existing, True
+    return screening, False
+
+
+async def _insert_screening(
+    object_key: str,
+    staged: StagedPdf,
+    text: str,
+    llm_result: dict,
+    image_object_keys: list[str],
+    matched_condition_ids: list[int],
+) -> ScreeningResume:
+    async with _STAGE_LIMITS["db"], in_transaction():
+        screening = await ScreeningResume.create(
+            file_object_key=f"{RESUME_BUCKET}/{object_key}",
+            content_sha256=staged.sha256,
+            extracted_name=llm_result.get("name"),
+            extracted_school=llm_result.get("school"),
+            extracted_major=llm_result.get("major"),
+            extracted_degree=llm_result.get("degree"),
+            extracted_grad_year=llm_result.get("grad_year"),
+            extracted_phone=llm_result.get("phone"),
+            extracted_email=llm_result.get("email"),
+            extracted_skills=llm_result.get("skills") or [],
+            image_object_keys=image_object_keys,
+            matched_condition_ids=matched_condition_ids or [],
+            is_screened=False,
+        )
+        if matched_condition_ids:
+            await ScreeningConditionMatch.bulk_create(
+                [
+                    ScreeningConditionMatch(condition_id=cid, screening_id=screening.id)
+                    for cid in matched_condition_ids
+                ]
+            )
+        await search_service.index_screening(screening, text)
     return screening
 
 
+async def _call_extractor(
+    text: str,
+    fields: list[str] | None,
+    batcher: ExtractionBatcher | None,
+) -> dict:
+    if batcher is not None:
+        # 攒批等待期间不占 LLM 阶段名额，真正的请求数由 llm_client 的自适应限流控制
+        return await batcher.extract(text, fields)
+    async with _STAGE_LIMITS["llm"]:
+        return await extract_resume_info(text, fields=fields)
+
+
+async def extract_resume(text: str, batcher: ExtractionBatcher | None = None) -> dict:
+    """
+    规则抽取 -> LLM 补缺。规则对所有字段都有把握时不调用 LLM。
+    batcher 不为空时（批量导入）多份简历合并为一次 LLM 请求。
+    """
+    if not RULE_EXTRACTOR_ENABLED:
+        return await _call_extractor(text, None, batcher)
+
+    result, sure = rule_extractor.extract_rules(text, min_skills=RULE_MIN_SKILLS)
+    missing = [f for f in rule_extractor.FIELDS if f not in sure]
+    rule_extractor.record(sure, llm_skipped=not missing)
+    if not missing:
+        return result
+
+    llm_result = await _call_extractor(text, missing, batcher)
+    for field in missing:
+        value = llm_result.get(field)
+        # 模型没给出时保留规则的候选值
+        if value not in (None, "", []):
+            result[field] = value
+    return result
+
+
+# 单个条目解压失败：加密（RuntimeError）、不支持的压缩方式（NotImplementedError）、
+# 数据损坏 / CRC 不符（zlib.error / BadZipFile）、数据被截断（EOFError）
+_ZIP_ENTRY_ERRORS = (RuntimeError, NotImplementedError, zlib.error, zipfile.BadZipFile, EOFError)
+
+
+def _iter_zip_pdfs(archive):
+    """
+    逐个产出 ZIP 中的 PDF 条目：(文件名, StagedPdf 或 None, 跳过原因)。
+    只在迭代到某个条目时才把它解压落盘，不会一次性展开整个压缩包；
+    某个条目解压失败时记为跳过，不影响其余条目。
+    """
+    with zipfile.ZipFile(archive) as zf:
+        for info in zf.infolist():
+            name = info.filename
+            if info.is_dir() or name.startswith("__MACOSX/"):
+                continue
+            if not name.lower().endswith(".pdf"):
+                yield name, None, "非PDF文件"
+                continue
+            if info.file_size > BATCH_MAX_ENTRY_BYTES:
+                yield name, None, "文件过大"
+                continue
+            try:
+                with zf.open(info) as fp:
+                    staged = _spool_to_disk(fp)
+            except _ZIP_ENTRY_ERRORS:
+                yield name, None, "ZIP条目无法解压"
+                continue
+            yield name, staged, None
+
+
+async def upload_and_parse_batch(
+    files: List[UploadFile],
+    llm_batching: bool = True,
+) -> list[dict]:
+    """
+    批量上传：接收多个 PDF 或 ZIP，逐个走 ingest_staged（去重 + 存储 + 解析入库）。
+    同时在途的文件数受 BATCH_CONCURRENCY 限制，各阶段再受 _STAGE_LIMITS 限制。
+    llm_batching 时多份简历合并为一次 LLM 请求。
+    返回与输入顺序一致的结果清单。
+    """
+    batcher = ExtractionBatcher() if llm_batching else None
+    manifest: list[dict] = []
+    in_flight = asyncio.Semaphore(BATCH_CONCURRENCY)
+    tasks: list[asyncio.Task] = []
+    accepted = 0
+
+    async def run_one(item: dict, staged: StagedPdf):
+        try:
+            screening, duplicate = await ingest_staged(staged, item["timings"], batcher)
+            item["screening_id"] = screening.id
+            item["status"] = "duplicate" if duplicate else "uploaded"
+        except Exception as exc:
+            item["status"] = "failed"
+            item["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            staged.discard()
+            in_flight.release()
+
+    async def enqueue(filename: str, staged: StagedPdf | None, skip_reason: str | None):
+        nonlocal accepted
+        item = {
+            "filename": filename,
+            "status": "skipped",
+            "screening_id": None,
+            "error": skip_reason,
+            "timings": {},
+        }
+        manifest.append(item)
+        if staged is None:
+            return
+        if accepted >= BATCH_MAX_FILES:
+            item["error"] = "超过单次批量上限"
+            staged.discard()
+            return
+        accepted += 1
+        item["status"] = "processing"
+        await in_flight.acquire()
+        tasks.append(asyncio.create_task(run_one(item, staged)))
+
+    try:
+        for file in files:
+            filename = file.filename or ""
+            lower = filename.lower()
+            if lower.endswith(".zip"):
+                try:
+                    entries = _iter_zip_pdfs(file.file)
+                    while True:
+                        entry = await asyncio.to_thread(next, entries, None)
+                        if entry is None:
+                            break
+                        name, staged, reason = entry
+                        await enqueue(f"{filename}/{name}", staged, reason)
+                except zipfile.BadZipFile:
+                    await enqueue(filename, None, "ZIP文件损坏")
+            elif lower.endswith(".pdf"):
+                await enqueue(filename, await stage_upload(file), None)
+            else:
+                await enqueue(filename, None, "只支持PDF或ZIP文件")
+    finally:
+        # 中途出错也要等已启动的任务结束，释放临时文件
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return manifest
+
+
+async def duplicate_report(top: int = 10) -> dict:
+    """
+    去重命中统计：只统计带内容哈希的记录。
+    """
+    qs = ScreeningResume.filter(content_sha256__not_isnull=True)
+    unique = await qs.count()
+    row = await qs.annotate(total=Sum("upload_count")).first().values("total")
+    uploads = int((row or {}).get("total") or 0)
+    duplicates = uploads - unique
+    top_items = (
+        await qs.filter(upload_count__gt=1)
+        .order_by("-upload_count", "id")
+        .limit(top)
+        .values("id", "upload_count")
+    )
+    return {
+        "uploads": uploads,
+        "unique_resumes": unique,
+        "duplicate_hits": duplicates,
+        "hit_rate": round(duplicates / uploads, 4) if uploads else 0.0,
+        "top": [
+            {"screening_id": r["id"], "upload_count": r["upload_count"]}
+            for r in top_items
+        ],
+    }
+
+
 async def list_screening_resumes(
     name: str | None = None,
     school: str | None = None,
@@ -68,9 +454,11 @@ async def list_screening_resumes(
     matched_condition_id: int | None = None,
     page: int = 1,
     page_size: int = 10,
+    cursor: str | None = None,
+    with_total: bool = True,
 ) -> dict:
     """
-    业务查询层：封装筛查记录的过滤与分页。
+    业务查询层：封装筛查记录的过滤与分页（按 (at_time, id) 的游标分页）。
     """
     qs = ScreeningResume.all()
     if name:
@@ -84,55 +472,28 @@ async def list_screening_resumes(
     if is_screened is not None:
         qs = qs.filter(is_screened=is_screened)
     if matched_condition_id is not None:
+        # 经关联表半连接，走 (condition_id, screening_id) 索引
         qs = qs.filter(
-            Q(matched_condition_ids__contains=str(matched_condition_id))
-            | Q(matched_condition_ids__contains=matched_condition_id)
+            id__in=Subquery(
+                ScreeningConditionMatch.filter(condition_id=matched_condition_id).values(
+                    "screening_id"
+                )
+            )
         )
 
-    total = await qs.count()
-    items = await qs.order_by("-at_time").offset((page - 1) * page_size).limit(page_size)
-    return {"total": total, "items": items}
-
-
-def _match_text(value: str | None, keywords: List[str] | None) -> bool:
-    if not keywords:
-        return True
-    if not value:
-        return False
-    return any(k.lower() in value.lower() for k in keywords if k)
-
-
-def _match_condition(result: Dict[str, Any], condition: ScreeningCondition) -> bool:
-    criteria = condition.criteria or {}
-    if not criteria:
-        return True
-
-    if not _match_text(result.get("name"), criteria.get("name_keywords")):
-        return False
-    if criteria.get("schools") and (result.get("school") not in criteria["schools"]):
-        return False
-    if criteria.get("majors") and (result.get("major") not in criteria["majors"]):
-        return False
-    if criteria.get("degrees") and (result.get("degree") not in criteria["degrees"]):
-        return False
-
-    gy = result.get("grad_year")
-    min_year = criteria.get("grad_year_min")
-    max_year = criteria.get("grad_year_max")
-    if min_year is not None and gy is not None and gy < min_year:
-        return False
-    if max_year is not None and gy is not None and gy > max_year:
-        return False
-
-    return True
+    return await paginate(
+        qs,
+        time_field="at_time",
+        page_size=page_size,
+        cursor=cursor,
+        page=page,
+        with_total=with_total,
+        total_key=(
+            "screening_resumes", name, school, major, degree, is_screened, matched_condition_id
+        ),
+    )
 
 
 async def _match_conditions(result: Dict[str, Any]) -> list[int]:
-    conditions = await ScreeningCondition.filter(
-        status="active", is_deleted=False
-    ).all()
-    matched: list[int] = []
-    for c in conditions:
-        if _match_condition(result, c):
-            matched.append(c.id)
-    return matched
+    index = await condition_index.get_index()
+    return index.match(result)
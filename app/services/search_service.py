@@ -0,0 +1,310 @@
+# app/services/search_service.py
+"""
+简历 / 人才全文检索。
+
+文档统一存放在 search_documents（标题 + 简历原文 + 分词文本），倒排索引按后端建立：
+- SQLite：FTS5 虚表 search_documents_fts（rowid = search_documents.id），bm25 排序；
+- Postgres：由 tokens 生成的 tsvector 列 + GIN 索引，ts_rank 排序；
+- MySQL：title/body 上的 ngram FULLTEXT 索引，MATCH ... AGAINST 布尔模式。
+
+中文没有空格分词，SQLite / Postgres 两端都用预先切好的 tokens：
+英文数字按单词，连续中文切成相邻二元组（"上海市" -> "上海 海市"），
+查询词按同样规则切分后作为短语匹配，等价于子串匹配。
+摘要在 Python 端从原文截取命中附近的片段。
+"""
+
+import logging
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+from tortoise import connections
+
+from app.db.models.search_document import SearchDocument
+
+_FTS_TABLE = "search_documents_fts"
+_MYSQL_FT_INDEX = "ft_search_documents"
+
+logger = logging.getLogger(__name__)
+
+# ensure_schema 发现 search_documents 表不存在时置为 False：不写索引，检索返回空
+_enabled = True
+
+_WORD_RE = re.compile(r"[0-9a-z]+|[㐀-䶿一-鿿豈-﫿]+")
+_CJK_RE = re.compile(r"[㐀-䶿一-鿿豈-﫿]")
+
+_SNIPPET_CHARS = 120
+_MARK = ("<mark>", "</mark>")
+
+
+def _normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def _word_tokens(word: str) -> list[str]:
+    if not _CJK_RE.match(word):
+        return [word]
+    if len(word) == 1:
+        return [word]
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for word in _WORD_RE.findall(_normalize(text)) for t in _word_tokens(word)]
+
+
+def _query_terms(query: str) -> list[list[str]]:
+    """每个查询词 -> 切分后的 token 序列（按短语匹配）。"""
+    terms = []
+    for raw in _normalize(query).split():
+        tokens = tokenize(raw)
+        if tokens:
+            terms.append(tokens)
+    return terms
+
+
+def _dialect() -> str:
+    return connections.get("default").capabilities.dialect
+
+
+async def _table_exists(table: str) -> bool:
+    conn = connections.get("default")
+    dialect = _dialect()
+    if dialect == "sqlite":
+        _, rows = await conn.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [table]
+        )
+    elif dialect == "postgres":
+        _, rows = await conn.execute_query("SELECT 1 WHERE to_regclass($1) IS NOT NULL", [table])
+    else:
+        _, rows = await conn.execute_query(
+            "SELECT 1 FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s LIMIT 1",
+            [table],
+        )
+    return bool(rows)
+
+
+async def ensure_schema() -> bool:
+    """
+    建立后端对应的全文索引（已存在时跳过），启动时调用。
+    search_documents 表需已建好（DB_GENERATE_SCHEMAS=true 时启动会自动创建，否则需先执行建表迁移）；
+    表不存在时只记录警告并停用全文检索，返回 False，不阻止应用启动。
+    """
+    global _enabled
+    _enabled = await _table_exists(SearchDocument._meta.db_table)
+    if not _enabled:
+        logger.warning(
+            "search_documents 表不存在，全文检索已停用。请用 DB_GENERATE_SCHEMAS=true 启动一次"
+            "（或按 app/db/models/search_document.py 手工建表）后重启，"
+            "再执行 python -m scripts.reindex_search 补建索引"
+        )
+        return False
+    conn = connections.get("default")
+    dialect = _dialect()
+    if dialect == "sqlite":
+        await conn.execute_script(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {_FTS_TABLE} "
+            "USING fts5(tokens, tokenize='unicode61 remove_diacritics 2')"
+        )
+    elif dialect == "postgres":
+        await conn.execute_script(
+            "ALTER TABLE search_documents ADD COLUMN IF NOT EXISTS tsv tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(tokens, ''))) STORED;"
+            "CREATE INDEX IF NOT EXISTS idx_search_documents_tsv "
+            "ON search_documents USING GIN (tsv);"
+        )
+    elif dialect == "mysql":
+        _, rows = await conn.execute_query(
+            "SELECT 1 FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'search_documents' "
+            "AND INDEX_NAME = %s LIMIT 1",
+            [_MYSQL_FT_INDEX],
+        )
+        if not rows:
+            await conn.execute_script(
+                f"ALTER TABLE search_documents ADD FULLTEXT INDEX {_MYSQL_FT_INDEX} "
+                "(title, body) WITH PARSER ngram"
+            )
+    return True
+
+
+async def index_document(kind: str, ref_id: int, title: Optional[str], body: Optional[str]):
+    """写入 / 更新一条文档及其索引。可在调用方的事务内执行。"""
+    if not _enabled:
+        return None
+    tokens = " ".join(tokenize(f"{title or ''}\n{body or ''}"))
+    doc = await SearchDocument.get_or_none(kind=kind, ref_id=ref_id)
+    if doc is None:
+        doc = await SearchDocument.create(
+            kind=kind, ref_id=ref_id, title=title, body=body, tokens=tokens
+        )
+    else:
+        doc.title, doc.body, doc.tokens = title, body, tokens
+        await doc.save(update_fields=["title", "body", "tokens", "updated_at"])
+
+    if _dialect() == "sqlite":
+        conn = connections.get("default")
+        await conn.execute_query(f"DELETE FROM {_FTS_TABLE} WHERE rowid = ?", [doc.id])
+        await conn.execute_query(
+            f"INSERT INTO {_FTS_TABLE}(rowid, tokens) VALUES (?, ?)", [doc.id, tokens]
+        )
+    # Postgres 的 tsv 为生成列，MySQL 的 FULLTEXT 随行更新，无需额外处理
+    return doc
+
+
+def _title(*parts: Optional[str]) -> str:
+    return " ".join(p for p in parts if p)
+
+
+async def index_screening(screening, text: Optional[str]):
+    skills = " ".join(screening.extracted_skills or [])
+    await index_document(
+        "screening",
+        screening.id,
+        _title(
+            screening.extracted_name,
+            screening.extracted_school,
+            screening.extracted_major,
+            screening.extracted_degree,
+        ),
+        "\n".join(p for p in (text, skills) if p),
+    )
+
+
+async def index_talent(talent, skill_names: Iterable[str]):
+    """人才文档沿用来源简历的原文，再附上技能名。"""
+    await index_talents([talent], {talent.id: list(skill_names)})
+
+
+async def index_talents(talents: list, skill_names: dict[int, list[str]]):
+    """批量写入新入库人才的文档：来源简历原文一次 IN 查询，文档 bulk_create。"""
+    if not talents or not _enabled:
+        return
+    screening_ids = [t.source_screening_id for t in talents if t.source_screening_id]
+    texts = dict(
+        await SearchDocument.filter(kind="screening", ref_id__in=screening_ids).values_list(
+            "ref_id", "body"
+        )
+    )
+    docs = []
+    for t in talents:
+        title = _title(t.name, t.school, t.major, t.degree)
+        body = "\n".join(
+            p for p in (texts.get(t.source_screening_id), " ".join(skill_names.get(t.id, []))) if p
+        )
+        tokens = " ".join(tokenize(f"{title}\n{body}"))
+        docs.append(SearchDocument(kind="talent", ref_id=t.id, title=title, body=body, tokens=tokens))
+    existing = SearchDocument.filter(kind="talent", ref_id__in=[t.id for t in talents])
+    sqlite = _dialect() == "sqlite"
+    conn = connections.get("default")
+    if sqlite:
+        stale = await existing.values_list("id", flat=True)
+        if stale:
+            await conn.execute_many(f"DELETE FROM {_FTS_TABLE} WHERE rowid = ?", [[i] for i in stale])
+    await existing.delete()
+    await SearchDocument.bulk_create(docs)
+
+    if sqlite:
+        rows = await SearchDocument.filter(
+            kind="talent", ref_id__in=[t.id for t in talents]
+        ).values_list("id", "tokens")
+        await conn.execute_many(
+            f"INSERT INTO {_FTS_TABLE}(rowid, tokens) VALUES (?, ?)", [list(r) for r in rows]
+        )
+
+
+def make_snippet(body: Optional[str], query: str, width: int = _SNIPPET_CHARS) -> str:
+    """截取第一个命中词附近的片段，命中词用 <mark> 标出。"""
+    text = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", body or "")).strip()
+    lower = text.lower()
+    words = sorted({w for w in _normalize(query).split() if w}, key=len, reverse=True)
+
+    hits = [p for p in (lower.find(w) for w in words) if p >= 0]
+    start = max(0, min(hits) - width // 4) if hits else 0
+    end = min(len(text), start + width)
+    piece = text[start:end]
+    if words:
+        pattern = re.compile("|".join(re.escape(w) for w in words), re.IGNORECASE)
+        piece = pattern.sub(lambda m: f"{_MARK[0]}{m.group(0)}{_MARK[1]}", piece)
+    return ("…" if start > 0 else "") + piece + ("…" if end < len(text) else "")
+
+
+def _sqlite_query(terms: list[list[str]]) -> str:
+    return " AND ".join('"' + " ".join(tokens) + '"' for tokens in terms)
+
+
+def _postgres_query(terms: list[list[str]]) -> str:
+    return " & ".join(
+        "(" + " <-> ".join(f"'{t}'" for t in tokens) + ")" for tokens in terms
+    )
+
+
+def _mysql_query(query: str) -> str:
+    # 布尔模式：每个词都必须出现，词内按短语匹配（ngram 解析器处理中文）
+    words = [re.sub(r'["+\-<>()~*@]', " ", w).strip() for w in _normalize(query).split()]
+    return " ".join(f'+"{w}"' for w in words if w)
+
+
+async def search(query: str, kind: Optional[str] = None, limit: int = 20) -> list[dict]:
+    """
+    返回按相关度降序的命中：[{kind, ref_id, title, score, snippet}]。
+    kind 为空时同时搜索简历和人才。
+    """
+    terms = _query_terms(query)
+    if not terms or not _enabled:
+        return []
+
+    conn = connections.get("default")
+    dialect = _dialect()
+    if dialect == "sqlite":
+        sql = (
+            f"SELECT d.kind, d.ref_id, d.title, d.body, -bm25({_FTS_TABLE}) AS score "
+            f"FROM {_FTS_TABLE} JOIN search_documents d ON d.id = {_FTS_TABLE}.rowid "
+            f"WHERE {_FTS_TABLE} MATCH ?"
+        )
+        params: list = [_sqlite_query(terms)]
+        if kind:
+            sql += " AND d.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(limit)
+    elif dialect == "postgres":
+        sql = (
+            "SELECT kind, ref_id, title, body, "
+            "ts_rank(tsv, to_tsquery('simple', $1)) AS score "
+            "FROM search_documents WHERE tsv @@ to_tsquery('simple', $1)"
+        )
+        params = [_postgres_query(terms)]
+        if kind:
+            sql += " AND kind = $2"
+            params.append(kind)
+        sql += f" ORDER BY score DESC LIMIT ${len(params) + 1}"
+        params.append(limit)
+    elif dialect == "mysql":
+        against = _mysql_query(query)
+        sql = (
+            "SELECT kind, ref_id, title, body, "
+            "MATCH(title, body) AGAINST (%s IN BOOLEAN MODE) AS score "
+            "FROM search_documents WHERE MATCH(title, body) AGAINST (%s IN BOOLEAN MODE)"
+        )
+        params = [against, against]
+        if kind:
+            sql += " AND kind = %s"
+            params.append(kind)
+        sql += " ORDER BY score DESC LIMIT %s"
+        params.append(limit)
+    else:
+        raise RuntimeError(f"不支持的数据库后端：{dialect}")
+
+    rows = await conn.execute_query_dict(sql, params)
+    return [
+        {
+            "kind": row["kind"],
+            "ref_id": row["ref_id"],
+            "title": row["title"],
+            "score": round(float(row["score"] or 0), 6),
+            "snippet": make_snippet(row["body"], query),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,234 @@
+# app/services/similarity_service.py
+"""
+人才相似度（"找和某个优秀员工相似的候选人"）。
+
+每个人才一行稀疏特征：技能（按 skill_registry.canonical_key 归并）+ 学校 / 专业 / 学位的 one-hot，
+按 TF-IDF 加权（idf = ln((1 + N) / (1 + df)) + 1，稀有技能权重更高），教育特征再乘 SIMILARITY_EDU_WEIGHT_PCT，
+每行 L2 归一化后，余弦相似度就是一次稀疏矩阵 × 稠密查询矩阵：
+    scores = (X @ X[查询行].T).T
+多个查询一次乘完，每行用 argpartition 取 top_k，不做全排序。
+
+启动时从 talents / talent_skills 构建，人才入库后增量追加行（下次查询时统一重算权重，O(nnz)）；
+超过 SIMILARITY_INDEX_TTL 后在后台重建，期间继续使用旧索引。
+"""
+
+import asyncio
+import time
+import unicodedata
+from typing import Iterable, Optional
+
+import numpy as np
+from scipy import sparse
+from tortoise.expressions import Subquery
+
+from app.config.settings import SIMILARITY_EDU_WEIGHT_PCT, SIMILARITY_INDEX_TTL
+from app.db.models.skill import Skill
+from app.db.models.talent import Talent
+from app.db.models.talent_skill import TalentSkill
+from app.services.skill_registry import canonical_key
+
+EDU_FIELDS = ("school", "major", "degree")
+
+
+def _edu_key(field: str, value: Optional[str]) -> Optional[str]:
+    value = unicodedata.normalize("NFKC", value or "").strip().casefold()
+    return f"{field}:{value}" if value else None
+
+
+class TalentSimilarityIndex:
+    def __init__(
+        self,
+        talents: Iterable[tuple[int, Optional[str], Optional[str], Optional[str]]],
+        skills: Iterable[tuple[int, str]],
+        links: Iterable[tuple[int, int]],
+    ):
+        # 特征键 -> 列号；列号 -> 展示名 / 是否教育特征
+        self.columns: dict[str, int] = {}
+        self.labels: list[str] = []
+        self.is_edu: list[bool] = []
+        self.row_of: dict[int, int] = {}
+        self.talent_ids: list[int] = []
+
+        skill_cols = {sid: self._column(canonical_key(name), name, False) for sid, name in skills}
+        rows: list[int] = []
+        cols: list[int] = []
+        for tid, *edu in talents:
+            row = self._add_row(tid)
+            for field, value in zip(EDU_FIELDS, edu):
+                key = _edu_key(field, value)
+                if key:
+                    rows.append(row)
+                    cols.append(self._column(key, value, True))
+        for tid, sid in links:
+            row = self.row_of.get(tid)
+            col = skill_cols.get(sid)
+            if row is not None and col is not None:
+                rows.append(row)
+                cols.append(col)
+
+        binary = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+            shape=(len(self.talent_ids), len(self.labels)),
+        )
+        binary.sum_duplicates()
+        binary.data[:] = 1
+        self.binary = binary
+        # 增量追加、尚未并入 binary 的行：[(行号, [列号])]
+        self._appended: list[tuple[int, list[int]]] = []
+        self._reweight()
+        self.built_at = time.monotonic()
+
+    def _column(self, key: str, label: str, edu: bool) -> int:
+        col = self.columns.get(key)
+        if col is None:
+            col = self.columns[key] = len(self.labels)
+            self.labels.append(label)
+            self.is_edu.append(edu)
+        return col
+
+    def _add_row(self, tid: int) -> int:
+        row = self.row_of[tid] = len(self.talent_ids)
+        self.talent_ids.append(tid)
+        return row
+
+    def add_talent(
+        self,
+        tid: int,
+        school: Optional[str],
+        major: Optional[str],
+        degree: Optional[str],
+        skill_names: Iterable[str],
+    ):
+        if tid in self.row_of:
+            return
+        cols = {self._column(canonical_key(name), name, False) for name in skill_names}
+        for field, value in zip(EDU_FIELDS, (school, major, degree)):
+            key = _edu_key(field, value)
+            if key:
+                cols.add(self._column(key, value, True))
+        self._appended.append((self._add_row(tid), sorted(cols)))
+
+    def _reweight(self):
+        """并入增量行，重算 idf 与归一化后的特征矩阵。"""
+        n_rows, n_cols = len(self.talent_ids), len(self.labels)
+        if self._appended or self.binary.shape != (n_rows, n_cols):
+            indptr = np.cumsum([0] + [len(cols) for _, cols in self._appended])
+            indices = np.fromiter((c for _, cols in self._appended for c in cols), dtype=np.int32)
+            appended = sparse.csr_matrix(
+                (np.ones(len(indices), dtype=np.float32), indices, indptr),
+                shape=(len(self._appended), n_cols),
+            )
+            self.binary.resize((n_rows - len(self._appended), n_cols))
+            self.binary = sparse.vstack([self.binary, appended], format="csr")
+            self._appended = []
+
+        df = np.bincount(self.binary.indices, minlength=n_cols)
+        idf = np.log((1.0 + n_rows) / (1.0 + df)) + 1.0
+        weights = idf * np.where(np.array(self.is_edu, dtype=bool), SIMILARITY_EDU_WEIGHT_PCT / 100.0, 1.0)
+        matrix = self.binary.copy()
+        matrix.data = weights[matrix.indices].astype(np.float32)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+        self.matrix = matrix
+        self.ids = np.asarray(self.talent_ids, dtype=np.int64)
+
+    def similar(self, tids: list[int], top_k: int) -> dict[int, list[tuple[int, float]]]:
+        """每个 tid 的 top_k 相似人才 [(talent_id, 余弦相似度)]，降序，不含自身和零分；索引里没有的 tid 不返回。"""
+        if self._appended:
+            self._reweight()
+        queries = [(tid, self.row_of[tid]) for tid in tids if tid in self.row_of]
+        if not queries:
+            return {}
+        # 查询行只有几千列，转稠密后做 CSR 矩阵 × 稠密矩阵，代价 O(nnz × 查询数)
+        dense = self.matrix[[row for _, row in queries]].toarray()
+        scores = np.ascontiguousarray((self.matrix @ dense.T).T)
+        out: dict[int, list[tuple[int, float]]] = {}
+        for i, (tid, row) in enumerate(queries):
+            s = scores[i]
+            s[row] = 0.0
+            k = min(top_k, len(s))
+            top = np.argpartition(-s, k - 1)[:k] if k < len(s) else np.arange(len(s))
+            top = top[np.argsort(-s[top], kind="stable")]
+            out[tid] = [(int(self.ids[j]), round(float(s[j]), 4)) for j in top if s[j] > 0]
+        return out
+
+    def shared_skills(self, a: int, b: int) -> list[str]:
+        """两个人才共同具备的技能（按 b 的特征权重降序）。"""
+        if self._appended:
+            self._reweight()
+        ra, rb = self.row_of.get(a), self.row_of.get(b)
+        if ra is None or rb is None:
+            return []
+        mine = set(self.binary.indices[self.binary.indptr[ra]:self.binary.indptr[ra + 1]])
+        start, end = self.matrix.indptr[rb], self.matrix.indptr[rb + 1]
+        theirs = sorted(
+            zip(self.matrix.data[start:end], self.matrix.indices[start:end]), reverse=True
+        )
+        return [self.labels[c] for _, c in theirs if c in mine and not self.is_edu[c]]
+
+
+_index: Optional[TalentSimilarityIndex] = None
+_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+# 后台重建期间入库的人才，重建完成后补进新索引
+_pending: list[tuple] = []
+
+
+async def _build() -> TalentSimilarityIndex:
+    talents = await Talent.all().values_list("id", "school", "major", "degree")
+    skills = await Skill.all().values_list("id", "name")
+    links = await TalentSkill.all().values_list("talent_id", "skill_id")
+    return TalentSimilarityIndex(talents, skills, links)
+
+
+async def load():
+    """构建索引（启动时调用；过期后由 get_index 在后台调用）。"""
+    global _index
+    async with _lock:
+        _pending.clear()
+        index = await _build()
+        for args in _pending:
+            index.add_talent(*args)
+        _pending.clear()
+        _index = index
+
+
+async def get_index() -> TalentSimilarityIndex:
+    global _refresh_task
+    if _index is None:
+        await load()
+    elif time.monotonic() - _index.built_at >= SIMILARITY_INDEX_TTL and (
+        _refresh_task is None or _refresh_task.done()
+    ):
+        _refresh_task = asyncio.create_task(load())
+    return _index
+
+
+def add_talent(
+    tid: int,
+    school: Optional[str],
+    major: Optional[str],
+    degree: Optional[str],
+    skill_names: Iterable[str],
+):
+    """新人才入库（事务提交后）调用。"""
+    args = (tid, school, major, degree, list(skill_names))
+    if _index is not None:
+        _index.add_talent(*args)
+    if _lock.locked():
+        _pending.append(args)
+
+
+async def similar(talent_id: int, top_k: int) -> Optional[list[tuple[int, float]]]:
+    """talent_id 的相似人才；人才不存在时返回 None。其他进程刚入库、本进程索引里还没有的人才先从库里补进来。"""
+    index = await get_index()
+    if talent_id not in index.row_of:
+        talent = await Talent.get_or_none(id=talent_id).only("id", "school", "major", "degree")
+        if talent is None:
+            return None
+        names = await Skill.filter(
+            id__in=Subquery(TalentSkill.filter(talent_id=talent_id).values_list("skill_id", flat=True))
+        ).values_list("name", flat=True)
+        index.add_talent(talent.id, talent.school, talent.major, talent.degree, names)
+    return index.similar([talent_id], top_k)[talent_id]
@@ -0,0 +1,176 @@
+# app/services/skill_index.py
+"""
+技能 -> 人才 位图索引，用于多技能组合检索。
+
+每个技能（按 skill_registry.canonical_key 归并，"python" / "Python3" 视为同一技能）一个 Python int 当 bitset，
+第 talent_id 位表示该人才具备此技能（id 自增且稠密，10 万人才每个技能约 12KB）。查询全部是大整数的按位运算：
+    (all 的 AND) & (any 的 OR) & ~(none 的 OR)
+排序按「命中了多少个正向技能」：逐个技能做「至少 j 个」的层级位图
+    at_least[j] |= at_least[j - 1] & skill
+再从高层往低层取位，只展开 top_k 个 id。
+
+启动时从 talent_skills 构建，人才入库后增量更新；超过 SKILL_INDEX_TTL 后在后台重建，
+期间继续使用旧索引（多进程部署时其他进程的变更最多延迟这么久）。
+"""
+
+import asyncio
+import time
+from typing import Iterable, Optional
+
+from app.config.settings import SKILL_INDEX_TTL
+from app.db.models.skill import Skill
+from app.db.models.talent import Talent
+from app.db.models.talent_skill import TalentSkill
+from app.services.skill_registry import canonical_key
+
+
+def _iter_high_bits(mask: int, limit: int) -> Iterable[int]:
+    """从高位到低位产出置位的下标（id 大的先出，即新入库优先），最多 limit 个。"""
+    while mask and limit > 0:
+        bit = mask.bit_length() - 1
+        yield bit
+        mask ^= 1 << bit
+        limit -= 1
+
+
+def _pack(positions: list[int]) -> bytes:
+    buf = bytearray(max(positions) // 8 + 1)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return bytes(buf)
+
+
+class SkillBitmapIndex:
+    def __init__(self, talent_ids: Iterable[int], skills: Iterable[tuple[int, str]], links: Iterable[tuple[int, int]]):
+        talent_ids = list(talent_ids)
+        self.universe = int.from_bytes(_pack(talent_ids), "little") if talent_ids else 0
+        # 技能 id -> 归并键；归并键 -> 展示名（首次出现的写法）
+        self.keys: dict[int, str] = {}
+        self.names: dict[str, str] = {}
+        for sid, name in skills:
+            self._add_skill(sid, name)
+
+        # 先按技能收集位下标再一次性合成，避免逐条 |= 反复复制大整数
+        bits: dict[str, list[int]] = {}
+        for tid, sid in links:
+            key = self.keys.get(sid)
+            if key is not None:
+                bits.setdefault(key, []).append(tid)
+        self.bitmaps: dict[str, int] = {
+            key: int.from_bytes(_pack(tids), "little") for key, tids in bits.items()
+        }
+        self.built_at = time.monotonic()
+
+    def _add_skill(self, sid: int, name: str) -> str:
+        key = canonical_key(name)
+        self.keys[sid] = key
+        self.names.setdefault(key, name)
+        return key
+
+    def add_talent(self, tid: int, skills: Iterable[tuple[int, str]]):
+        bit = 1 << tid
+        self.universe |= bit
+        for sid, name in skills:
+            key = self.keys.get(sid) or self._add_skill(sid, name)
+            self.bitmaps[key] = self.bitmaps.get(key, 0) | bit
+
+    def resolve(self, names: Iterable[str]) -> tuple[list[str], list[str]]:
+        """技能名 -> (归并键列表, 不认识的名字)。"""
+        keys, unknown = [], []
+        for name in names:
+            key = canonical_key(name)
+            if key not in self.names:
+                unknown.append(name)
+            elif key not in keys:
+                keys.append(key)
+        return keys, unknown
+
+    def search(
+        self,
+        all_of: list[str],
+        any_of: list[str],
+        none_of: list[str],
+        top_k: int,
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """返回 (命中总数, [(talent_id, 命中的正向技能数)])，按命中数降序、id 降序。"""
+        mask = self.universe
+        for key in all_of:
+            mask &= self.bitmaps.get(key, 0)
+            if not mask:
+                return 0, []
+        if any_of:
+            union = 0
+            for key in any_of:
+                union |= self.bitmaps.get(key, 0)
+            mask &= union
+        for key in none_of:
+            mask &= ~self.bitmaps.get(key, 0)
+        if not mask:
+            return 0, []
+
+        positive = list(dict.fromkeys(all_of + any_of))
+        # at_least[j]：候选里至少具备 j 个正向技能的人才
+        at_least = [mask] + [0] * len(positive)
+        for n, key in enumerate(positive, start=1):
+            bitmap = self.bitmaps.get(key, 0) & mask
+            for j in range(n, 0, -1):
+                at_least[j] |= at_least[j - 1] & bitmap
+
+        ranked: list[tuple[int, int]] = []
+        for j in range(len(positive), -1, -1):
+            exact = at_least[j] & ~(at_least[j + 1] if j < len(positive) else 0)
+            for tid in _iter_high_bits(exact, top_k - len(ranked)):
+                ranked.append((tid, j))
+            if len(ranked) >= top_k:
+                break
+        return mask.bit_count(), ranked
+
+    def talent_skills(self, tid: int, candidates: Iterable[str]) -> list[str]:
+        bit = 1 << tid
+        return [self.names[key] for key in candidates if self.bitmaps.get(key, 0) & bit]
+
+
+_index: Optional[SkillBitmapIndex] = None
+_lock = asyncio.Lock()
+_refresh_task: Optional[asyncio.Task] = None
+# 后台重建期间入库的人才，重建完成后补进新索引
+_pending: list[tuple[int, list[tuple[int, str]]]] = []
+
+
+async def _build() -> SkillBitmapIndex:
+    talent_ids = await Talent.all().values_list("id", flat=True)
+    skills = await Skill.all().values_list("id", "name")
+    links = await TalentSkill.all().values_list("talent_id", "skill_id")
+    return SkillBitmapIndex(talent_ids, skills, links)
+
+
+async def load():
+    """构建索引（启动时调用；过期后由 get_index 在后台调用）。"""
+    global _index
+    async with _lock:
+        _pending.clear()
+        index = await _build()
+        for tid, skills in _pending:
+            index.add_talent(tid, skills)
+        _pending.clear()
+        _index = index
+
+
+async def get_index() -> SkillBitmapIndex:
+    global _refresh_task
+    if _index is None:
+        await load()
+    elif time.monotonic() - _index.built_at >= SKILL_INDEX_TTL and (
+        _refresh_task is None or _refresh_task.done()
+    ):
+        _refresh_task = asyncio.create_task(load())
+    return _index
+
+
+def add_talent(tid: int, skills: Iterable[tuple[int, str]]):
+    """新人才入库（事务提交后）调用：skills 为 [(技能 id, 技能名)]。"""
+    skills = list(skills)
+    if _index is not None:
+        _index.add_talent(tid, skills)
+    if _lock.locked():
+        _pending.append((tid, skills))
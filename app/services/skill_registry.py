@@ -0,0 +1,229 @@
+# app/services/skill_registry.py
+"""
+进程内技能字典：规范化写法 -> (技能 id, 规范名)。
+
+canonical_key：NFKC（全角转半角）、casefold、去掉所有空白，再查内置别名表
+（"python3" -> "python"、"k8s" -> "kubernetes" 等）。
+启动时从 skills / skill_aliases 载入，之后解析技能名只是字典查找；
+没见过的写法先查 skill_aliases，仍没有才建技能并写别名，别名表的唯一约束保证多进程下同一写法只对应一个技能。
+超过 SKILL_REGISTRY_TTL 后重新载入；resolve 返回前还会确认技能 id 仍存在（其他进程合并删除后立即重载）。
+
+已有的重复技能由 merge_duplicates（scripts/merge_skills.py）离线合并。
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from typing import Iterable, Optional
+
+from tortoise.transactions import in_transaction
+
+from app.config.settings import SKILL_REGISTRY_TTL
+from app.db.models.skill import Skill
+from app.db.models.skill_alias import SkillAlias
+from app.db.models.talent_skill import TalentSkill
+from app.services.rule_extractor import BUILTIN_SKILLS
+
+# 常见变体 -> 规范写法（均为 canonical_key 处理后的形式）
+BUILTIN_ALIASES = {
+    "python3": "python",
+    "python2": "python",
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "pgsql": "postgresql",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "vue3": "vue",
+    "reactjs": "react",
+    "react.js": "react",
+    "tf": "tensorflow",
+    "nlp": "自然语言处理",
+}
+
+# 规范展示名（内置技能词典里的写法优先）
+_DISPLAY = {}
+
+_keys: dict[str, int] = {}  # 规范化写法 -> 技能 id
+_names: dict[int, str] = {}  # 技能 id -> 技能名
+_loaded_at: Optional[float] = None
+_lock = asyncio.Lock()
+
+
+def canonical_key(name: str) -> str:
+    key = re.sub(r"\s+", "", unicodedata.normalize("NFKC", name or "")).casefold()
+    return BUILTIN_ALIASES.get(key, key)
+
+
+def display_name(name: str) -> str:
+    """新建技能时使用的名字：内置词典里有则用内置写法，否则为清理后的原写法。"""
+    clean = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", name or "")).strip()
+    return _DISPLAY.get(canonical_key(clean), clean)
+
+
+for _builtin in BUILTIN_SKILLS:
+    _DISPLAY.setdefault(canonical_key(_builtin), _builtin)
+
+
+async def load():
+    """载入全部技能与别名（启动时、过期后、发现技能已被合并删除时调用）。"""
+    global _loaded_at
+    skills = await Skill.all().order_by("id").values_list("id", "name")
+    aliases = await SkillAlias.all().values_list("alias", "skill_id")
+    _loaded_at = time.monotonic()
+    _keys.clear()
+    _names.clear()
+    for sid, name in skills:
+        _names[sid] = name
+        # 尚未合并的重复技能：同一写法取 id 最小的
+        _keys.setdefault(canonical_key(name), sid)
+    for alias, sid in aliases:
+        if sid in _names:
+            _keys[alias] = sid
+
+
+def lookup(name: str) -> Optional[tuple[int, str]]:
+    sid = _keys.get(canonical_key(name))
+    return (sid, _names[sid]) if sid is not None and sid in _names else None
+
+
+def lookup_key(name: str) -> str:
+    """
+    比较用的技能键：字典（含 skill_aliases 里手工加的别名，如 "py" -> Python）里有的
+    取所指技能名的 canonical_key，否则就是 canonical_key。
+    """
+    hit = lookup(name)
+    return canonical_key(hit[1]) if hit else canonical_key(name)
+
+
+async def refresh_if_stale():
+    """超过 SKILL_REGISTRY_TTL 时重新载入。"""
+    if _loaded_at is None or time.monotonic() - _loaded_at >= SKILL_REGISTRY_TTL:
+        await load()
+
+
+async def resolve(names: Iterable[str]) -> dict[str, tuple[int, str]]:
+    """
+    技能名 -> (技能 id, 规范名)。已知写法直接查字典；
+    未知写法批量查别名表，仍没有的批量建技能和别名（均忽略冲突后回查）。
+    返回的技能 id 都确认过仍在 skills 表里：字典里有已被合并删除的 id 时重新载入再解析一次。
+    """
+    names = {n for n in names if n and n.strip()}
+    await refresh_if_stale()
+    resolved = await _resolve(names)
+    ids = {sid for sid, _ in resolved.values()}
+    if ids and len(await Skill.filter(id__in=ids).values_list("id", flat=True)) < len(ids):
+        await load()
+        resolved = await _resolve(names)
+    return resolved
+
+
+async def _resolve(names: set[str]) -> dict[str, tuple[int, str]]:
+    resolved: dict[str, tuple[int, str]] = {}
+    missing: dict[str, list[str]] = {}
+    for n in names:
+        hit = lookup(n)
+        if hit:
+            resolved[n] = hit
+        else:
+            missing.setdefault(canonical_key(n), []).append(n)
+    if not missing:
+        return resolved
+
+    async with _lock:
+        await _load_aliases(list(missing))
+        new_keys = [k for k in missing if k not in _keys]
+        if new_keys:
+            await _create(new_keys, {k: display_name(missing[k][0]) for k in new_keys})
+
+    for key, originals in missing.items():
+        sid = _keys.get(key)
+        if sid is not None and sid in _names:
+            for n in originals:
+                resolved[n] = (sid, _names[sid])
+    return resolved
+
+
+async def _load_aliases(keys: list[str]):
+    rows = await SkillAlias.filter(alias__in=keys).values_list("alias", "skill_id")
+    unknown_ids = {sid for _, sid in rows if sid not in _names}
+    if unknown_ids:
+        _names.update(dict(await Skill.filter(id__in=unknown_ids).values_list("id", "name")))
+    for alias, sid in rows:
+        _keys[alias] = sid
+
+
+async def _create(keys: list[str], display: dict[str, str]):
+    by_name = {display[k]: k for k in keys}
+    await Skill.bulk_create([Skill(name=n) for n in by_name], ignore_conflicts=True)
+    # 同名技能可能已存在（其他写法先建的，或数据库排序规则不区分大小写）
+    rows = await Skill.filter(name__in=list(by_name)).values_list("id", "name")
+    folded = {name.casefold(): sid for sid, name in rows}
+    _names.update(dict(rows))
+    ids = {}
+    for name, key in by_name.items():
+        sid = folded.get(name.casefold())
+        if sid is not None:
+            ids[key] = sid
+    await SkillAlias.bulk_create(
+        [SkillAlias(alias=k, skill_id=sid) for k, sid in ids.items()], ignore_conflicts=True
+    )
+    # 并发时以别名表里实际写入的为准
+    await _load_aliases(list(ids))
+
+
+async def merge_duplicates(dry_run: bool = False) -> dict:
+    """
+    离线合并规范化写法相同的技能：保留别名表指向的（没有则 id 最小的），
+    其余技能的 talent_skills 批量改指向保留的技能（已存在的关系忽略），别名改指向后删除重复技能。
+    每组一个事务，可重复执行。返回统计。
+    """
+    skills = await Skill.all().order_by("id").values_list("id", "name")
+    aliases = dict(await SkillAlias.all().values_list("alias", "skill_id"))
+    existing = {sid for sid, _ in skills}
+    groups: dict[str, list[int]] = {}
+    for sid, name in skills:
+        groups.setdefault(canonical_key(name), []).append(sid)
+
+    stats = {"skills": len(skills), "groups_merged": 0, "skills_removed": 0, "links_moved": 0}
+    new_aliases = []
+    for key, ids in groups.items():
+        # 别名表可以把一组写法并到另一个名字的技能上（如手工添加的 "py" -> Python）
+        keep = aliases[key] if aliases.get(key) in existing else ids[0]
+        dups = [sid for sid in ids if sid != keep]
+        if not dups:
+            if key not in aliases:
+                new_aliases.append(SkillAlias(alias=key, skill_id=keep))
+            continue
+
+        stats["groups_merged"] += 1
+        stats["skills_removed"] += len(dups)
+        if dry_run:
+            stats["links_moved"] += await TalentSkill.filter(skill_id__in=dups).count()
+            continue
+
+        async with in_transaction():
+            # 在事务内读取，读与删之间新增到重复技能上的关系不会被漏掉
+            talent_ids = await TalentSkill.filter(skill_id__in=dups).values_list("talent_id", flat=True)
+            stats["links_moved"] += len(talent_ids)
+            await TalentSkill.bulk_create(
+                [TalentSkill(talent_id=tid, skill_id=keep) for tid in set(talent_ids)],
+                ignore_conflicts=True,
+            )
+            await TalentSkill.filter(skill_id__in=dups).delete()
+            await SkillAlias.filter(skill_id__in=dups).update(skill_id=keep)
+            await SkillAlias.bulk_create(
+                [SkillAlias(alias=key, skill_id=keep)], ignore_conflicts=True
+            )
+            await Skill.filter(id__in=dups).delete()
+
+    if not dry_run:
+        # 补齐尚无别名的技能，之后解析都以别名表为准
+        await SkillAlias.bulk_create(new_aliases, batch_size=1000, ignore_conflicts=True)
+        await load()
+    return stats
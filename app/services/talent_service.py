@@ -2,54 +2,135 @@ from tortoise.transactions import in_transaction
 from typing import Optional
 from app.db.models.screening import ScreeningResume
 from app.db.models.talent import Talent
-from app.db.models.skill import Skill
 from app.db.models.talent_skill import TalentSkill
+from app.services import graph_service, search_service, similarity_service, skill_index, skill_registry
 
 async def screening_to_talent_with_skills(
     screening_id: int,
     skill_names: Optional[list[str]] = None,
 ) -> Talent:
+    [result] = await screenings_to_talents([(screening_id, skill_names)])
+    if result["error"]:
+        raise ValueError(result["error"])
+    return await Talent.get(id=result["talent_id"])
+
+
+def _clean_names(names: list[str]) -> list[str]:
+    return list(dict.fromkeys(n.strip() for n in names if n and n.strip()))
+
+
+async def screenings_to_talents(
+    items: list[tuple[int, Optional[list[str]]]],
+) -> list[dict]:
+    """
+    批量把筛查记录转为人才。items 为 [(screening_id, 技能名列表或 None)]，None 时沿用抽取出的技能。
+
+    返回与 items 一一对应的 [{screening_id, talent_id, error}]：
+    不存在 / 已入库 / 缺少姓名的记录单独报错，不影响其他记录；
+    其余记录在一个事务里用固定数量的批量语句写入（与记录数、技能数无关）。
+    """
+    ids = list(dict.fromkeys(sid for sid, _ in items))
+    results = {sid: {"screening_id": sid, "talent_id": None, "error": None} for sid in ids}
+    # 同一条记录在请求里出现多次时只按第一次处理
+    overrides: dict[int, list[str]] = {}
+    for sid, names in reversed(items):
+        if names is not None:
+            overrides[sid] = names
+        elif sid in overrides:
+            overrides.pop(sid)
+
     async with in_transaction():
-        # 1. 查筛查池记录
-        screening = await ScreeningResume.get_or_none(id=screening_id)
-        if not screening:
-            raise ValueError('筛查记录不存在')
-        # 2. 防止重复入库
-        exists = await Talent.filter(
-            source_screening_id=screening.id
-        ).exists()
-        if exists:
-            raise ValueError("该筛查记录已入库")
-
-        skills_from_screening = screening.extracted_skills or []
-        skill_names = skill_names if skill_names is not None else skills_from_screening
-
-        # 3. 写入人才表
-        talent = await Talent.create(
-            name=screening.extracted_name,
-            school=screening.extracted_school,
-            major=screening.extracted_major,
-            degree=screening.extracted_degree,
-            grad_year=screening.extracted_grad_year,
-            phone=screening.extracted_phone,
-            email=screening.extracted_email,
-            resume_object_key=screening.file_object_key,
-            source_screening_id=screening.id,
+        screenings = {s.id: s for s in await ScreeningResume.filter(id__in=ids)}
+        promoted = set(
+            await Talent.filter(source_screening_id__in=ids).values_list(
+                "source_screening_id", flat=True
+            )
         )
-        for name in skill_names:
-            name = name.strip()
-            if not name:
-                continue
-            skill, _ = await Skill.get_or_create(name=name)
-            await TalentSkill.get_or_create(
-                talent_id=talent.id,
-                skill_id=skill.id,
+
+        todo: list[ScreeningResume] = []
+        for sid in ids:
+            screening = screenings.get(sid)
+            if not screening:
+                results[sid]["error"] = "筛查记录不存在"
+            elif sid in promoted:
+                results[sid]["error"] = "该筛查记录已入库"
+            elif not screening.extracted_name:
+                results[sid]["error"] = "缺少姓名，无法入库"
+            else:
+                todo.append(screening)
+
+        if todo:
+            skill_names = {
+                s.id: _clean_names(overrides.get(s.id, s.extracted_skills or [])) for s in todo
+            }
+            skills = await skill_registry.resolve({n for names in skill_names.values() for n in names})
+
+            # 1. 人才表一次插入，按来源筛查记录取回 id
+            await Talent.bulk_create(
+                [
+                    Talent(
+                        name=s.extracted_name,
+                        school=s.extracted_school,
+                        major=s.extracted_major,
+                        degree=s.extracted_degree,
+                        grad_year=s.extracted_grad_year,
+                        phone=s.extracted_phone,
+                        email=s.extracted_email,
+                        resume_object_key=s.file_object_key,
+                        source_screening_id=s.id,
+                    )
+                    for s in todo
+                ]
             )
+            talents = await Talent.filter(source_screening_id__in=[s.id for s in todo])
+            by_screening = {t.source_screening_id: t for t in talents}
 
+            # 2. 人才-技能关系一次插入
+            links = {
+                (by_screening[sid].id, skills[name][0])
+                for sid, names in skill_names.items()
+                for name in names
+                if name in skills
+            }
+            await TalentSkill.bulk_create(
+                [TalentSkill(talent_id=tid, skill_id=kid) for tid, kid in links],
+                ignore_conflicts=True,
+            )
 
-        # 4. 标记筛查池为已筛选
-        screening.is_screened = True
-        await screening.save()
+            # 3. 筛查池一次标记为已筛选
+            await ScreeningResume.filter(id__in=[s.id for s in todo]).update(is_screened=True)
 
-        return talent
+            # 4. 写入全文检索
+            talent_skills = {
+                by_screening[sid].id: list(dict.fromkeys(skills[n][1] for n in names if n in skills))
+                for sid, names in skill_names.items()
+            }
+            await search_service.index_talents(talents, talent_skills)
+
+            for t in talents:
+                results[t.source_screening_id]["talent_id"] = t.id
+
+    # 事务提交后把新节点和边并入图谱快照和技能索引
+    if todo:
+        names = {sid: name for sid, name in skills.values()}
+        edges: dict[int, list[tuple[int, int, str]]] = {}
+        for eid, tid, kid in await TalentSkill.filter(
+            talent_id__in=[t.id for t in talents]
+        ).values_list("id", "talent_id", "skill_id"):
+            edges.setdefault(tid, []).append((eid, kid, names.get(kid, "")))
+        for t in talents:
+            linked = edges.get(t.id, [])
+            graph_service.add_talent(t.id, t.name, linked)
+            skill_index.add_talent(t.id, [(kid, name) for _, kid, name in linked])
+            similarity_service.add_talent(
+                t.id, t.school, t.major, t.degree, [name for _, _, name in linked]
+            )
 
+    out, seen = [], set()
+    for sid, _ in items:
+        if sid in seen:
+            out.append({"screening_id": sid, "talent_id": None, "error": "请求中重复的筛查记录"})
+        else:
+            seen.add(sid)
+            out.append(results[sid])
+    return out
@@ -0,0 +1,174 @@
+# app/services/text_compactor.py
+"""
+简历文本压缩（发给 LLM 之前）：
+
+1. strip_page_furniture：基于 PyMuPDF 的 blocks 输出，去掉每页重复出现在页眉/页脚位置的块
+   （页码、"个人简历"抬头、水印文字等），在解析进程里调用；
+2. compact：折叠空白、去掉分隔线，按段落标题切分出 联系方式 / 教育 / 技能 / 经历 等区块，
+   在 token 预算内按「本次要抽取的字段」优先保留相关区块，长描述行截断。
+"""
+
+import math
+import re
+from typing import Iterable
+
+# 页眉 / 页脚区域：页面高度的上下 8%
+_MARGIN_RATIO = 0.08
+
+# 段落标题关键词
+SECTION_KEYWORDS = {
+    "contact": ("个人信息", "基本信息", "联系方式", "个人资料", "contact", "personal"),
+    "education": ("教育经历", "教育背景", "学历", "education"),
+    "skills": ("专业技能", "技能", "技术栈", "掌握技能", "skills", "technical"),
+    "experience": (
+        "工作经历", "工作经验", "实习经历", "项目经历", "项目经验",
+        "experience", "projects", "employment",
+    ),
+    "other": ("自我评价", "个人评价", "荣誉", "获奖", "证书", "兴趣", "summary", "awards"),
+}
+
+# 字段 -> 相关区块（header 为首个标题之前的内容，通常是姓名和联系方式）
+FIELD_SECTIONS = {
+    "name": ("header", "contact"),
+    "phone": ("header", "contact"),
+    "email": ("header", "contact"),
+    "school": ("education",),
+    "major": ("education",),
+    "degree": ("education", "header"),
+    "grad_year": ("education",),
+    "skills": ("skills", "experience"),
+}
+
+_SECTION_ORDER = ("header", "contact", "education", "skills", "experience", "other")
+
+# 经历 / 其他区块中单行保留的最大字符数
+_LONG_LINE_CAP = 120
+
+_CJK_RE = re.compile(r"[　-〿一-鿿＀-￯]")
+_SEPARATOR_RE = re.compile(r"^[\s\-_=*·•.。~—|]+$")
+
+_stats = {"documents": 0, "tokens_before": 0, "tokens_after": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：中文按 1 字 1 token，其余按 4 字符 1 token。"""
+    cjk = len(_CJK_RE.findall(text))
+    rest = len(re.sub(r"\s+", "", text)) - cjk
+    return cjk + math.ceil(max(rest, 0) / 4)
+
+
+def _furniture_key(text: str) -> str:
+    # 页码等数字不同也视为同一个页眉/页脚
+    return re.sub(r"\d+", "#", re.sub(r"\s+", "", text))
+
+
+def strip_page_furniture(pages: list[tuple[float, list[tuple[float, float, str]]]]) -> list[str]:
+    """
+    pages：[(页高, [(y0, y1, 块文本), ...]), ...]
+    返回每页去掉页眉页脚后的文本。少于两页时原样拼接。
+    """
+    counts: dict[str, int] = {}
+    if len(pages) >= 2:
+        for height, blocks in pages:
+            seen = set()
+            for y0, y1, text in blocks:
+                if y1 <= height * _MARGIN_RATIO or y0 >= height * (1 - _MARGIN_RATIO):
+                    seen.add(_furniture_key(text))
+            for key in seen:
+                counts[key] = counts.get(key, 0) + 1
+
+    threshold = max(2, math.ceil(len(pages) / 2))
+    furniture = {k for k, n in counts.items() if n >= threshold and k}
+
+    out = []
+    for height, blocks in pages:
+        kept = [
+            text
+            for y0, y1, text in blocks
+            if not (
+                (y1 <= height * _MARGIN_RATIO or y0 >= height * (1 - _MARGIN_RATIO))
+                and _furniture_key(text) in furniture
+            )
+        ]
+        out.append("\n".join(kept))
+    return out
+
+
+def collapse_whitespace(text: str) -> list[str]:
+    lines = []
+    for line in (text or "").splitlines():
+        line = re.sub(r"[ \t　\xa0]+", " ", line).strip()
+        if not line or _SEPARATOR_RE.match(line):
+            continue
+        if lines and lines[-1] == line:
+            continue
+        lines.append(line)
+    return lines
+
+
+def _heading(line: str) -> str | None:
+    if len(line) > 20:
+        return None
+    lower = line.lower()
+    for section, keywords in SECTION_KEYWORDS.items():
+        if any(k in lower for k in keywords):
+            return section
+    return None
+
+
+def split_sections(lines: list[str]) -> list[tuple[str, list[str]]]:
+    """按标题切分，返回 [(区块名, 行列表), ...]，保持原始顺序。"""
+    sections: list[tuple[str, list[str]]] = [("header", [])]
+    for line in lines:
+        section = _heading(line)
+        if section:
+            sections.append((section, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(name, body) for name, body in sections if body]
+
+
+def compact(text: str, budget: int, fields: Iterable[str] | None = None) -> str:
+    """
+    返回压缩后的文本。fields 为本次要抽取的字段，相关区块优先占用预算。
+    """
+    lines = collapse_whitespace(text)
+    sections = split_sections(lines)
+
+    wanted = set(fields) if fields is not None else set(FIELD_SECTIONS)
+    preferred = [s for f in FIELD_SECTIONS if f in wanted for s in FIELD_SECTIONS[f]]
+    priority = list(dict.fromkeys(preferred + list(_SECTION_ORDER)))
+
+    # 经历类区块的长描述行截断
+    for name, body in sections:
+        if name in ("experience", "other"):
+            body[:] = [l if len(l) <= _LONG_LINE_CAP else l[:_LONG_LINE_CAP] + "…" for l in body]
+
+    keep: dict[int, list[str]] = {}
+    remaining = budget
+    for section_name in priority:
+        for idx, (name, body) in enumerate(sections):
+            if name != section_name:
+                continue
+            kept = keep.setdefault(idx, [])
+            for line in body:
+                cost = estimate_tokens(line) + 1
+                if cost > remaining:
+                    break
+                kept.append(line)
+                remaining -= cost
+
+    result = "\n".join(line for idx in sorted(keep) for line in keep[idx])
+
+    _stats["documents"] += 1
+    _stats["tokens_before"] += estimate_tokens(text)
+    _stats["tokens_after"] += estimate_tokens(result)
+    return result
+
+
+def stats() -> dict:
+    before, after = _stats["tokens_before"], _stats["tokens_after"]
+    return {
+        **_stats,
+        "reduction": round(1 - after / before, 4) if before else 0.0,
+    }
@@ -0,0 +1,68 @@
+# scripts/backfill_condition_matches.py
+"""
+从 screening_resumes.matched_condition_ids（JSON）回填 screening_condition_matches 关联表。
+
+用法（项目根目录）：
+    python -m scripts.backfill_condition_matches [--batch-size 2000]
+
+按 id 升序分批读取，已存在的 (condition_id, screening_id) 忽略，可重复执行。
+关联表需已建好（DB_GENERATE_SCHEMAS=true 时启动应用会自动创建）。
+"""
+
+import argparse
+import asyncio
+
+from tortoise import Tortoise
+
+from app.config.settings import DB_GENERATE_SCHEMAS, DB_URL
+from app.db.models.condition_match import ScreeningConditionMatch
+from app.db.models.screening import ScreeningResume
+
+
+def _condition_ids(value) -> set[int]:
+    # 历史数据里可能混有字符串形式的 id
+    ids = set()
+    for item in value or []:
+        try:
+            ids.add(int(item))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+async def main(batch_size: int):
+    await Tortoise.init(db_url=DB_URL, modules={"models": ["app.db.models"]})
+    if DB_GENERATE_SCHEMAS:
+        await Tortoise.generate_schemas(safe=True)
+
+    last_id, scanned, inserted = 0, 0, 0
+    try:
+        while True:
+            rows = (
+                await ScreeningResume.filter(id__gt=last_id)
+                .order_by("id")
+                .limit(batch_size)
+                .values_list("id", "matched_condition_ids", "at_time")
+            )
+            if not rows:
+                break
+            matches = [
+                ScreeningConditionMatch(condition_id=cid, screening_id=sid, matched_at=at_time)
+                for sid, value, at_time in rows
+                for cid in sorted(_condition_ids(value))
+            ]
+            if matches:
+                await ScreeningConditionMatch.bulk_create(matches, ignore_conflicts=True)
+            last_id = rows[-1][0]
+            scanned += len(rows)
+            inserted += len(matches)
+            print(f"已扫描 {scanned} 行，写入 {inserted} 条（last_id={last_id}）")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
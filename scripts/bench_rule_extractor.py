@@ -0,0 +1,64 @@
+# scripts/bench_rule_extractor.py
+"""
+规则抽取基准：对一个目录下的简历 PDF 统计每份简历省下的字段数、跳过 LLM 的比例和耗时。
+
+用法（项目根目录）：
+    python -m scripts.bench_rule_extractor <pdf目录> [--llm]
+
+--llm 时对每份简历分别直接调用「全字段」与「仅缺失字段」两次 LLM（不走缓存），对比耗时。
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+from app.services import rule_extractor
+from app.services.pdf_service import parse_pdf
+
+
+async def _llm_latency(text: str, fields: list[str] | None) -> float:
+    from app.services import llm_service
+
+    start = time.perf_counter()
+    await llm_service._call_llm(text, fields or list(llm_service.FIELD_SPECS))
+    return time.perf_counter() - start
+
+
+async def main(corpus: Path, with_llm: bool):
+    pdfs = sorted(corpus.glob("**/*.pdf"))
+    if not pdfs:
+        raise SystemExit(f"{corpus} 下没有 PDF")
+
+    saved, rule_ms, full_s, partial_s = [], [], [], []
+    skipped = 0
+    for path in pdfs:
+        text, _ = parse_pdf(str(path))
+        start = time.perf_counter()
+        _, sure = rule_extractor.extract_rules(text)
+        rule_ms.append((time.perf_counter() - start) * 1000)
+        saved.append(len(sure))
+        missing = [f for f in rule_extractor.FIELDS if f not in sure]
+        if not missing:
+            skipped += 1
+        if with_llm:
+            full_s.append(await _llm_latency(text, None))
+            partial_s.append(await _llm_latency(text, missing) if missing else 0.0)
+
+    n = len(pdfs)
+    print(f"简历数: {n}")
+    print(f"平均省下字段数: {statistics.mean(saved):.2f} / {len(rule_extractor.FIELDS)}")
+    print(f"跳过 LLM: {skipped} ({skipped / n:.1%})")
+    print(f"规则抽取耗时: p50 {statistics.median(rule_ms):.2f}ms  max {max(rule_ms):.2f}ms")
+    if with_llm:
+        full, partial = statistics.mean(full_s), statistics.mean(partial_s)
+        print(f"LLM 全字段平均: {full:.2f}s  规则+补缺平均: {partial:.2f}s  降低 {1 - partial / full:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus", type=Path)
+    parser.add_argument("--llm", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.corpus, args.llm))
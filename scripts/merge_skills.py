@@ -0,0 +1,41 @@
+# scripts/merge_skills.py
+"""
+合并 skills 表里规范化写法相同的重复技能（"python" / "Python3" / "PYTHON "），
+批量改写 talent_skills 并补齐 skill_aliases。
+
+用法（项目根目录）：
+    python -m scripts.merge_skills [--dry-run]
+
+可重复执行。应用进程里的技能字典在 SKILL_REGISTRY_TTL 内重新载入（转入人才库时发现技能已被删除会立即重载），
+图谱快照和技能索引按各自的 TTL 重建后生效。
+"""
+
+import argparse
+import asyncio
+
+from tortoise import Tortoise
+
+from app.config.settings import DB_GENERATE_SCHEMAS, DB_URL
+from app.services import skill_registry
+
+
+async def main(dry_run: bool):
+    await Tortoise.init(db_url=DB_URL, modules={"models": ["app.db.models"]})
+    try:
+        if DB_GENERATE_SCHEMAS:
+            await Tortoise.generate_schemas(safe=True)
+        stats = await skill_registry.merge_duplicates(dry_run=dry_run)
+    finally:
+        await Tortoise.close_connections()
+    prefix = "（试运行）" if dry_run else ""
+    print(
+        f"{prefix}技能 {stats['skills']} 个，合并 {stats['groups_merged']} 组，"
+        f"删除重复技能 {stats['skills_removed']} 个，迁移人才-技能关系 {stats['links_moved']} 条"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.dry_run))
@@ -0,0 +1,88 @@
+# scripts/reindex_search.py
+"""
+为全文检索上线之前入库的筛查简历 / 人才建立 search_documents。
+
+用法（项目根目录）：
+    python -m scripts.reindex_search [--batch-size 500]
+
+旧记录没有保存简历原文，只能用抽取出的字段和技能建索引；
+已有文档（上线后入库、带原文的）跳过，可重复执行。
+"""
+
+import argparse
+import asyncio
+
+from tortoise import Tortoise
+
+from app.config.settings import DB_GENERATE_SCHEMAS, DB_URL
+from app.db.models.screening import ScreeningResume
+from app.db.models.search_document import SearchDocument
+from app.db.models.skill import Skill
+from app.db.models.talent import Talent
+from app.db.models.talent_skill import TalentSkill
+from app.services import search_service
+
+
+async def _indexed(kind: str, ids: list[int]) -> set[int]:
+    return set(
+        await SearchDocument.filter(kind=kind, ref_id__in=ids).values_list("ref_id", flat=True)
+    )
+
+
+async def _reindex_screenings(batch_size: int) -> int:
+    last_id, count = 0, 0
+    while True:
+        rows = await ScreeningResume.filter(id__gt=last_id).order_by("id").limit(batch_size)
+        if not rows:
+            return count
+        done = await _indexed("screening", [r.id for r in rows])
+        for row in rows:
+            if row.id not in done:
+                await search_service.index_screening(row, None)
+                count += 1
+        last_id = rows[-1].id
+
+
+async def _reindex_talents(batch_size: int) -> int:
+    last_id, count = 0, 0
+    while True:
+        rows = await Talent.filter(id__gt=last_id).order_by("id").limit(batch_size)
+        if not rows:
+            return count
+        done = await _indexed("talent", [r.id for r in rows])
+        todo = [r for r in rows if r.id not in done]
+        links = await TalentSkill.filter(talent_id__in=[r.id for r in todo]).values_list(
+            "talent_id", "skill_id"
+        )
+        names = dict(
+            await Skill.filter(id__in={sid for _, sid in links}).values_list("id", "name")
+        )
+        skills: dict[int, list[str]] = {}
+        for tid, sid in links:
+            if sid in names:
+                skills.setdefault(tid, []).append(names[sid])
+        for row in todo:
+            await search_service.index_talent(row, skills.get(row.id, []))
+            count += 1
+        last_id = rows[-1].id
+
+
+async def main(batch_size: int):
+    await Tortoise.init(db_url=DB_URL, modules={"models": ["app.db.models"]})
+    try:
+        if DB_GENERATE_SCHEMAS:
+            await Tortoise.generate_schemas(safe=True)
+        if not await search_service.ensure_schema():
+            raise SystemExit("search_documents 表不存在，请先建表（DB_GENERATE_SCHEMAS=true）")
+        screenings = await _reindex_screenings(batch_size)
+        talents = await _reindex_talents(batch_size)
+        print(f"新建索引：筛查简历 {screenings} 份，人才 {talents} 个")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import skill_registry
+from app.services.condition_scoring import ScreeningColumns, parse_scoring, rank
+
+
+def _columns(rows):
+    columns = ScreeningColumns()
+    columns.append(rows)
+    return columns
+
+
+def _condition(criteria):
+    return SimpleNamespace(criteria=criteria)
+
+
+ROWS = [
+    # id, 姓名, 学校, 专业, 学位, 毕业年份, 技能
+    (1, "张三", "清华大学", "计算机", "硕士", 2024, ["Python", "Go"]),
+    (2, "李四", "北京大学", "计算机", "本科", 2022, ["python3"]),
+    (3, "王五", "清华大学", "数学", "博士", None, []),
+    (4, "赵六", "复旦大学", "物理", "本科", 2024, None),
+]
+
+
+def test_parse_scoring_defaults_weights_to_one():
+    scoring = parse_scoring({"scoring": {"schools": ["清华大学"], "skills": [], "weights": {"school": 3}}})
+    assert scoring == {"weights": {"school": 3.0}, "school": ["清华大学"]}
+
+
+def test_parse_scoring_grad_year_half_life():
+    scoring = parse_scoring({"scoring": {"grad_year": 2024, "grad_year_half_life": 2}})
+    assert scoring["grad_year"] == (2024.0, 2.0)
+    assert scoring["weights"] == {"grad_year": 1.0}
+
+
+@pytest.mark.parametrize(
+    "scoring",
+    [
+        ["weights"],
+        {"weights": {"salary": 1}},
+        {"weights": {"school": -1}},
+        {"weights": {"school": True}},
+        {"schools": "清华大学"},
+        {"grad_year": "2024"},
+        {"grad_year": 2024, "grad_year_half_life": 0},
+    ],
+)
+def test_parse_scoring_rejects_bad_input(scoring):
+    with pytest.raises(ValueError):
+        parse_scoring({"scoring": scoring})
+
+
+def test_rank_applies_weights():
+    columns = _columns(ROWS)
+    criteria = {"scoring": {"schools": ["复旦大学"], "degrees": ["硕士"], "weights": {"school": 3, "degree": 1}}}
+    total, items = rank(columns, _condition(criteria), 2)
+    assert total == 4
+    assert [i["screening_id"] for i in items] == [4, 1]
+    assert items[0]["score"] == 0.75
+    assert items[0]["breakdown"] == {"school": 1.0, "degree": 0.0}
+    assert items[1]["score"] == 0.25
+
+
+def test_rank_missing_grad_year_scores_zero():
+    columns = _columns(ROWS)
+    criteria = {"scoring": {"grad_year": 2024, "grad_year_half_life": 2}}
+    _, items = rank(columns, _condition(criteria), 10)
+    scores = {i["screening_id"]: i["breakdown"]["grad_year"] for i in items}
+    assert scores == {1: 1.0, 4: 1.0, 2: 0.5, 3: 0.0}
+
+
+def test_rank_ties_prefer_newer_ids():
+    columns = _columns(ROWS)
+    criteria = {"schools": ["清华大学", "复旦大学"], "scoring": {"majors": ["不存在"]}}
+    total, items = rank(columns, _condition(criteria), 2)
+    assert total == 3
+    assert [i["screening_id"] for i in items] == [4, 3]
+    assert all(i["score"] == 0.0 for i in items)
+
+
+def test_rank_skill_overlap_uses_canonical_key():
+    columns = _columns(ROWS)
+    _, items = rank(columns, _condition({"scoring": {"skills": ["Python", "Golang"]}}), 2)
+    assert [(i["screening_id"], i["score"]) for i in items] == [(1, 1.0), (2, 0.5)]
+
+
+def test_rank_skill_overlap_uses_alias_table(monkeypatch):
+    # skill_aliases 里手工加的 "py" -> Python
+    monkeypatch.setattr(skill_registry, "_keys", {"python": 1, "py": 1})
+    monkeypatch.setattr(skill_registry, "_names", {1: "Python"})
+    columns = _columns(ROWS + [(5, "钱七", None, None, None, None, ["PY"])])
+    _, items = rank(columns, _condition({"scoring": {"skills": ["py"]}}), 3)
+    assert [(i["screening_id"], i["score"]) for i in items] == [(5, 1.0), (2, 1.0), (1, 1.0)]
@@ -0,0 +1,26 @@
+from app.services.criteria_compiler import _indexes_used, _plain
+
+
+def test_mysql_json_plan_is_decoded():
+    rows = [{
+        "EXPLAIN": '{"query_block": {"select_id": 1, "ordering_operation": {"table": {'
+                   '"table_name": "screening_resumes", "access_type": "range", '
+                   '"key": "idx_screening_degree", "possible_keys": ["idx_screening_degree"]}}}}'
+    }]
+    plan = _plain(rows)
+    assert plan[0]["EXPLAIN"]["query_block"]["select_id"] == 1
+    assert _indexes_used(plan) == ["idx_screening_degree"]
+
+
+def test_sqlite_plan_rows():
+    rows = [
+        {"id": 3, "parent": 0, "notused": 0,
+         "detail": "SEARCH screening_resumes USING INDEX idx_screening_grad_year (extracted_grad_year>?)"},
+        {"id": 7, "parent": 0, "notused": 0, "detail": "USE TEMP B-TREE FOR ORDER BY"},
+    ]
+    assert _indexes_used(_plain(rows)) == ["idx_screening_grad_year"]
+
+
+def test_postgres_json_plan():
+    rows = [{"QUERY PLAN": [{"Plan": {"Node Type": "Index Scan", "Index Name": "idx_pg"}}]}]
+    assert _indexes_used(_plain(rows)) == ["idx_pg"]
@@ -0,0 +1,79 @@
+import pytest
+
+from app.services.rule_extractor import extract_rules
+
+
+def test_name_stops_at_next_label():
+    out, sure = extract_rules("姓名：李四性别：男")
+    assert out["name"] == "李四"
+    assert "name" in sure
+
+
+def test_name_four_chars():
+    out, _ = extract_rules("姓名: 欧阳娜娜\n电话：13800138000")
+    assert out["name"] == "欧阳娜娜"
+
+
+@pytest.mark.parametrize(
+    "text, school",
+    [
+        ("就读于清华大学", "清华大学"),
+        ("毕业于浙江大学", "浙江大学"),
+        ("2015-2019 本科毕业于复旦大学", "复旦大学"),
+    ],
+)
+def test_school_strips_leading_verb(text, school):
+    out, _ = extract_rules(text)
+    assert out["school"] == school
+
+
+@pytest.mark.parametrize("text", ["Scrum Master", "associate", "doctor", "Associate Engineer"])
+def test_english_words_are_not_degrees(text):
+    out, sure = extract_rules(text)
+    assert out["degree"] is None
+    assert "degree" not in sure
+
+
+def test_english_degree_is_candidate_only():
+    out, sure = extract_rules("Master of Science, Tsinghua University")
+    assert out["degree"] == "硕士"
+    assert "degree" not in sure
+
+
+def test_chinese_degree_is_sure():
+    out, sure = extract_rules("学历：本科  Scrum Master")
+    assert out["degree"] == "本科"
+    assert "degree" in sure
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "曾在博士后工作站实习",
+        "师从博士生导师王教授",
+        "参加研究生支教团",
+    ],
+)
+def test_degree_words_in_other_phrases_are_ignored(text):
+    out, sure = extract_rules(text)
+    assert out["degree"] is None
+    assert "degree" not in sure
+
+
+def test_degree_outside_education_is_candidate_only():
+    out, sure = extract_rules("项目经历\n与多位博士合作完成课题")
+    assert out["degree"] == "博士"
+    assert "degree" not in sure
+
+
+def test_undergraduate_not_upgraded_by_other_mentions():
+    text = "教育经历\n2016-2020 浙江大学 计算机 本科\n\n项目经历\n协助博士后整理数据，参加研究生支教团"
+    out, sure = extract_rules(text)
+    assert out["degree"] == "本科"
+    assert "degree" in sure
+
+
+def test_degree_next_to_school_line_is_sure():
+    out, sure = extract_rules("2015-2018 复旦大学\n硕士 软件工程")
+    assert out["degree"] == "硕士"
+    assert "degree" in sure